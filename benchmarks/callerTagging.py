@@ -0,0 +1,83 @@
+"""Microbenchmark of log prefix overhead in pyVisaInterface calls
+
+Calls real pyVisaInterface.insertFrequency on simulated device (pyvisa-sim) with
+logger disabled, once as it is and once preceded by previous approach
+(inspect.stack() and datetime formatting on every call). Cost of record which
+instrumentLogger really emits is measured separately.
+
+Run from repository root:
+    python benchmarks/callerTagging.py
+"""
+
+import os
+import sys
+import timeit
+import inspect
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+import constants
+from pV import pyVisaInterface
+from sessionPool import sessionPool
+from instrumentLogger import instrumentLogger
+
+#Device of default pyvisa-sim configuration
+ADDRESS = 'ASRL1::INSTR'
+
+class listSink:
+    def __init__(self):
+        self.items = []
+
+    def addItem(self, string):
+        self.items.append(string)
+
+class ui_SignalGenerator:
+    def __init__(self, interface):
+        self.interface = interface
+        self.frequencies = ('1000', '1001')
+        self.index = 0
+
+    def press(self):
+        self.index ^= 1
+        return self.interface.insertFrequency(self.frequencies[self.index])
+
+    def pressStackTagged(self):
+        """Copy of prefix code executed by every public method before this change"""
+
+        stack = inspect.stack()
+        the_class = stack[0][0].f_locals["self"].__class__.__name__
+        caller = self.__convertCallerToPrev('{}'.format(the_class))
+
+        now = datetime.now()
+        current_time = now.strftime("%H:%M:%S - ")
+        return self.press()
+
+    def __convertCallerToPrev(self, string):
+        if string == 'ui_SignalGenerator':
+            return 'signalGen: '
+        elif string == 'ui_Multimeter':
+            return 'multimerer: '
+
+def measure(function, number):
+    best = min(timeit.repeat(function, number=number, repeat=5))
+    return best / number * 1e6
+
+if __name__ == '__main__':
+    pool = sessionPool('@sim')
+    interface = pyVisaInterface(pool, None, constants.SIGNALGENERATOR)
+    interface.openResource(ADDRESS)
+    caller = ui_SignalGenerator(interface)
+
+    before = measure(caller.pressStackTagged, 200)
+    silent = measure(caller.press, 20000)
+    logger = instrumentLogger(listSink(), constants.SIGNALGENERATOR)
+    emitted = measure(lambda: logger.log('FREQ %s', '1000'), 200000)
+
+    interface.closeResource()
+    pool.closeAll()
+
+    print('insertFrequency, inspect.stack() + datetime : %10.3f us' % before)
+    print('insertFrequency, logger disabled            : %10.3f us' % silent)
+    print('instrumentLogger, one record emitted        : %10.3f us' % emitted)
+    print('speedup of call (logger disabled)           : %10.1fx' % (before / silent))
@@ -0,0 +1,87 @@
+"""Benchmark of application startup
+
+Every measurement runs in fresh interpreter, so nothing is cached in sys.modules.
+    import time     - python -X importtime report of "import mainWindow",
+                      total and the slowest modules (cumulative time)
+    first window    - time from process start until main window is shown
+                      and event loop is running
+    first controler - time to open first multimeter window afterwards, which
+                      now includes lazy import of pyVisa, NumPy and VISA backend
+
+Run from repository root (no display needed, offscreen platform is used when DISPLAY is not set):
+    python benchmarks/startup.py [repeat]
+"""
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+REPEAT = 5
+SLOWEST = 15
+
+FIRST_WINDOW = """
+import sys, time
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import QTimer
+app = QtWidgets.QApplication(sys.argv)
+from mainWindow import ui_MainWindow
+import constants
+window = ui_MainWindow('@sim')
+def shown():
+    print('window', time.time())
+    window.callBackDeviceType(constants.MULTIMETER)
+    print('controler', time.time())
+    sys.stdout.flush()
+    import os
+    os._exit(0)
+QTimer.singleShot(0, shown)
+app.exec()
+"""
+
+def environment():
+    env = dict(os.environ)
+    if 'DISPLAY' not in env:
+        env.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    return env
+
+def importTime():
+    """Returns total import time of mainWindow and list of (cumulative, module) in microseconds"""
+
+    process = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import mainWindow'], cwd = SOURCE_DIRECTORY,
+                             env = environment(), capture_output = True, text = True, check = True)
+    modules = []
+    for line in process.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        modules.append((int(cumulative), name.rstrip()))
+    total = next(cumulative for cumulative, name in modules if name.strip() == 'mainWindow')
+    return total, sorted(modules, reverse = True)
+
+def firstWindow():
+    """Returns times in seconds from process start to main window and to first controler window"""
+
+    start = time.time()
+    process = subprocess.run([sys.executable, '-c', FIRST_WINDOW], cwd = SOURCE_DIRECTORY,
+                             env = environment(), capture_output = True, text = True, timeout = 120)
+    stamps = dict(line.split() for line in process.stdout.splitlines() if line.startswith(('window', 'controler')))
+    return float(stamps['window']) - start, float(stamps['controler']) - float(stamps['window'])
+
+if __name__ == '__main__':
+    repeat = int(sys.argv[1]) if len(sys.argv) > 1 else REPEAT
+
+    totals = []
+    for _ in range(repeat):
+        total, modules = importTime()
+        totals.append(total)
+    print('import mainWindow: %.1f ms (median of %d)' % (statistics.median(totals) / 1e3, repeat))
+    print('slowest modules of last run (cumulative):')
+    for cumulative, name in modules[:SLOWEST]:
+        print('  %9.1f ms %s' % (cumulative / 1e3, name))
+
+    windows = [firstWindow() for _ in range(repeat)]
+    print('time to first window: %.1f ms (median of %d)' % (statistics.median(window for window, _ in windows) * 1e3, repeat))
+    print('time to first controler window: %.1f ms (median of %d)' % (statistics.median(controler for _, controler in windows) * 1e3, repeat))
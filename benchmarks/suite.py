@@ -0,0 +1,452 @@
+"""Benchmark suite of pyVisaInterface hot paths
+
+Benchmarks run against simulated instruments, so no hardware is needed:
+    sim     - bundled pyvisa-sim definition (src/simulator/instruments.yaml),
+              answers instantly, measures pure software overhead
+    socket  - instrumentSimulator.py stand-in over TCP (pyvisa-py backend),
+              adds socket round trip and can model latency (--latency, --baud)
+
+Measured:
+    call.<method>          - per call time of every pyVisaInterface method, called
+                             through worker queue of device like controllers do
+    generator.insert       - full configuration of generator window (__insertToGenerator),
+                             from validation of widgets until batch is confirmed
+    multimeter.autoMeasure - sustained readings per second of MEAS? loop
+    multimeter.deviceRange - sustained readings per second of INIT/FETCh? on autorange of device
+    multimeter.predictedRange - the same on fixed range kept by rangePredictor (autoRange.measureWithRange)
+    multimeter.readBurst   - readings per second of one SAMP:COUN burst, socket backend only
+                             (pyvisa-sim returns one reading per FETCh?, see instruments.yaml)
+    errorParser.printError - lookup of every known and one unknown error code
+    prefix.parseValue      - reading of typed value in engineering notation, e.g. "120 mV"
+    prefix.formatArray     - readings per second written with metric prefix and unit
+    scheduler.sharedBus    - commands per second of two devices on one bus (scheduler overhead only)
+    scheduler.userLatency  - wait of user command for bus busy with 10 ms of queued background commands
+    window.<name>          - construction time of every window
+    trend.extend           - samples per second decimated by trendPlot, 1 kHz bursts
+    trend.frame            - refresh and repaint of trendPlot after 10 hours of 1 kHz data
+
+Results are written as JSON, e.g.
+    {"meta" : {...}, "results" : {"call.fetchMeasure" : {"unit" : "us", "better" : "lower",
+                                                         "median" : 41.2, "p95" : 55.0, "min" : 38.1, "count" : 200}}}
+
+Run from repository root (offscreen Qt platform is used when DISPLAY is not set):
+    python benchmarks/suite.py run --output before.json
+    python benchmarks/suite.py run --backend socket --latency 0.001 --output after.json
+    python benchmarks/suite.py compare before.json after.json --threshold 0.1
+Compare prints change of median of every benchmark and exits with 1 when any of them
+got worse more than threshold.
+"""
+
+import os
+import sys
+import json
+import time
+import platform
+import argparse
+import statistics
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+SIM_BACKEND = 'simulator/instruments.yaml@sim'
+SIM_GENERATOR = 'ASRL1::INSTR'
+SIM_MULTIMETER = 'ASRL2::INSTR'
+REPEAT = 200
+DURATION = 2.0
+BURST = 1000
+#Readings of burst timed as single call
+CALL_BURST = 10
+THRESHOLD = 0.1
+AUTORANGE_TIME = 0.01
+
+class benchmarkResults:
+    """Collection of results, every result keeps median, 95th percentile and minimum of samples"""
+
+    def __init__(self):
+        self.results = {}
+
+    def addTimes(self, name, samples):
+        """Adds per call times in seconds, stored in microseconds, lower is better"""
+
+        samples = sorted(samples)
+        self.results[name] = {'unit' : 'us', 'better' : 'lower',
+                              'median' : statistics.median(samples) * 1e6,
+                              'p95' : samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1e6,
+                              'min' : samples[0] * 1e6, 'count' : len(samples)}
+        #Progress goes to standard error, standard output is left for JSON report
+        print('%-40s %12.1f us  (p95 %.1f us)' % (name, self.results[name]['median'], self.results[name]['p95']), file = sys.stderr)
+
+    def addRate(self, name, unit, rates):
+        """Adds rates of repeated runs, higher is better"""
+
+        rates = sorted(rates)
+        self.results[name] = {'unit' : unit, 'better' : 'higher', 'median' : statistics.median(rates),
+                              'p95' : rates[int(len(rates) * 0.05)], 'min' : rates[0], 'count' : len(rates)}
+        print('%-40s %12.1f %s' % (name, self.results[name]['median'], unit), file = sys.stderr)
+
+def timeCalls(function, repeat, warmup = 5):
+    """Returns list of times in seconds of repeat calls of function, function gets index of call"""
+
+    for index in range(warmup):
+        function(index)
+    samples = []
+    for index in range(repeat):
+        start = time.perf_counter()
+        function(index)
+        samples.append(time.perf_counter() - start)
+    return samples
+
+def openInstruments(backend, arguments):
+    """Returns session pool, generator and multimeter interfaces and servers of stand-in (empty for sim)"""
+
+    from sessionPool import sessionPool
+    from pV import pyVisaInterface
+    import constants
+
+    servers = ()
+    if backend == 'socket':
+        from instrumentSimulator import startSimulators
+        servers = startSimulators(arguments.baud, arguments.latency, settleTime = 0.0, integrationTime = 0.0,
+                                  autorangeTime = arguments.autorange)
+        pool = sessionPool('@py')
+        addresses = [server.getAddress() for server in servers]
+    else:
+        pool = sessionPool(SIM_BACKEND)
+        addresses = [SIM_GENERATOR, SIM_MULTIMETER]
+
+    instruments = []
+    for address, caller in zip(addresses, (constants.SIGNALGENERATOR, constants.MULTIMETER)):
+        instrument = pyVisaInterface(pool, None, caller)
+        instrument.submit(instrument.openResource, address, address = address).result()
+        instrument.submit(instrument.configureCommunication, '9600').result()
+        if not instrument.getDeviceStatus() == constants.CONFIGURED:
+            raise RuntimeError('cannot configure %s' % address)
+        instruments.append(instrument)
+    return pool, instruments[0], instruments[1], servers
+
+def benchmarkCalls(results, generator, multimeter, repeat, burst):
+    import constants
+
+    def call(instrument, method, *args):
+        return lambda index: instrument.submit(method, *args).result()
+
+    def alternating(instrument, method, *values):
+        #Settings cache skips unchanged values, every call writes different value than previous one
+        return lambda index: instrument.submit(method, *values[index % len(values)]).result()
+
+    calls = [
+        ('call.submit', call(generator, generator.getDeviceStatus)),
+        ('call.getDeviceName', call(generator, generator.getDeviceName, lambda name : None)),
+        ('call.insertWaveform', alternating(generator, generator.insertWaveform, (constants.SINUS,), (constants.SQUARE,))),
+        ('call.insertWaveform.cached', call(generator, generator.insertWaveform, constants.SQUARE)),
+        ('call.insertFrequency', alternating(generator, generator.insertFrequency, ('1000',), ('2000',))),
+        ('call.insertAmplitude', alternating(generator, generator.insertAmplitude, ('1', '0.1'), ('2', '0.2'))),
+        ('call.insertModulation', alternating(generator, generator.insertModulation, (constants.AM, constants.SINUS),
+                                              (constants.AM, constants.SQUARE))),
+        ('call.insertModulationFreq', alternating(generator, generator.insertModulationFreq, (constants.AM, '100'), (constants.AM, '200'))),
+        ('call.insertDepth', alternating(generator, generator.insertDepth, ('50',), ('60',))),
+        ('call.insertDeviation', alternating(generator, generator.insertDeviation, ('100',), ('200',))),
+        ('call.checkErrorBus', call(generator, generator.checkErrorBus)),
+        ('call.checkWaveform', call(generator, generator.checkWaveform, constants.SQUARE, True)),
+        ('call.checkFrequency', call(generator, generator.checkFrequency, '2000', True)),
+        ('call.autoMeasure', call(multimeter, multimeter.autoMeasure, constants.VOLTAGE_DC)),
+        ('call.triggerMeasure', call(multimeter, multimeter.triggerMeasure, constants.VOLTAGE_DC)),
+        ('call.configureMeasure', alternating(multimeter, multimeter.configureMeasure, (constants.VOLTAGE_DC,), (constants.VOLTAGE_AC,))),
+        ('call.initiateMeasure', call(multimeter, multimeter.initiateMeasure)),
+        ('call.fetchMeasure', call(multimeter, multimeter.fetchMeasure)),
+        ('call.readBurst', call(multimeter, multimeter.readBurst, burst)),
+        ]
+    for name, function in calls:
+        results.addTimes(name, timeCalls(function, repeat))
+    #Listing searches whole bus (pyvisa-py also network), it is timed with less calls
+    results.addTimes('call.listOfResources', timeCalls(call(generator, generator.listOfResources), max(1, repeat // 20), warmup = 1))
+    #Errors of rejected settings (e.g. AM and FM at once) are read out before next benchmarks
+    for instrument in (generator, multimeter):
+        instrument.submit(instrument.checkErrorBus).result()
+
+def benchmarkOpen(results, pool, address, repeat):
+    from pV import pyVisaInterface
+    import constants
+
+    def reopen(index):
+        instrument = pyVisaInterface(pool, None, constants.MULTIMETER)
+        instrument.submit(instrument.openResource, address, address = address).result()
+        instrument.submit(instrument.configureCommunication, '9600').result()
+        instrument.closeResource()
+    results.addTimes('call.openResource.configureCommunication', timeCalls(reopen, max(1, repeat // 10), warmup = 1))
+
+def sustainedRates(function, duration):
+    """Returns three rates of calls per second of function, every one measured for third of duration"""
+
+    rates = []
+    for _ in range(3):
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < duration / 3:
+            function()
+            count += 1
+        rates.append(count / (time.perf_counter() - start))
+    return rates
+
+def benchmarkMeasurements(results, multimeter, duration, burst, bursts):
+    import constants
+    from autoRange import rangePredictor, measureWithRange
+    from capabilities import multimeterCapabilities
+
+    results.addRate('multimeter.autoMeasure', 'readings/s',
+                    sustainedRates(lambda : multimeter.submit(multimeter.autoMeasure, constants.VOLTAGE_DC).result(), duration))
+
+    def deviceRange():
+        multimeter.initiateMeasure()
+        return multimeter.fetchMeasure()
+    multimeter.submit(multimeter.configureMeasure, constants.VOLTAGE_DC).result()
+    multimeter.submit(multimeter.setMeasureRange, constants.VOLTAGE_DC, None).result()
+    results.addRate('multimeter.deviceRange', 'readings/s',
+                    sustainedRates(lambda : multimeter.submit(deviceRange).result(), duration))
+
+    capabilities = multimeterCapabilities()
+    predictor = rangePredictor(capabilities.getRanges(constants.VOLTAGE_DC), capabilities.getOverrange())
+    results.addRate('multimeter.predictedRange', 'readings/s',
+                    sustainedRates(lambda : multimeter.submit(measureWithRange, multimeter, constants.VOLTAGE_DC, predictor).result(), duration))
+
+    if not bursts:
+        return
+    #Burst stays on predicted range, autorange of device would add its time to every reading
+    multimeter.submit(multimeter.configureMeasure, constants.VOLTAGE_DC).result()
+    rates = []
+    for _ in range(3):
+        start = time.perf_counter()
+        values = multimeter.submit(multimeter.readBurst, burst).result()
+        rates.append(len(values) / (time.perf_counter() - start))
+    results.addRate('multimeter.readBurst', 'readings/s', rates)
+    multimeter.submit(multimeter.setMeasureRange, constants.VOLTAGE_DC, None).result()
+
+def benchmarkErrorParser(results, repeat):
+    from errorHandler import errorParser, ERRORS
+
+    parser = errorParser()
+    codes = list(ERRORS) + [1234567890]
+    def lookup(index):
+        for code in codes:
+            parser.printError(code)
+    samples = timeCalls(lookup, repeat)
+    results.addTimes('errorParser.printError', [sample / len(codes) for sample in samples])
+
+def benchmarkPrefixes(results, repeat):
+    import numpy as np
+    from metricPrefix import parseValue, formatArray
+
+    texts = ['1000', '4.7k', '120 mV', '1e-6', '2.5 MHz', '-0.1', '500 mVpp']
+    def parse(index):
+        for text in texts:
+            parseValue(text)
+    samples = timeCalls(parse, repeat)
+    results.addTimes('prefix.parseValue', [sample / len(texts) for sample in samples])
+
+    values = np.random.default_rng(0).normal(0.0, 10.0, 100000) * 10.0 ** np.random.default_rng(1).integers(-9, 7, 100000)
+    rates = []
+    for _ in range(3):
+        start = time.perf_counter()
+        formatArray(values, 'V')
+        rates.append(len(values) / (time.perf_counter() - start))
+    results.addRate('prefix.formatArray', 'readings/s', rates)
+
+def benchmarkScheduler(results, repeat):
+    import constants
+    from commandScheduler import commandScheduler
+
+    scheduler = commandScheduler()
+    first = scheduler.getQueue('GPIB0::1::INSTR')
+    second = scheduler.getQueue('GPIB0::2::INSTR')
+    rates = []
+    for _ in range(3):
+        start = time.perf_counter()
+        futures = [queue.submit(int) for _ in range(5000) for queue in (first, second)]
+        futures[-1].result()
+        rates.append(len(futures) / (time.perf_counter() - start))
+    results.addRate('scheduler.sharedBus', 'commands/s', rates)
+
+    samples = []
+    for _ in range(max(1, repeat // 10)):
+        background = [first.submit(time.sleep, 0.0005, priority = constants.PRIORITY_BACKGROUND) for _ in range(20)]
+        start = time.perf_counter()
+        second.submit(int).result()
+        samples.append(time.perf_counter() - start)
+        background[-1].result()
+    results.addTimes('scheduler.userLatency', samples)
+    scheduler.stopAll()
+
+def benchmarkWindows(results, application, pool, generator, repeat):
+    from PyQt5 import QtWidgets
+    import constants
+    from pV import pyVisaInterface
+    from mainWindow import ui_MainWindow
+    from multimeter import ui_Multimeter
+    from signalGenerator import ui_SignalGenerator
+    from osciloscope import ui_Osciloscope
+    from chooseType import ui_ChooseType
+    from chooseDevice import ui_ChooseDevice
+    from errorBox import ui_ErrorBox
+
+    def construct(factory):
+        def function(index):
+            window = factory()
+            application.processEvents()
+            window.hide()
+            window.deleteLater()
+        return function
+
+    #Windows are built as controllers do, with own interface and without connected device
+    interface = lambda caller : pyVisaInterface(pool, None, caller)
+    windows = [
+        ('window.mainWindow', lambda : ui_MainWindow(SIM_BACKEND)),
+        ('window.multimeter', lambda : ui_Multimeter(None, interface(constants.MULTIMETER))),
+        ('window.signalGenerator', lambda : ui_SignalGenerator(None, interface(constants.SIGNALGENERATOR))),
+        ('window.osciloscope', lambda : ui_Osciloscope(None, interface(constants.OSCILLOSCOPE))),
+        ('window.chooseType', lambda : ui_ChooseType(None, lambda string : None)),
+        ('window.chooseDevice', lambda : ui_ChooseDevice(interface(constants.MULTIMETER), lambda string, baudRate : None)),
+        ('window.errorBox', lambda : ui_ErrorBox(1000000100)),
+        ]
+    for name, factory in windows:
+        results.addTimes(name, timeCalls(construct(factory), max(1, repeat // 10), warmup = 1))
+
+    #Whole configuration from generator window, ends when batch is confirmed by device
+    window = ui_SignalGenerator(None, generator)
+    window.findChild(QtWidgets.QLineEdit, 'amplitudeLineEdit').setText('1')
+    frequencyLineEdit = window.findChild(QtWidgets.QLineEdit, 'frequencyLineEdit')
+    def insert(index):
+        frequencyLineEdit.setText(str(1000 + index % 2))
+        window._ui_SignalGenerator__insertToGenerator()
+        #Worker queue of device is FIFO, so empty call finishes after configuration
+        generator.submit(generator.getDeviceStatus).result()
+    results.addTimes('generator.insert', timeCalls(insert, repeat))
+    window.hide()
+
+def benchmarkTrend(results, application, repeat):
+    import numpy as np
+    import constants
+    from ringBuffer import ringBuffer
+    from trendPlot import trendPlot
+
+    plot = trendPlot()
+    plot.resize(631, 231)
+    plot.show()
+    application.processEvents()
+    buffer = ringBuffer(constants.ACQUISITION_BUFFER_SIZE)
+    plot.start(buffer, 'V')
+    #One burst of acquisitionEngine at 1 kHz
+    size = int(1000 * constants.ACQUISITION_BURST_PERIOD)
+    burst = np.random.default_rng(0).normal(size = size)
+    def extend(index):
+        buffer.extend(index * constants.ACQUISITION_BURST_PERIOD + np.arange(size) * 1e-3, burst)
+        plot.refresh()
+    samples = timeCalls(extend, repeat)
+    results.addRate('trend.extend', 'samples/s', [size / sample for sample in samples])
+
+    #10 hours of 1 kHz data, then one burst per frame
+    bursts = 36000
+    for index in range(repeat + 5, bursts, 1000):
+        timestamps = np.arange(index * size, min(index + 1000, bursts) * size) * 1e-3
+        buffer.extend(timestamps, np.sin(timestamps))
+        plot.refresh()
+    def frame(index):
+        extend(bursts + index)
+        plot.repaint()
+    results.addTimes('trend.frame', timeCalls(frame, repeat))
+    plot.stop()
+    plot.hide()
+
+def run(arguments):
+    #Output path is relative to directory of caller, not to src
+    output = os.path.abspath(arguments.output) if arguments.output else None
+    os.chdir(SOURCE_DIRECTORY)
+    sys.path.insert(0, SOURCE_DIRECTORY)
+    if 'DISPLAY' not in os.environ:
+        os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+
+    from PyQt5 import QtWidgets
+    application = QtWidgets.QApplication(sys.argv[:1])
+
+    results = benchmarkResults()
+    pool, generator, multimeter, servers = openInstruments(arguments.backend, arguments)
+    try:
+        benchmarkCalls(results, generator, multimeter, arguments.repeat, min(arguments.burst, CALL_BURST))
+        benchmarkOpen(results, pool, servers[1].getAddress() if servers else SIM_MULTIMETER, arguments.repeat)
+        #pyvisa-sim returns one reading for FETC? whatever SAMP:COUN is, its bursts are single readings
+        benchmarkMeasurements(results, multimeter, arguments.duration, arguments.burst, bool(servers))
+        benchmarkErrorParser(results, arguments.repeat)
+        benchmarkPrefixes(results, arguments.repeat)
+        benchmarkScheduler(results, arguments.repeat)
+        benchmarkWindows(results, application, pool, generator, arguments.repeat)
+        benchmarkTrend(results, application, arguments.repeat)
+    finally:
+        pool.closeAll()
+        for server in servers:
+            server.shutdown()
+
+    import pyvisa
+    report = {'meta' : {'time' : time.strftime('%Y-%m-%dT%H:%M:%S'), 'python' : platform.python_version(),
+                        'platform' : platform.platform(), 'pyvisa' : pyvisa.__version__, 'backend' : arguments.backend,
+                        'latency' : arguments.latency, 'baud' : arguments.baud, 'autorange' : arguments.autorange,
+                        'repeat' : arguments.repeat},
+              'results' : results.results}
+    if output:
+        with open(output, 'w') as file:
+            json.dump(report, file, indent = 1, sort_keys = True)
+    else:
+        json.dump(report, sys.stdout, indent = 1, sort_keys = True)
+        sys.stdout.write('\n')
+    return 0
+
+def compare(arguments):
+    """Prints change of median of every benchmark, returns 1 when any benchmark got worse more than threshold"""
+
+    with open(arguments.baseline) as file:
+        baseline = json.load(file)['results']
+    with open(arguments.current) as file:
+        current = json.load(file)['results']
+
+    regressions = 0
+    print('%-40s %14s %14s %9s' % ('benchmark', 'baseline', 'current', 'change'))
+    for name in sorted(set(baseline) | set(current)):
+        if name not in baseline or name not in current:
+            print('%-40s %s' % (name, 'only in current' if name in current else 'only in baseline'))
+            continue
+        before, after = baseline[name], current[name]
+        change = (after['median'] - before['median']) / before['median'] if before['median'] else 0.0
+        #Positive worsening means slower calls or lower rates
+        worsening = change if before['better'] == 'lower' else -change
+        flag = ''
+        if worsening > arguments.threshold:
+            flag = 'REGRESSION'
+            regressions += 1
+        elif worsening < -arguments.threshold:
+            flag = 'improved'
+        print('%-40s %10.1f %-3s %10.1f %-3s %+8.1f%% %s' % (name, before['median'], before['unit'][:3],
+                                                            after['median'], after['unit'][:3], change * 100, flag))
+    print('%d regression(s), threshold %.0f%%' % (regressions, arguments.threshold * 100))
+    return 1 if regressions else 0
+
+def createParser():
+    parser = argparse.ArgumentParser(description = 'Benchmarks of pyVisaInterface against simulated instruments')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    command = commands.add_parser('run', help = 'run benchmarks and write JSON report')
+    command.add_argument('--backend', choices = ('sim', 'socket'), default = 'sim')
+    command.add_argument('--latency', type = float, default = 0.0, help = 'latency of socket stand-in in seconds')
+    command.add_argument('--baud', type = int, default = None, help = 'simulated serial speed of socket stand-in')
+    command.add_argument('--autorange', type = float, default = AUTORANGE_TIME, help = 'extra time of reading on autorange of socket stand-in')
+    command.add_argument('--repeat', type = int, default = REPEAT, help = 'calls of every timed function')
+    command.add_argument('--duration', type = float, default = DURATION, help = 'seconds of sustained measurement')
+    command.add_argument('--burst', type = int, default = BURST, help = 'readings in one burst')
+    command.add_argument('--output', help = 'JSON file, standard output by default')
+    command.set_defaults(function = run)
+
+    command = commands.add_parser('compare', help = 'compare two JSON reports')
+    command.add_argument('baseline')
+    command.add_argument('current')
+    command.add_argument('--threshold', type = float, default = THRESHOLD, help = 'relative change reported as regression')
+    command.set_defaults(function = compare)
+    return parser
+
+if __name__ == '__main__':
+    arguments = createParser().parse_args()
+    sys.exit(arguments.function(arguments))
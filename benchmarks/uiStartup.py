@@ -0,0 +1,61 @@
+"""Benchmark of window construction: uic.loadUi against precompiled forms
+
+For every .ui file builds the same form many times with runtime XML parsing
+(uic.loadUi) and with uiLoader.loadForm, which imports form class compiled
+into src/uiForms once. First build of loadForm includes compilation when
+compiled module is missing or stale.
+
+Run from repository root (no display needed):
+    QT_QPA_PLATFORM=offscreen python benchmarks/uiStartup.py
+"""
+
+import os
+import sys
+import time
+import xml.etree.ElementTree as ElementTree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src'))
+
+from PyQt5 import QtWidgets, uic
+
+import uiLoader
+
+REPEAT = 20
+
+def topLevelClass(path):
+    widget = ElementTree.parse(path).getroot().find('widget')
+    return getattr(QtWidgets, widget.get('class'))
+
+def measure(build, widgetClass, repeat):
+    times = []
+    for _ in range(repeat):
+        widget = widgetClass()
+        start = time.perf_counter()
+        build(widget)
+        times.append(time.perf_counter() - start)
+        widget.deleteLater()
+    return times
+
+if __name__ == '__main__':
+    app = QtWidgets.QApplication(sys.argv)
+
+    print('%-22s %14s %14s %14s %8s' % ('form', 'loadUi [ms]', 'first [ms]', 'loadForm [ms]', 'speedup'))
+    totalRuntime = 0.0
+    totalCompiled = 0.0
+    for fileName in sorted(os.listdir(uiLoader.UI_DIRECTORY)):
+        path = os.path.join(uiLoader.UI_DIRECTORY, fileName)
+        if not fileName.endswith('.ui') or os.path.getsize(path) == 0:
+            continue
+        name = fileName[:-3]
+        widgetClass = topLevelClass(path)
+
+        runtime = measure(lambda widget: uic.loadUi(path, widget), widgetClass, REPEAT)
+        compiled = measure(lambda widget: uiLoader.loadForm(name, widget), widgetClass, REPEAT)
+
+        runtimeMean = sum(runtime) / len(runtime) * 1e3
+        compiledMean = sum(compiled[1:]) / len(compiled[1:]) * 1e3
+        totalRuntime += runtimeMean
+        totalCompiled += compiledMean
+        print('%-22s %14.3f %14.3f %14.3f %7.1fx' % (name, runtimeMean, compiled[0] * 1e3, compiledMean, runtimeMean / compiledMean))
+
+    print('%-22s %14.3f %14s %14.3f %7.1fx' % ('all forms', totalRuntime, '', totalCompiled, totalRuntime / totalCompiled))
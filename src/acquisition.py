@@ -0,0 +1,148 @@
+import time
+import threading
+from concurrent.futures import Future, CancelledError
+
+import numpy as np
+
+#Internal imports
+import constants
+from ringBuffer import ringBuffer
+
+class acquisitionEngine:
+    """
+    acquisitionEngine, continuous multimeter sampling into ringBuffer
+
+    Multimeter is configured once, then engine thread reads bursts of readings:
+    every constants.ACQUISITION_BURST_PERIOD one INIT and one FETCh? bring
+    rate * period readings (SAMP:COUN), so high rates do not pay one round trip
+    per reading. Every burst is executed by commandQueue of the device with
+    constants.PRIORITY_BACKGROUND, so commands of user for that device or other devices
+    of its bus (e.g. SYST:ERR?) go ahead of next burst instead of waiting for stop.
+    Acquisition rate is independent of GUI, which only reads buffer.
+
+    stop() never waits for engine thread, burst which is already in device finishes
+    in background and its readings are dropped. End of thread is reported by future
+    returned from start(), e.g. to asyncDispatcher. Errors which stopped sampling
+    (TimeoutError of command, instrumentError) are set on that future, so its watcher
+    shows them, closing of device queue ends sampling quietly.
+
+    Methods
+    -------
+    start(self, mode, rate, store = None, instrument = None, unit = None, predictor = None) : Future
+        starts sampling of selected mode with target rate in Hz, every burst is also
+        appended to measurementStore when store is given, range is kept by rangePredictor
+        when predictor is given, otherwise device uses its own autorange,
+        returned future is done when engine thread finishes
+    stop(self):
+        stops sampling without waiting, already stored samples stay in buffer
+    isRunning(self) : bool
+        returns True when sampling is active and stop was not requested
+    finished(self) : Future
+        returns future of last started sampling, done when its thread finished
+    getBuffer(self) : ringBuffer
+        returns buffer with samples
+    """
+
+    def __init__(self, pyVisa, capacity = constants.ACQUISITION_BUFFER_SIZE):
+        """Initialization Method
+
+        Parameters
+        ----------
+        pyVisa : pyVisaInterface
+            VISA interface wrapper with opened multimeter
+        capacity : int
+            number of samples kept in memory
+        """
+
+        self.__pyVisa = pyVisa
+        self.__buffer = ringBuffer(capacity)
+        #Every sampling has own stop event, so thread of stopped sampling can not touch buffer of next one
+        self.__stopEvent = threading.Event()
+        self.__stopEvent.set()
+        self.__lock = threading.Lock()
+        self.__thread = None
+        self.__finished = Future()
+        self.__finished.set_running_or_notify_cancel()
+        self.__finished.set_result(None)
+
+    def getBuffer(self):
+        return self.__buffer
+
+    def isRunning(self):
+        return self.__thread is not None and self.__thread.is_alive() and not self.__stopEvent.is_set()
+
+    def finished(self):
+        return self.__finished
+
+    def start(self, mode, rate, store = None, instrument = None, unit = None, predictor = None):
+        with self.__lock:
+            self.__stopEvent.set()
+            self.__stopEvent = threading.Event()
+            self.__buffer.clear()
+        record = None
+        if store is not None:
+            #Store only queues burst, its own thread writes it to disk
+            record = lambda timestamps, values: store.append(instrument, mode, unit, timestamps, values)
+        self.__finished = Future()
+        self.__finished.set_running_or_notify_cancel()
+        self.__thread = threading.Thread(target = self.__run, args = (mode, 1.0 / float(rate), record, predictor, self.__stopEvent, self.__finished),
+                                         name = 'acquisition', daemon = True)
+        self.__thread.start()
+        return self.__finished
+
+    def stop(self):
+        self.__stopEvent.set()
+
+    def __run(self, mode, period, record, predictor, stopEvent, finished):
+        try:
+            self.__sample(mode, period, record, predictor, stopEvent)
+        except CancelledError:
+            #Session of device was closed together with its queue
+            finished.set_result(None)
+        except Exception as error:
+            #TimeoutError, instrumentError or unexpected error, reported by watcher of future
+            finished.set_exception(error)
+        else:
+            finished.set_result(None)
+
+    def __sample(self, mode, period, record, predictor, stopEvent):
+        pyVisa = self.__pyVisa
+        #False and None results mean that pyVisaInterface already reported error
+        if not pyVisa.submit(pyVisa.configureMeasure, mode, timeout = constants.COMMAND_TIMEOUT, priority = constants.PRIORITY_BACKGROUND).result():
+            return
+        if not pyVisa.submit(pyVisa.setMeasureRange, mode, predictor.getRange() if predictor is not None else None,
+                             timeout = constants.COMMAND_TIMEOUT, priority = constants.PRIORITY_BACKGROUND).result():
+            return
+
+        #Readings per burst, low rates read single value per sample period
+        count = max(1, int(round(constants.ACQUISITION_BURST_PERIOD / period)))
+        burstPeriod = count * period
+        nextBurst = time.monotonic()
+        while not stopEvent.is_set():
+            start = time.time()
+            values = pyVisa.submit(pyVisa.readBurst, count, timeout = constants.COMMAND_TIMEOUT, priority = constants.PRIORITY_BACKGROUND).result()
+            #Error was already reported by pyVisaInterface, do not flood user with next ones
+            if values is None:
+                return
+            #Readings are spread over time of burst
+            timestamps = np.linspace(start, time.time(), len(values))
+            if predictor is not None:
+                #Overloaded readings are dropped, range is changed before next burst
+                valid = np.abs(values) < predictor.getLimit()
+                newRange = predictor.observe(float(np.max(np.abs(values))) if len(values) else 0.0)
+                if not valid.all():
+                    timestamps, values = timestamps[valid], values[valid]
+                if newRange is not None:
+                    if not pyVisa.submit(pyVisa.setMeasureRange, mode, newRange, timeout = constants.COMMAND_TIMEOUT, priority = constants.PRIORITY_BACKGROUND).result():
+                        return
+            with self.__lock:
+                #Burst finished after stop belongs to nobody
+                if stopEvent.is_set():
+                    return
+                self.__buffer.extend(timestamps, values)
+            if record is not None:
+                record(timestamps, values)
+
+            #Fixed rate schedule, when device is slower than requested rate engine does not try to catch up
+            nextBurst = max(nextBurst + burstPeriod, time.monotonic())
+            stopEvent.wait(nextBurst - time.monotonic())
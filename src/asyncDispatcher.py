@@ -0,0 +1,133 @@
+import traceback
+from concurrent.futures import TimeoutError
+
+import pyvisa
+
+#Gui imports
+from PyQt5.QtCore import QObject, QTimer, pyqtSignal
+
+#Internal imports
+from errorBox import ui_ErrorBox
+from errorHandler import instrumentError
+
+#VISA status code for "Timeout expired before operation completed."
+TIMEOUT_ERROR_CODE = -1073807339
+#Error which is neither VISA nor instrument error, e.g. bug in worker function
+UNEXPECTED_ERROR_CODE = 1000000009
+
+class asyncDispatcher(QObject):
+    """
+    asyncDispatcher, bridge between instrument worker threads and GUI thread
+
+    Futures returned by pyVisaInterface.submit finish in worker thread.
+    Dispatcher moves their results into GUI thread through Qt signal,
+    so callbacks can safely touch widgets. Errors reported from worker thread
+    are shown in ui_ErrorBox in the same way. Exception is never raised from slot
+    (PyQt5 aborts application on it), unexpected exceptions of worker functions and
+    callbacks are written to log and shown as generic error.
+
+    Methods
+    -------
+    watch(self, future, callback = None, timeout = None, onError = None):
+        invokes callback with result of future in GUI thread, onError when future failed
+    reportError(self, errorCode):
+        thread safe replacement for creating ui_ErrorBox
+    cancelAll(self):
+        cancels all watched futures which did not finish yet
+    """
+
+    finished = pyqtSignal(object, object)
+    errorRaised = pyqtSignal(int)
+
+    def __init__(self, parent = None, logger = None):
+        """Initialization Method
+
+        Parameters
+        ----------
+        parent : QObject
+            owner of dispatcher, usually controller window
+        logger : instrumentLogger
+            log of unexpected errors, e.g. pyVisaInterface.getLogger()
+        """
+
+        super(asyncDispatcher, self).__init__(parent)
+        self.__pending = set()
+        self.__errorWindow = None
+        self.__logger = logger
+
+        self.finished.connect(self.__onFinished)
+        self.errorRaised.connect(self.__showError)
+
+    def watch(self, future, callback = None, timeout = None, onError = None):
+        """Function which waits for future without blocking GUI
+
+        Parameters
+        ----------
+        future : Future
+            future returned by pyVisaInterface.submit
+        callback : callable
+            function invoked in GUI thread with result of future
+        timeout : float
+            time in seconds after which future gets cancelled
+        onError : callable
+            function without parameters invoked in GUI thread after error was shown,
+            e.g. to enable buttons disabled for time of command
+        """
+
+        self.__pending.add(future)
+        future.add_done_callback(lambda done: self.finished.emit((callback, onError), done))
+        if timeout is not None:
+            QTimer.singleShot(int(timeout * 1000), lambda: self.__expire(future, onError))
+        return future
+
+    def reportError(self, errorCode):
+        self.errorRaised.emit(errorCode)
+
+    def cancelAll(self):
+        for future in list(self.__pending):
+            future.cancel()
+
+    def __expire(self, future, onError):
+        if future.cancel():
+            self.__showError(TIMEOUT_ERROR_CODE)
+            self.__call(onError)
+
+    def __onFinished(self, callbacks, future):
+        callback, onError = callbacks
+        self.__pending.discard(future)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is None:
+            if callback is not None and not self.__call(callback, future.result()):
+                self.__call(onError)
+            return
+        if isinstance(error, TimeoutError):
+            self.__showError(TIMEOUT_ERROR_CODE)
+        elif isinstance(error, pyvisa.errors.VisaIOError):
+            self.__showError(error.error_code)
+        elif isinstance(error, instrumentError):
+            self.__showError(error.info.code)
+        else:
+            self.__reportUnexpected(error)
+        self.__call(onError)
+
+    def __call(self, function, *args):
+        """Calls function in slot, returns False when it raised exception"""
+
+        if function is None:
+            return True
+        try:
+            function(*args)
+        except Exception as error:
+            self.__reportUnexpected(error)
+            return False
+        return True
+
+    def __reportUnexpected(self, error):
+        if self.__logger is not None:
+            self.__logger.log('Unexpected error: %s', ''.join(traceback.format_exception(type(error), error, error.__traceback__)).rstrip())
+        self.__showError(UNEXPECTED_ERROR_CODE)
+
+    def __showError(self, errorCode):
+        self.__errorWindow = ui_ErrorBox(errorCode)
@@ -0,0 +1,142 @@
+from collections import deque
+
+#Internal imports
+import constants
+from metricPrefix import prefixOf
+
+def rangePrefix(fullScale):
+    """Function which returns metric prefix in which full scale of range is shown, e.g. 0.1 -> ('m', 0.001)
+
+    Returns
+    -------
+    touple
+        sign of prefix and its factor, constants.signNone for ranges from 1 to 999
+    """
+
+    sign, factor = prefixOf(fullScale)
+    return sign or constants.signNone, factor
+
+class rangePredictor:
+    """
+    rangePredictor, fixed range of multimeter selected from history of readings
+
+    Autorange of instrument chooses range before every reading, which costs extra
+    time per sample. Predictor keeps device on fixed range and changes it only when
+    readings need it:
+        overload   - reading above overrange x full scale (device returns constants.OVERLOAD),
+                     next higher range is selected
+        underrange - all remembered peaks (constants.AUTORANGE_HISTORY) are below
+                     constants.AUTORANGE_UNDERRANGE x full scale of lower range,
+                     the lowest such range is selected at once
+    Predictor starts on the highest range, which can not overload, so first reading
+    tells which range is needed. Overloaded range is remembered as peak, so signal
+    near boundary does not switch ranges on every reading.
+
+    Methods
+    -------
+    getRange(self) : float
+        returns full scale of selected range
+    getLimit(self) : float
+        returns the largest reading which is valid on selected range
+    getChanges(self) : int
+        returns number of range changes
+    isOverload(self, value) : bool
+        returns True when reading is not valid on selected range
+    observe(self, peak) : float
+        takes the largest absolute reading since last call, returns new range or None when range stays
+    reset(self):
+        forgets history and selects the highest range
+    """
+
+    def __init__(self, ranges, overrange, history = constants.AUTORANGE_HISTORY, underrange = constants.AUTORANGE_UNDERRANGE):
+        """Initialization Method
+
+        Parameters
+        ----------
+        ranges : touple
+            full scale of every range, e.g. multimeterCapabilities.getRanges(mode)
+        overrange : float
+            part of full scale measured before overload, e.g. 1.2
+        history : int
+            number of remembered peaks
+        underrange : float
+            part of full scale of lower range which peaks must not exceed
+        """
+
+        self.__ranges = tuple(sorted(ranges))
+        self.__overrange = overrange
+        self.__underrange = underrange
+        self.__peaks = deque(maxlen = history)
+        self.__changes = 0
+        self.reset()
+
+    def reset(self):
+        self.__peaks.clear()
+        self.__index = len(self.__ranges) - 1
+
+    def getRange(self):
+        return self.__ranges[self.__index]
+
+    def getLimit(self):
+        return self.__ranges[self.__index] * self.__overrange
+
+    def getChanges(self):
+        return self.__changes
+
+    def isOverload(self, value):
+        #NaN is not valid reading either
+        return not abs(value) < self.getLimit()
+
+    def observe(self, peak):
+        if self.isOverload(peak):
+            self.__peaks.append(self.getLimit())
+            if self.__index == len(self.__ranges) - 1:
+                return None
+            self.__index += 1
+        else:
+            self.__peaks.append(abs(peak))
+            highest = max(self.__peaks)
+            index = 0
+            while index < self.__index and self.__ranges[index] * self.__underrange < highest:
+                index += 1
+            if index == self.__index:
+                return None
+            self.__index = index
+        self.__changes += 1
+        return self.getRange()
+
+def measureWithRange(pyVisa, mode, predictor):
+    """Function which measures one reading on range chosen by predictor, runs in worker thread of device
+
+    Overloaded reading is measured again on higher range, so at most one reading per range is taken.
+
+    Parameters
+    ----------
+    pyVisa : pyVisaInterface
+        VISA interface wrapper with opened multimeter
+    mode : str
+        multimeter mode, e.g. constants.VOLTAGE_DC
+    predictor : rangePredictor
+        range history of mode
+
+    Returns
+    -------
+    float
+        measured value, None on error or when input is above the highest range
+    """
+
+    if not pyVisa.configureMeasure(mode):
+        return None
+    while True:
+        if not pyVisa.setMeasureRange(mode, predictor.getRange()) or not pyVisa.initiateMeasure():
+            return None
+        value = pyVisa.fetchMeasure()
+        if value is None:
+            return None
+        overload = predictor.isOverload(value)
+        #Underrange only moves next reading to better range, overload on the highest range can not be repeated
+        if not overload:
+            predictor.observe(value)
+            return value
+        if predictor.observe(value) is None:
+            return None
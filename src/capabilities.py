@@ -0,0 +1,226 @@
+from collections import namedtuple
+
+import numpy as np
+
+#Internal imports
+import constants
+
+parameterLimit = namedtuple('parameterLimit', ['minimum', 'maximum', 'errorCode'])
+parameterLimit.__doc__ = """Allowed range of one parameter (bounds included) and error code reported outside of it"""
+
+#Capability tables of signal generators
+#frequency and modulationFrequency are keyed by waveform and modulation, offset is checked against maxVoltage:
+#|Voffset| + Vpp/2 <= Vmax and |Voffset| <= 2xVpp
+_GENERATOR_33120A = {
+    'frequency' : {
+        constants.SINUS : parameterLimit(100e-6, 15e6, 1100000001),
+        constants.SQUARE : parameterLimit(100e-6, 15e6, 1100000002),
+        constants.RAMP : parameterLimit(100e-6, 100e3, 1100000003),
+        constants.TRIANGLE : parameterLimit(100e-6, 100e3, 1100000004),
+        constants.NOISE : parameterLimit(100e-6, 15e3, 1100000005),
+        constants.DC : parameterLimit(100e-6, 15e3, 1100000006),
+        },
+    'amplitude' : parameterLimit(100e-3, 20.0, 1000000002),
+    'maxVoltage' : parameterLimit(0.0, 20.0, 1000000003),
+    'modulationFrequency' : {
+        constants.FM : parameterLimit(10e-3, 10e3, 1000000004),
+        constants.AM : parameterLimit(10e-3, 20e3, 1000000006),
+        },
+    'deviation' : parameterLimit(10e-3, 7.5e6, 1000000005),
+    'depth' : parameterLimit(0.0, 120.0, 1000000007),
+    }
+
+#Model field of *IDN? answer mapped to capability table, next models are added here
+MODELS = {
+    '33120A' : _GENERATOR_33120A,
+    }
+DEFAULT_MODEL = '33120A'
+
+#Range tables of multimeters, full scale of every range keyed by mode, every range measures up to
+#overrange x full scale. Modes without table (frequency, period) are left to autorange of instrument
+_MULTIMETER_34401A = {
+    'ranges' : {
+        constants.VOLTAGE_DC : (0.1, 1.0, 10.0, 100.0, 1000.0),
+        constants.VOLTAGE_AC : (0.1, 1.0, 10.0, 100.0, 750.0),
+        constants.CURRENT_DC : (0.01, 0.1, 1.0, 3.0),
+        constants.CURRENT_AC : (1.0, 3.0),
+        constants.RESISTANCE : (100.0, 1e3, 10e3, 100e3, 1e6, 10e6, 100e6),
+        constants.FRESISTANCE : (100.0, 1e3, 10e3, 100e3, 1e6, 10e6, 100e6),
+        },
+    'overrange' : 1.2,
+    }
+
+MULTIMETER_MODELS = {
+    '34401A' : _MULTIMETER_34401A,
+    }
+DEFAULT_MULTIMETER_MODEL = '34401A'
+
+def modelFromIdentity(identity, models, default):
+    """Function which finds model of *IDN? answer in models, e.g. "HEWLETT-PACKARD,33120A,0,7.0-5.0-1.0" -> "33120A"
+
+    Parameters
+    ----------
+    identity : str
+        answer for *IDN? query, None when device name is not known
+    models : dict
+        capability tables keyed by model
+    default : str
+        model used when identity is not recognized
+
+    Returns
+    -------
+    str
+        recognized model, otherwise default
+    """
+
+    if identity:
+        fields = [field.strip().upper() for field in identity.split(',')]
+        for field in fields[1:2] + fields:
+            if field in models:
+                return field
+    return default
+
+class generatorCapabilities:
+    """
+    generatorCapabilities, declarative limits of signal generator
+
+    Limits are taken from table of instrument model (MODELS), chosen by model
+    field of *IDN? answer. All checks are NumPy comparisons, so single setting
+    and whole sweep grid (arrays of frequency and amplitude) are validated with
+    the same code, 100k points in about millisecond.
+
+    Methods
+    -------
+    fromIdentity(identity) : generatorCapabilities
+        returns capabilities of model named in *IDN? answer, default model when unknown
+    getModel(self) : str
+        returns name of used capability table
+    validate(self, waveform, frequency, amplitude, offset = None, modulation = None, modulationFrequency = None, depthDeviation = None) : int
+        returns error code of first violated limit, None when all values are allowed
+    invalidPoints(self, waveform, frequency, amplitude, offset = None, modulation = None, modulationFrequency = None, depthDeviation = None) : numpy.ndarray
+        returns mask of points which violate any limit
+    """
+
+    def __init__(self, model = DEFAULT_MODEL):
+        self.__model = model
+        self.__table = MODELS[model]
+
+    @classmethod
+    def fromIdentity(cls, identity):
+        """Function which selects capability table from *IDN? answer, e.g. "HEWLETT-PACKARD,33120A,0,7.0-5.0-1.0"
+
+        Parameters
+        ----------
+        identity : str
+            answer for *IDN? query, None when device name is not known
+
+        Returns
+        -------
+        generatorCapabilities
+            capabilities of recognized model, otherwise of DEFAULT_MODEL
+        """
+
+        return cls(modelFromIdentity(identity, MODELS, DEFAULT_MODEL))
+
+    def getModel(self):
+        return self.__model
+
+    def validate(self, waveform, frequency, amplitude, offset = None, modulation = None, modulationFrequency = None, depthDeviation = None):
+        """Function which checks settings against limits of instrument
+
+        Any numeric parameter can be scalar or array, arrays are checked element by element
+        with broadcasting. None means parameter is not set (e.g. DEFault) and is not checked.
+
+        Parameters
+        ----------
+        waveform : str
+            waveform, e.g. constants.SINUS
+        frequency : float or numpy.ndarray
+            frequency in Hz
+        amplitude : float or numpy.ndarray
+            amplitude in Vpp
+        offset : float or numpy.ndarray
+            DC offset in V
+        modulation : str
+            constants.AM, constants.FM or None without modulation
+        modulationFrequency : float or numpy.ndarray
+            frequency of modulating signal in Hz
+        depthDeviation : float or numpy.ndarray
+            depth in % for AM, deviation in Hz for FM
+
+        Returns
+        -------
+        int
+            error code of first violated limit, None when settings are allowed
+        """
+
+        for errorCode, invalid in self.__checks(waveform, frequency, amplitude, offset, modulation, modulationFrequency, depthDeviation):
+            if invalid.any():
+                return errorCode
+        return None
+
+    def invalidPoints(self, waveform, frequency, amplitude, offset = None, modulation = None, modulationFrequency = None, depthDeviation = None):
+        """Function which returns boolean mask (broadcasted shape of parameters) of settings violating any limit"""
+
+        mask = np.zeros(np.broadcast(*[np.asarray(value, dtype = np.float64) for value in
+                                       (frequency, amplitude, offset, modulationFrequency, depthDeviation) if value is not None]).shape, dtype = bool)
+        for _, invalid in self.__checks(waveform, frequency, amplitude, offset, modulation, modulationFrequency, depthDeviation):
+            mask |= invalid
+        return mask
+
+    def __checks(self, waveform, frequency, amplitude, offset, modulation, modulationFrequency, depthDeviation):
+        table = self.__table
+        if frequency is not None and waveform in table['frequency']:
+            yield self.__outside(table['frequency'][waveform], frequency)
+        if amplitude is not None:
+            yield self.__outside(table['amplitude'], amplitude)
+        if offset is not None and amplitude is not None:
+            limit = table['maxVoltage']
+            offset = np.abs(np.asarray(offset, dtype = np.float64))
+            amplitude = np.asarray(amplitude, dtype = np.float64)
+            yield limit.errorCode, (offset + amplitude / 2 > limit.maximum) | (offset > 2 * amplitude)
+        if modulation in table['modulationFrequency']:
+            if modulationFrequency is not None:
+                yield self.__outside(table['modulationFrequency'][modulation], modulationFrequency)
+            if depthDeviation is not None:
+                yield self.__outside(table['deviation'] if modulation == constants.FM else table['depth'], depthDeviation)
+
+    def __outside(self, limit, value):
+        value = np.asarray(value, dtype = np.float64)
+        return limit.errorCode, ~((value >= limit.minimum) & (value <= limit.maximum))
+
+class multimeterCapabilities:
+    """
+    multimeterCapabilities, measurement ranges of multimeter
+
+    Ranges are taken from table of instrument model (MULTIMETER_MODELS), chosen by model
+    field of *IDN? answer.
+
+    Methods
+    -------
+    fromIdentity(identity) : multimeterCapabilities
+        returns capabilities of model named in *IDN? answer, default model when unknown
+    getModel(self) : str
+        returns name of used capability table
+    getRanges(self, mode) : touple
+        returns full scale of every range of mode from the lowest one, None when mode has no fixed ranges
+    getOverrange(self) : float
+        returns part of full scale which can be measured before overload, e.g. 1.2
+    """
+
+    def __init__(self, model = DEFAULT_MULTIMETER_MODEL):
+        self.__model = model
+        self.__table = MULTIMETER_MODELS[model]
+
+    @classmethod
+    def fromIdentity(cls, identity):
+        return cls(modelFromIdentity(identity, MULTIMETER_MODELS, DEFAULT_MULTIMETER_MODEL))
+
+    def getModel(self):
+        return self.__model
+
+    def getRanges(self, mode):
+        return self.__table['ranges'].get(mode)
+
+    def getOverrange(self):
+        return self.__table['overrange']
@@ -1,21 +1,26 @@
-import sys
-
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import QRegExpValidator
 
 #Internal imports
-from pV import pyVisaInterface
+from uiLoader import loadForm
+from asyncDispatcher import asyncDispatcher
 
 class ui_ChooseDevice(QtWidgets.QMainWindow):
+
+    deviceFound = pyqtSignal(object)
+
     def __init__(self, pyVisa, callBack):
         super(ui_ChooseDevice, self).__init__()
         self.__pyVisa = pyVisa
         self.__callBack = callBack
+        self.__dispatcher = asyncDispatcher(self, self.__pyVisa.getLogger())
+        self.__items = {}
+        self.deviceFound.connect(self.__appendDevice)
 
-        uic.loadUi("../UI/choosePanel.ui", self)
+        loadForm("choosePanel", self)
 
         self.__listWidget = self.findChild(QtWidgets.QListWidget, 'listWidget')
 
@@ -35,15 +40,38 @@ class ui_ChooseDevice(QtWidgets.QMainWindow):
         self.show()
 
     def __loadItemsToList(self):
-        for x in self.__pyVisa.listOfResources():
-            item = QListWidgetItem(x)
+        #Cached devices are shown instantly, changed ports are probed in background
+        discovery = self.__pyVisa.getDiscovery()
+        for device in discovery.cached():
+            self.__appendDevice(device)
+        self.__dispatcher.watch(discovery.refresh(self.deviceFound.emit), self.__callBackDevicesListed)
+
+    def __callBackDevicesListed(self, devices):
+        addresses = set()
+        for device in devices:
+            self.__appendDevice(device)
+            addresses.add(device.address)
+        for address in list(self.__items):
+            if address not in addresses:
+                self.__listWidget.takeItem(self.__listWidget.row(self.__items.pop(address)))
+
+    def __appendDevice(self, device):
+        item = self.__items.get(device.address)
+        if item is None:
+            item = QListWidgetItem()
+            item.setData(Qt.UserRole, device.address)
             self.__listWidget.addItem(item)
+            self.__items[device.address] = item
+        if device.identity:
+            item.setText(device.address + '  ' + device.identity)
+        else:
+            item.setText(device.address)
 
     def __confirmMethod(self):
         if self.__listWidget.currentItem() is None:
             self.__cancelMethod()
         else:
-            self.__callBack(self.__listWidget.currentItem().text(), self.__lineEditBaudRate.text())
+            self.__callBack(self.__listWidget.currentItem().data(Qt.UserRole), self.__lineEditBaudRate.text())
             self.__cancelMethod()
 
     def __cancelMethod(self):
@@ -1,12 +1,10 @@
-import sys
-import numpy as np
-
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 
 #Internal imports
+from uiLoader import loadForm
 import constants
 
 class ui_ChooseType(QtWidgets.QWidget):
@@ -15,7 +13,7 @@ class ui_ChooseType(QtWidgets.QWidget):
         self.__callBack = callBack
         self.__external = external
 
-        uic.loadUi("../UI/chooseType.ui", self)
+        loadForm("chooseType", self)
 
         self.__multimeterButton = self.findChild(QtWidgets.QPushButton, 'multimeterButton')
         self.__multimeterButton.clicked.connect(self.__multimeter)
@@ -0,0 +1,233 @@
+"""Command line interface for measurements and generator setups without GUI
+
+Examples (run from src directory):
+    python cli.py list --probe
+    python cli.py measure ASRL1::INSTR --mode VOLT:DC --count 10 --rate 5
+    python cli.py generate ASRL2::INSTR --waveform SIN --frequency 4.7k --amplitude "500 mVpp"
+    python cli.py sweep ASRL2::INSTR ASRL1::INSTR --start 10 --stop 100k --points 50 --log --output sweep.csv
+    python cli.py capture TCPIP0::scope::INSTR --channel 1 --output capture.npy
+    python cli.py measure ASRL1::INSTR --mode VOLT:AC --count 100000 --store measurements/run1
+    python cli.py --stats stats.prom sweep ASRL2::INSTR ASRL1::INSTR --start 10 --stop 1000 --points 20
+
+Module does not import PyQt5, so it starts fast on headless machines.
+"""
+
+import sys
+import time
+import argparse
+
+import numpy as np
+
+#Internal imports
+import constants
+from errorHandler import instrumentError
+from instrumentLogger import streamOutput
+from instrumentMetrics import instrumentMetrics
+from sessionPool import sessionPool
+from pV import pyVisaInterface
+from sweepEngine import sweepEngine, sweepGrid
+from measurementStore import measurementStore
+from metricPrefix import parseValue, formatValue, formatArray
+
+def shortForm(string):
+    return ''.join(c for c in string if c.isupper() or c == ':')
+
+MODES = {shortForm(mode) : mode for mode in (constants.VOLTAGE_DC, constants.VOLTAGE_AC, constants.CURRENT_DC,
+                                             constants.CURRENT_AC, constants.RESISTANCE, constants.FRESISTANCE,
+                                             constants.FREQUENCY, constants.PERIOD)}
+WAVEFORMS = {shortForm(waveform) : waveform for waveform in (constants.SINUS, constants.SQUARE, constants.TRIANGLE,
+                                                             constants.RAMP, constants.NOISE, constants.DC)}
+FORMATS = {'ASC' : constants.READINGS_ASCII, 'REAL' : constants.READINGS_REAL}
+UNITS = {constants.VOLTAGE_DC : constants.unitVoltage, constants.VOLTAGE_AC : constants.unitVoltage,
+         constants.CURRENT_DC : constants.unitCurrent, constants.CURRENT_AC : constants.unitCurrent,
+         constants.RESISTANCE : constants.unitResistance, constants.FRESISTANCE : constants.unitResistance,
+         constants.FREQUENCY : constants.unitFrequency, constants.PERIOD : constants.unitPeroid}
+CHANNELS = {'1' : constants.CHANNEL1, '2' : constants.CHANNEL2, '3' : constants.CHANNEL3, '4' : constants.CHANNEL4}
+
+def valueIn(unit):
+    """Function which returns argparse type reading value in engineering notation, e.g. 4.7k or 120m"""
+
+    def value(text):
+        try:
+            return parseValue(text, unit)
+        except ValueError as error:
+            raise argparse.ArgumentTypeError(str(error))
+    return value
+
+def openInstrument(pool, output, address, baudRate, caller):
+    """Function which opens and configures device, raises instrumentError on failure"""
+
+    instrument = pyVisaInterface(pool, output, caller)
+    def open():
+        instrument.openResource(address)
+        instrument.configureCommunication(baudRate)
+    #Like in GUI, device is opened and configured by worker of its command queue
+    instrument.submit(open, address = address).result()
+    if not instrument.getDeviceStatus() == constants.CONFIGURED:
+        raise instrumentError(1000000101)
+    return instrument
+
+def listDevices(pool, output, arguments):
+    discovery = pool.getDiscovery()
+    devices = discovery.refresh().result() if arguments.probe else [(address, None) for address in pool.listResources()]
+    for address, identity in devices:
+        print(address if identity is None else '%s\t%s' % (address, identity))
+
+def measure(pool, output, arguments):
+    multimeter = openInstrument(pool, output, arguments.address, arguments.baud, constants.MULTIMETER)
+    mode = MODES[arguments.mode]
+    store = measurementStore(arguments.store) if arguments.store else None
+    multimeter.submit(multimeter.configureMeasure, mode).result()
+    if not arguments.rate:
+        #As fast as device can, all readings in one burst
+        start = time.perf_counter()
+        startTime = time.time()
+        values = multimeter.submit(multimeter.readBurst, arguments.count, FORMATS[arguments.format]).result()
+        elapsed = time.perf_counter() - start
+        if arguments.engineering:
+            sys.stdout.write(''.join(line + '\n' for line in formatArray(values, UNITS[mode])))
+        else:
+            np.savetxt(sys.stdout, values, fmt = '%.10g')
+        if store is not None:
+            store.append(arguments.address, mode, UNITS[mode], np.linspace(startTime, time.time(), len(values)), values)
+        if output is not None:
+            output.addItem('%d readings, %.1f readings/s' % (len(values), len(values) / elapsed if elapsed else 0.0))
+    else:
+        period = 1.0 / arguments.rate
+        nextSample = time.monotonic()
+        for _ in range(arguments.count):
+            multimeter.submit(multimeter.initiateMeasure).result()
+            timestamp = time.time()
+            value = multimeter.submit(multimeter.fetchMeasure).result()
+            print('%.6f\t%s' % (timestamp, formatValue(value, UNITS[mode]) if arguments.engineering else '%.10g' % value))
+            if store is not None and value is not None:
+                store.append(arguments.address, mode, UNITS[mode], timestamp, value)
+            nextSample = max(nextSample + period, time.monotonic())
+            time.sleep(nextSample - time.monotonic())
+    if store is not None:
+        store.close()
+    multimeter.closeResource()
+
+def generate(pool, output, arguments):
+    generator = openInstrument(pool, output, arguments.address, arguments.baud, constants.SIGNALGENERATOR)
+    def write():
+        generator.beginBatch()
+        try:
+            generator.insertWaveform(WAVEFORMS[arguments.waveform])
+            generator.insertFrequency('%.10g' % arguments.frequency)
+            generator.insertAmplitude('%.10g' % arguments.amplitude, '' if arguments.offset is None else '%.10g' % arguments.offset)
+            return generator.commitBatch()
+        finally:
+            generator.discardBatch()
+    generator.submit(write).result()
+    generator.closeResource()
+
+def sweep(pool, output, arguments):
+    generator = openInstrument(pool, output, arguments.generator, arguments.baud, constants.SIGNALGENERATOR)
+    multimeter = openInstrument(pool, output, arguments.multimeter, arguments.baud, constants.MULTIMETER)
+    frequencies = sweepGrid(arguments.start, arguments.stop, arguments.points,
+                            constants.SWEEP_LOG if arguments.log else constants.SWEEP_LINEAR)
+    engine = sweepEngine(generator, multimeter)
+    results = engine.run(frequencies, arguments.amplitude, MODES[arguments.mode], arguments.settle,
+                         waveform = WAVEFORMS[arguments.waveform])
+    if output is not None:
+        output.addItem('%d points, %.1f points/s' % (len(results), engine.getRate()))
+    if arguments.store:
+        store = measurementStore(arguments.store)
+        store.appendRecords(arguments.multimeter, MODES[arguments.mode], UNITS[MODES[arguments.mode]], results)
+        store.close()
+
+    if arguments.output and arguments.output.endswith('.npy'):
+        np.save(arguments.output, results)
+    else:
+        #Epoch timestamps need fixed notation, %g would round them to 10 digits
+        formats = ['%.6f' if name == 'timestamp' else '%.10g' for name in results.dtype.names]
+        np.savetxt(arguments.output or sys.stdout, results, fmt = formats, delimiter = ',',
+                   header = ','.join(results.dtype.names), comments = '')
+    generator.closeResource()
+    multimeter.closeResource()
+
+def capture(pool, output, arguments):
+    oscilloscope = openInstrument(pool, output, arguments.address, arguments.baud, constants.OSCILLOSCOPE)
+    times, volts = oscilloscope.submit(oscilloscope.captureWaveform, CHANNELS[arguments.channel], arguments.format).result()
+    if arguments.output and arguments.output.endswith('.npy'):
+        np.save(arguments.output, np.column_stack((times, volts)))
+    else:
+        np.savetxt(arguments.output or sys.stdout, np.column_stack((times, volts)), fmt = '%.10g', delimiter = ',',
+                   header = 'time,voltage', comments = '')
+    oscilloscope.closeResource()
+
+def createParser():
+    parser = argparse.ArgumentParser(description = 'Control measurement devices without GUI')
+    parser.add_argument('--backend', default = '', help = 'pyVisa backend, e.g. @py, @sim or path to visa library, system VISA by default')
+    parser.add_argument('--baud', default = '9600', help = 'baud rate of serial devices')
+    parser.add_argument('--interval', type = float, default = constants.DEVICE_MIN_INTERVAL,
+                        help = 'minimal time in seconds between commands of one device, e.g. for slow serial instruments')
+    parser.add_argument('--quiet', action = 'store_true', help = 'do not print log records')
+    parser.add_argument('--stats', help = 'write I/O statistics at exit, Prometheus text for .prom/.txt, JSON lines otherwise')
+    commands = parser.add_subparsers(dest = 'command', required = True)
+
+    command = commands.add_parser('list', help = 'list avalivable devices')
+    command.add_argument('--probe', action = 'store_true', help = 'ask every device for its name')
+    command.set_defaults(function = listDevices)
+
+    command = commands.add_parser('measure', help = 'read multimeter')
+    command.add_argument('address')
+    command.add_argument('--mode', choices = sorted(MODES), default = 'VOLT:DC')
+    command.add_argument('--count', type = int, default = 1)
+    command.add_argument('--rate', type = float, default = 0.0, help = 'readings per second, 0 reads all of them in one burst')
+    command.add_argument('--format', choices = sorted(FORMATS), default = 'ASC', help = 'format of burst readings, REAL is binary')
+    command.add_argument('--store', help = 'directory of measurement store, readings are appended to it')
+    command.add_argument('--engineering', action = 'store_true', help = 'print readings with metric prefix and unit, e.g. 120 mV')
+    command.set_defaults(function = measure)
+
+    command = commands.add_parser('generate', help = 'set signal generator')
+    command.add_argument('address')
+    command.add_argument('--waveform', choices = sorted(WAVEFORMS), default = 'SIN')
+    command.add_argument('--frequency', type = valueIn(constants.unitFrequency), required = True, help = 'frequency in Hz, e.g. 1000, 4.7k or "2 MHz"')
+    command.add_argument('--amplitude', type = valueIn(constants.unitAmplitude), required = True, help = 'amplitude in Vpp, e.g. 2 or 500m')
+    command.add_argument('--offset', type = valueIn(constants.unitVoltage), help = 'DC offset in V')
+    command.set_defaults(function = generate)
+
+    command = commands.add_parser('sweep', help = 'frequency sweep of generator measured by multimeter')
+    command.add_argument('generator')
+    command.add_argument('multimeter')
+    command.add_argument('--start', type = valueIn(constants.unitFrequency), required = True, help = 'first frequency in Hz')
+    command.add_argument('--stop', type = valueIn(constants.unitFrequency), required = True, help = 'last frequency in Hz')
+    command.add_argument('--points', type = int, default = 10)
+    command.add_argument('--log', action = 'store_true', help = 'logarithmic spacing of frequencies')
+    command.add_argument('--amplitude', type = valueIn(constants.unitAmplitude), nargs = '+', default = [1.0], help = 'one or more amplitudes in Vpp')
+    command.add_argument('--waveform', choices = sorted(WAVEFORMS), default = 'SIN')
+    command.add_argument('--mode', choices = sorted(MODES), default = 'VOLT:AC')
+    command.add_argument('--settle', type = float, default = constants.SWEEP_SETTLE_TIME, help = 'settle time in seconds')
+    command.add_argument('--output', help = '.csv or .npy file, CSV on standard output by default')
+    command.add_argument('--store', help = 'directory of measurement store, sweep points are appended to it')
+    command.set_defaults(function = sweep)
+
+    command = commands.add_parser('capture', help = 'read oscilloscope waveform')
+    command.add_argument('address')
+    command.add_argument('--channel', choices = sorted(CHANNELS), default = '1')
+    command.add_argument('--format', choices = (constants.WAVEFORM_BYTE, constants.WAVEFORM_WORD), default = constants.WAVEFORM_BYTE)
+    command.add_argument('--output', help = '.csv or .npy file, CSV on standard output by default')
+    command.set_defaults(function = capture)
+    return parser
+
+def main(argv = None):
+    arguments = createParser().parse_args(argv)
+    output = None if arguments.quiet else streamOutput()
+    #I/O is measured only on request, otherwise resources are not wrapped at all
+    metrics = instrumentMetrics() if arguments.stats else None
+    pool = sessionPool(arguments.backend, metrics = metrics, minInterval = arguments.interval)
+    try:
+        arguments.function(pool, output, arguments)
+    except instrumentError as error:
+        sys.stderr.write(str(error) + '\n')
+        return 1
+    finally:
+        if metrics is not None:
+            metrics.export(arguments.stats)
+        pool.closeAll()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
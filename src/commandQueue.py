@@ -0,0 +1,196 @@
+import time
+from collections import deque
+from concurrent.futures import Future, TimeoutError
+
+#Internal imports
+import constants
+
+class commandQueue:
+    """
+    commandQueue, commands of one instrument waiting for execution
+
+    Queue has no thread, it is served by worker thread of physical bus of device
+    (see commandScheduler), so slow device blocks only devices on the same bus and
+    never GUI thread. Commands of one device are executed one by one, lower priority
+    value first, commands with the same priority in order of submission. Next command
+    of device does not start earlier than minInterval after start of previous one.
+    Each submitted command returns concurrent.futures.Future which can be cancelled
+    while it waits in queue.
+
+    Methods
+    -------
+    submit(self, function, *args, timeout = None, priority = constants.PRIORITY_USER, **kwargs) : Future
+        puts command into queue
+    depth(self) : int
+        returns number of commands waiting in queue
+    cancelPending(self):
+        cancels all commands which did not start yet
+    stop(self):
+        finishes queue after already queued commands, later commands are cancelled
+    setMinInterval(self, seconds):
+        sets minimal time between starts of two commands
+    getMinInterval(self) : float
+        returns minimal time between starts of two commands
+    finished(self) : Future
+        returns future which is done when queue is stopped, empty and its last command returned
+
+    Used by bus worker of commandScheduler, only with lock of bus held:
+    nextPriority(self) : int
+        returns priority of next command, None when queue is empty
+    readyAt(self) : float
+        returns monotonic time from which next command may start
+    take(self, now) : touple
+        removes next command which was not cancelled, None when there is no such command
+    isFinished(self) : bool
+        returns True when queue is stopped and empty
+
+    Used by bus worker of commandScheduler without lock of bus:
+    done(self):
+        informs queue that command returned by take was executed
+    """
+
+    def __init__(self, name, condition, minInterval = constants.DEVICE_MIN_INTERVAL):
+        """Initialization Method
+
+        Parameters
+        ----------
+        name : str
+            name of queue, usually address of device
+        condition : threading.Condition
+            condition of bus worker, notified about every new command
+        minInterval : float
+            minimal time in seconds between starts of two commands
+        """
+
+        self.name = name
+        self.__condition = condition
+        self.__minInterval = minInterval
+        #deque of commands keyed by priority
+        self.__pending = {}
+        self.__count = 0
+        self.__readyAt = 0.0
+        self.__stopped = False
+        #Command taken by bus worker is being executed
+        self.__running = False
+        self.__finished = Future()
+        self.__finishedSet = False
+
+    def submit(self, function, *args, timeout = None, priority = constants.PRIORITY_USER, **kwargs):
+        """Function which queues command
+
+        Parameters
+        ----------
+        function : callable
+            function executed in worker thread
+        timeout : float
+            time in seconds in which command has to start, otherwise
+            future fails with TimeoutError and command is not executed
+        priority : int
+            constants.PRIORITY_USER or constants.PRIORITY_BACKGROUND, lower is executed first
+
+        Returns
+        -------
+        Future
+            future with result of function
+        """
+
+        future = Future()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self.__condition:
+            if self.__stopped:
+                future.cancel()
+                return future
+            commands = self.__pending.get(priority)
+            if commands is None:
+                commands = self.__pending[priority] = deque()
+            commands.append((future, deadline, function, args, kwargs))
+            self.__count += 1
+            self.__condition.notify_all()
+        return future
+
+    def depth(self):
+        return self.__count
+
+    def cancelPending(self):
+        with self.__condition:
+            for commands in self.__pending.values():
+                for item in commands:
+                    item[0].cancel()
+            self.__pending.clear()
+            self.__count = 0
+            self.__condition.notify_all()
+            finished = self.__reportFinished()
+        if finished:
+            self.__finished.set_result(None)
+
+    def stop(self):
+        with self.__condition:
+            self.__stopped = True
+            self.__condition.notify_all()
+            finished = self.__reportFinished()
+        if finished:
+            self.__finished.set_result(None)
+
+    def setMinInterval(self, seconds):
+        with self.__condition:
+            self.__readyAt += seconds - self.__minInterval
+            self.__minInterval = seconds
+            self.__condition.notify_all()
+
+    def getMinInterval(self):
+        return self.__minInterval
+
+    def finished(self):
+        return self.__finished
+
+    def nextPriority(self):
+        if not self.__count:
+            return None
+        return min(priority for priority, commands in self.__pending.items() if commands)
+
+    def readyAt(self):
+        return self.__readyAt
+
+    def take(self, now):
+        while self.__count:
+            commands = self.__pending[self.nextPriority()]
+            item = commands.popleft()
+            self.__count -= 1
+            if not item[0].cancelled():
+                self.__readyAt = now + self.__minInterval
+                self.__running = True
+                return item
+        return None
+
+    def isFinished(self):
+        return self.__stopped and not self.__count
+
+    def done(self):
+        with self.__condition:
+            self.__running = False
+            finished = self.__reportFinished()
+        if finished:
+            #Callbacks of finished future (e.g. closing of resource) run without lock of bus
+            self.__finished.set_result(None)
+
+    def __reportFinished(self):
+        """Returns True only once, when queue got stopped, empty and idle, called with lock of bus held"""
+
+        if self.__finishedSet or not self.__stopped or self.__count or self.__running:
+            return False
+        self.__finishedSet = True
+        return True
+
+def execute(item):
+    """Function which executes command taken from commandQueue and sets result of its future"""
+
+    future, deadline, function, args, kwargs = item
+    if not future.set_running_or_notify_cancel():
+        return
+    if deadline is not None and time.monotonic() > deadline:
+        future.set_exception(TimeoutError('Command expired before execution'))
+        return
+    try:
+        future.set_result(function(*args, **kwargs))
+    except Exception as error:
+        future.set_exception(error)
@@ -0,0 +1,202 @@
+import time
+import threading
+
+#Internal imports
+import constants
+from commandQueue import commandQueue, execute
+
+def busOf(address):
+    """Function which returns name of physical bus of device, e.g. "GPIB0::22::INSTR" -> "GPIB0"
+
+    Devices of one GPIB board share one bus and serial port is bus of its own. LAN and USB
+    devices have independent links, so every such device is its own bus.
+    """
+
+    interface = address.split('::', 1)[0].upper()
+    if interface.startswith('GPIB') and not interface.startswith('GPIB-VXI'):
+        return interface if interface[4:].isdigit() else 'GPIB0'
+    if interface.startswith('ASRL'):
+        return address.split('::', 1)[0]
+    return address
+
+class busWorker:
+    """
+    busWorker, worker thread which executes commands of all devices of one bus
+
+    One command runs on bus at a time. Next command is taken from device whose
+    next command has the lowest priority value and whose minimal interval has
+    already passed, devices with the same priority take turns (round robin), so
+    busy device can not starve others. Device waiting for its interval does not
+    block the bus, commands of other devices run meanwhile. Thread finishes when
+    all queues of bus are stopped and empty, and starts again with new queue.
+
+    Methods
+    -------
+    attach(self, queue):
+        adds commandQueue of device on this bus
+    getCondition(self) : threading.Condition
+        returns condition guarding all queues of bus
+    """
+
+    def __init__(self, name):
+        self.__name = name
+        self.__condition = threading.Condition()
+        self.__queues = []
+        self.__thread = None
+
+    def getCondition(self):
+        return self.__condition
+
+    def attach(self, queue):
+        with self.__condition:
+            self.__queues.append(queue)
+            if self.__thread is None:
+                self.__thread = threading.Thread(target = self.__run, name = self.__name, daemon = True)
+                self.__thread.start()
+
+    def __run(self):
+        while True:
+            with self.__condition:
+                while True:
+                    self.__queues = [queue for queue in self.__queues if not queue.isFinished()]
+                    if not self.__queues:
+                        self.__thread = None
+                        return
+                    now = time.monotonic()
+                    queue, wakeUp = self.__select(now)
+                    if queue is not None:
+                        item = queue.take(now)
+                        #Served device goes to the end of round
+                        self.__queues.remove(queue)
+                        self.__queues.append(queue)
+                        if item is not None:
+                            break
+                    else:
+                        self.__condition.wait(None if wakeUp is None else wakeUp - now)
+            execute(item)
+            queue.done()
+
+    def __select(self, now):
+        """Returns queue of next command and time when waiting device gets ready (None when nothing waits)"""
+
+        selected = None
+        best = None
+        wakeUp = None
+        for queue in self.__queues:
+            priority = queue.nextPriority()
+            if priority is None:
+                continue
+            readyAt = queue.readyAt()
+            if readyAt > now:
+                wakeUp = readyAt if wakeUp is None else min(wakeUp, readyAt)
+            elif best is None or priority < best:
+                selected, best = queue, priority
+        return selected, wakeUp
+
+class commandScheduler:
+    """
+    commandScheduler, central dispatcher of I/O of all instruments
+
+    Every device has commandQueue, queues of devices which share physical bus
+    (see busOf) are served by one busWorker, so two multimeters on one GPIB board
+    never contend for it and get fair share of it, while devices on different buses
+    run in parallel. Commands of user (constants.PRIORITY_USER) go ahead of background
+    acquisition (constants.PRIORITY_BACKGROUND), minimal interval between commands
+    can be set for every device, e.g. for slow serial instruments.
+
+    Commands must not wait for results of other commands of the same bus, that would
+    block the bus worker, functions executed in worker call methods of pyVisaInterface directly.
+
+    Methods
+    -------
+    getQueue(self, address) : commandQueue
+        returns queue of device, creates it when necessary
+    remove(self, address, cancel = False) : commandQueue
+        stops queue of device after already queued commands or cancels them, returns removed queue
+    setMinInterval(self, address, seconds):
+        sets minimal time between starts of two commands of device, also for its later queues
+    getQueueDepths(self) : dict
+        returns number of waiting commands keyed by address
+    getBuses(self) : dict
+        returns addresses of devices keyed by name of bus
+    stopAll(self):
+        cancels waiting commands and stops all queues
+    """
+
+    def __init__(self, minInterval = constants.DEVICE_MIN_INTERVAL):
+        """Initialization Method
+
+        Parameters
+        ----------
+        minInterval : float
+            default minimal time in seconds between starts of two commands of one device
+        """
+
+        self.__minInterval = minInterval
+        self.__intervals = {}
+        self.__queues = {}
+        self.__buses = {}
+        self.__lock = threading.Lock()
+
+    def getQueue(self, address):
+        with self.__lock:
+            queue = self.__queues.get(address)
+            if queue is None:
+                name = busOf(address)
+                bus = self.__buses.get(name)
+                if bus is None:
+                    bus = self.__buses[name] = busWorker(name)
+                queue = commandQueue(address, bus.getCondition(), self.__intervals.get(address, self.__minInterval))
+                bus.attach(queue)
+                self.__queues[address] = queue
+            return queue
+
+    def remove(self, address, cancel = False):
+        """Function which removes queue of device, next getQueue creates new one
+
+        Parameters
+        ----------
+        address : str
+            VISA resource string of device
+        cancel : bool
+            cancels commands which did not start yet, otherwise they are still executed
+
+        Returns
+        -------
+        commandQueue
+            removed queue, its finished() tells when its last command returned, None when device had no queue
+        """
+
+        with self.__lock:
+            queue = self.__queues.pop(address, None)
+        if queue is not None:
+            if cancel:
+                queue.cancelPending()
+            queue.stop()
+        return queue
+
+    def setMinInterval(self, address, seconds):
+        with self.__lock:
+            self.__intervals[address] = seconds
+            queue = self.__queues.get(address)
+        if queue is not None:
+            queue.setMinInterval(seconds)
+
+    def getQueueDepths(self):
+        with self.__lock:
+            return {address : queue.depth() for address, queue in self.__queues.items()}
+
+    def getBuses(self):
+        with self.__lock:
+            buses = {}
+            for address in self.__queues:
+                buses.setdefault(busOf(address), []).append(address)
+            return buses
+
+    def stopAll(self):
+        with self.__lock:
+            queues = list(self.__queues.values())
+            self.__queues.clear()
+        for queue in queues:
+            queue.cancelPending()
+            queue.stop()
@@ -0,0 +1,160 @@
+import time
+import threading
+
+import pyvisa
+from pyvisa.constants import EventType, EventMechanism, InterfaceType, StatusCode
+
+#Internal imports
+import constants
+
+#Mechanisms of waiting for operation complete
+HANDLER = "HANDLER"
+QUEUE = "QUEUE"
+POLLING = "POLLING"
+NONE = "NONE"
+
+class completionWaiter:
+    """
+    completionWaiter, waits until device finishes pending operations
+
+    Device is asked to set OPC bit of Standard Event Status Register (*OPC), ESB bit
+    of status byte is mapped into service request (*ESE 1, *SRE 32). Waiter uses the best
+    mechanism supported by backend and interface:
+        HANDLER - VISA event handler installed for service request,
+        QUEUE   - VISA event queue with wait_on_event,
+        POLLING - *ESR? polling with adaptive interval, used for serial devices
+                  and backends without SRQ support,
+        NONE    - device does not implement status reporting, nothing to wait for.
+    Mechanism is detected on first wait and kept for lifetime of session.
+
+    Methods
+    -------
+    wait(self, timeout = constants.COMPLETION_TIMEOUT):
+        waits until all previously sent operations are finished
+    getMechanism(self) : str
+        returns used mechanism, None before first wait
+    close(self):
+        removes installed handler
+    """
+
+    def __init__(self, instrument, observer = None):
+        """Initialization Method
+
+        Parameters
+        ----------
+        instrument : pyvisa.resources.MessageBasedResource
+            opened device
+        observer : callable
+            invoked with duration of every wait in seconds, None when waits are not measured
+        """
+
+        self.__instrument = instrument
+        self.__observer = observer
+        self.__mechanism = None
+        self.__ready = threading.Event()
+        self.__handler = None
+        self.__userHandle = None
+        self.__expected = constants.COMPLETION_POLL_MIN
+
+    def getMechanism(self):
+        return self.__mechanism
+
+    def wait(self, timeout = constants.COMPLETION_TIMEOUT):
+        """Function which blocks until device reports operation complete
+
+        Parameters
+        ----------
+        timeout : float
+            maximal time of waiting in seconds
+
+        Raises
+        ------
+        pyvisa.errors.VisaIOError
+            VI_ERROR_TMO when device did not finish in time
+        """
+
+        if self.__mechanism is None:
+            self.__mechanism = self.__detectMechanism()
+
+        start = time.monotonic()
+        if self.__mechanism == HANDLER:
+            self.__ready.clear()
+            self.__instrument.write('*OPC')
+            if not self.__ready.wait(timeout):
+                raise pyvisa.errors.VisaIOError(StatusCode.error_timeout)
+            self.__instrument.query('*ESR?')
+        elif self.__mechanism == QUEUE:
+            self.__instrument.discard_events(EventType.service_request, EventMechanism.queue)
+            self.__instrument.write('*OPC')
+            self.__instrument.wait_on_event(EventType.service_request, int(timeout * 1000))
+            self.__instrument.query('*ESR?')
+        elif self.__mechanism == POLLING:
+            self.__poll(timeout)
+        elapsed = time.monotonic() - start
+        self.__expected = 0.8 * self.__expected + 0.2 * elapsed
+        if self.__observer is not None:
+            self.__observer(elapsed)
+
+    def close(self):
+        if self.__mechanism == HANDLER:
+            try:
+                self.__instrument.disable_event(EventType.service_request, EventMechanism.handler)
+                self.__instrument.uninstall_handler(EventType.service_request, self.__handler, self.__userHandle)
+            except pyvisa.errors.VisaIOError:
+                pass
+        elif self.__mechanism == QUEUE:
+            try:
+                self.__instrument.disable_event(EventType.service_request, EventMechanism.queue)
+            except pyvisa.errors.VisaIOError:
+                pass
+
+    def __detectMechanism(self):
+        try:
+            self.__instrument.write('*ESE 1')
+            if not self.__parseRegister(self.__instrument.query('*ESE?')) == 1:
+                return NONE
+        except (pyvisa.errors.VisaIOError, ValueError):
+            return NONE
+
+        #Serial line has no service request line
+        if getattr(self.__instrument, 'interface_type', None) == InterfaceType.asrl:
+            return POLLING
+
+        try:
+            self.__instrument.write('*SRE 32')
+            self.__handler = self.__instrument.wrap_handler(self.__handleEvent)
+            self.__userHandle = self.__instrument.install_handler(EventType.service_request, self.__handler)
+            self.__instrument.enable_event(EventType.service_request, EventMechanism.handler)
+            return HANDLER
+        except (pyvisa.errors.VisaIOError, NotImplementedError, AttributeError, TypeError):
+            pass
+
+        try:
+            self.__instrument.enable_event(EventType.service_request, EventMechanism.queue)
+            return QUEUE
+        except (pyvisa.errors.VisaIOError, NotImplementedError, AttributeError):
+            return POLLING
+
+    def __handleEvent(self, resource, event, userHandle):
+        self.__ready.set()
+
+    def __poll(self, timeout):
+        self.__instrument.write('*OPC')
+        start = time.monotonic()
+        #First check is planned from durations of previous operations
+        delay = max(self.__expected * 0.5, constants.COMPLETION_POLL_MIN)
+        while True:
+            time.sleep(delay)
+            try:
+                register = self.__parseRegister(self.__instrument.query('*ESR?'))
+            except ValueError:
+                self.__mechanism = NONE
+                return
+            if register & 1:
+                return
+            if time.monotonic() - start > timeout:
+                raise pyvisa.errors.VisaIOError(StatusCode.error_timeout)
+            delay = min(delay * 2, constants.COMPLETION_POLL_MAX)
+
+    def __parseRegister(self, response):
+        return int(float(response.strip()))
@@ -1,3 +1,5 @@
+import os
+
 #types
 MULTIMETER = "multimeter"
 SIGNALGENERATOR = "signalGenerator"
@@ -21,6 +23,18 @@ FRESISTANCE = 'FRESistance'
 FREQUENCY = 'FREQuency'
 PERIOD = 'PERiod'
 
+#Oscilloscope channels
+CHANNEL1 = "CHANnel1"
+CHANNEL2 = "CHANnel2"
+CHANNEL3 = "CHANnel3"
+CHANNEL4 = "CHANnel4"
+
+#Oscilloscope waveform formats
+WAVEFORM_BYTE = "BYTE"
+WAVEFORM_WORD = "WORD"
+WAVEFORM_CHUNK_SIZE = 1048576
+WAVEFORM_TIMEOUT = 30000
+
 #modulation
 FM = "FM"
 AM = "AM"
@@ -31,20 +45,28 @@ unitCurrent = 'A'
 unitResistance = 'Ω'
 unitFrequency = 'Hz'
 unitPeroid = 's'
+unitAmplitude = 'Vpp'
 
 #Metric Prefix
-nano = "0.000000001"
-micro = "0.000001"
-mili = "0.001"
-none = "1"
-kilo = "1000"
-Mega = "1000000"
+pico = 1e-12
+nano = 1e-9
+micro = 1e-6
+mili = 1e-3
+none = 1.0
+kilo = 1e3
+Mega = 1e6
+Giga = 1e9
+signPico = 'p'
 signNano = 'n'
 signMicro = 'μ'
 signMili = 'm'
 signNone = '-'
 signKilo = 'k'
 signMega = 'M'
+signGiga = 'G'
+signAuto = 'Auto'
+#Significant digits of values formatted in engineering notation
+ENGINEERING_DIGITS = 6
 
 #
 MEASURE = "MEASure"
@@ -56,6 +78,94 @@ CONFIGURED = "CONFIGURED"
 DISCONNECTED = "DISCONNECTED"
 OPENED = "CONNECTION OPENED"
 
+#Session pool
+SESSION_IDLE_TIMEOUT = 300
+SESSION_COLLECT_INTERVAL = 60000
+#Time in seconds for which closeAll waits until commands which already run return
+SESSION_CLOSE_TIMEOUT = 10
+
+#Device discovery
+DISCOVERY_TTL = 30
+DISCOVERY_PROBE_TIMEOUT = 500
+#Serial devices are asked for *IDN? with that baud rate, the same as default of configureCommunication callers
+DISCOVERY_BAUD_RATE = 9600
+
+#Asynchronous I/O
+COMMAND_TIMEOUT = 10
+#Priorities of commands, lower is executed first, user actions go ahead of background acquisition
+PRIORITY_USER = 0
+PRIORITY_BACKGROUND = 1
+#Minimal time in seconds between starts of two commands of one device, 0 means no limit
+DEVICE_MIN_INTERVAL = 0.0
+
+#SCPI batching
+SCPI_MAX_MESSAGE_LENGTH = 256
+SCPI_ERROR_QUEUE_LENGTH = 20
+
+#Operation complete
+COMPLETION_TIMEOUT = 5
+#Expected time of one multimeter reading in seconds (34401A, 10 PLC with autozero), burst waits count times longer
+READING_TIME = 0.25
+COMPLETION_POLL_MIN = 0.001
+COMPLETION_POLL_MAX = 0.1
+
+#Multimeter reading formats
+READINGS_ASCII = "ASC"
+READINGS_REAL = "REAL,64"
+
+#Multimeter ranges
+#Reading returned by multimeter when input is above range (+9.90000000E+37)
+OVERLOAD = 9.9e37
+#Text shown instead of overloaded reading, the same as on display of multimeter
+OVERLOAD_TEXT = "OVLD"
+#Number of last readings (bursts) remembered, lower range is selected only when all of them fit into it
+AUTORANGE_HISTORY = 10
+#Part of full scale of lower range which all recent readings must not exceed
+AUTORANGE_UNDERRANGE = 0.9
+
+#Continuous acquisition
+ACQUISITION_BUFFER_SIZE = 1000000
+ACQUISITION_BURST_PERIOD = 0.1
+DEFAULT_SAMPLE_RATE = 10
+MAX_SAMPLE_RATE = 10000
+DISPLAY_REFRESH_INTERVAL = 100
+
+#Sweep
+SWEEP_LINEAR = "LINEAR"
+SWEEP_LOG = "LOG"
+SWEEP_SETTLE_TIME = 0.05
+
+#Files written by application are kept next to its modules, not in current working directory
+APP_DIRECTORY = os.path.dirname(os.path.abspath(__file__))
+
+#Log output
+LOG_CAPACITY = 1000000
+LOG_FLUSH_INTERVAL = 200
+#Log is written into file only on request, see ui_MainWindow
+LOG_FILE_ENABLED = False
+LOG_FILE_NAME = os.path.join(APP_DIRECTORY, "instruments.log")
+LOG_FILE_SIZE = 10485760
+LOG_FILE_COUNT = 3
+
+#Instrumentation
+#Metrics of GUI are collected only after they are enabled in statistics panel, cli collects them with --stats
+METRICS_ENABLED = False
+#Upper bounds of latency histogram buckets in seconds
+METRICS_BUCKETS = (50e-6, 100e-6, 250e-6, 500e-6, 1e-3, 2.5e-3, 5e-3, 10e-3, 25e-3, 50e-3, 100e-3, 250e-3, 500e-3, 1.0, 2.5, 5.0, 10.0)
+METRICS_REFRESH_INTERVAL = 1000
+
+#Measurement store
+STORE_DIRECTORY = os.path.join(APP_DIRECTORY, "measurements")
+#Rows of first .npy segment of every column, every next segment is twice as large up to STORE_SEGMENT_SIZE
+STORE_FIRST_SEGMENT_SIZE = 1024
+STORE_SEGMENT_SIZE = 1048576
+STORE_FLUSH_INTERVAL = 1.0
+
+#Trend plot
+#Min/max bins kept for whole trace, neighbours are merged when all of them are used
+PLOT_BINS = 4096
+PLOT_REFRESH_INTERVAL = 40
+
 #
 EXTERNALWINDOW = "EXTERNALWINDOW"
 INTERNALWINDOW = "INTERNALWINDOW"
\ No newline at end of file
@@ -0,0 +1,142 @@
+import numpy as np
+
+#Internal imports
+import constants
+
+class minMaxDecimator:
+    """
+    minMaxDecimator, min/max envelope of whole trace in fixed number of bins
+
+    Every bin keeps minimum, maximum and time of first sample of span consecutive samples.
+    When all bins are used, neighbouring bins are merged in pairs and span is doubled,
+    so memory and time of render() do not depend on length of trace (hours of 1 kHz data
+    need the same PLOT_BINS bins as one second). extend() processes only new samples,
+    whole bins are reduced at once with NumPy. Spikes never disappear, because minimum
+    and maximum survive every merge.
+
+    Methods
+    -------
+    extend(self, timestamps, values):
+        adds new samples
+    render(self, columns) : touple
+        returns times, minimums and maximums of at most columns columns, e.g. pixels of plot
+    clear(self):
+        removes all samples
+    total(self) : int
+        returns number of added samples
+    span(self) : int
+        returns number of samples in one bin
+    """
+
+    def __init__(self, bins = constants.PLOT_BINS):
+        """Initialization Method
+
+        Parameters
+        ----------
+        bins : int
+            number of bins, even number, e.g. few widths of plot
+        """
+
+        self.__bins = int(bins) // 2 * 2
+        self.__minimum = np.empty(self.__bins, dtype = np.float64)
+        self.__maximum = np.empty(self.__bins, dtype = np.float64)
+        self.__times = np.empty(self.__bins, dtype = np.float64)
+        self.clear()
+
+    def clear(self):
+        self.__filled = 0
+        self.__span = 1
+        self.__total = 0
+        self.__lastTime = None
+        #Bin which is being filled
+        self.__pendingCount = 0
+        self.__pendingMinimum = np.inf
+        self.__pendingMaximum = -np.inf
+        self.__pendingTime = None
+
+    def total(self):
+        return self.__total
+
+    def span(self):
+        return self.__span
+
+    def extend(self, timestamps, values):
+        timestamps = np.asarray(timestamps, dtype = np.float64)
+        values = np.asarray(values, dtype = np.float64)
+        size = len(values)
+        if not size:
+            return
+        position = 0
+        while position < size:
+            if self.__filled == self.__bins:
+                self.__merge()
+            span = self.__span
+            if self.__pendingCount or size - position < span:
+                take = min(span - self.__pendingCount, size - position)
+                chunk = values[position:position + take]
+                if not self.__pendingCount:
+                    self.__pendingTime = timestamps[position]
+                self.__pendingMinimum = min(self.__pendingMinimum, chunk.min())
+                self.__pendingMaximum = max(self.__pendingMaximum, chunk.max())
+                self.__pendingCount += take
+                position += take
+                if self.__pendingCount == span:
+                    self.__store(self.__pendingTime, self.__pendingMinimum, self.__pendingMaximum)
+                    self.__pendingCount = 0
+                    self.__pendingMinimum = np.inf
+                    self.__pendingMaximum = -np.inf
+            else:
+                #As many whole bins as fit, reduced at once
+                count = min((size - position) // span, self.__bins - self.__filled)
+                block = values[position:position + count * span].reshape(count, span)
+                end = self.__filled + count
+                self.__minimum[self.__filled:end] = block.min(axis = 1)
+                self.__maximum[self.__filled:end] = block.max(axis = 1)
+                self.__times[self.__filled:end] = timestamps[position:position + count * span:span]
+                self.__filled = end
+                position += count * span
+        self.__total += size
+        self.__lastTime = timestamps[-1]
+
+    def render(self, columns):
+        """Function which reduces bins to columns
+
+        Parameters
+        ----------
+        columns : int
+            maximal number of returned points, e.g. width of plot in pixels
+
+        Returns
+        -------
+        touple
+            times of first sample of every column, minimums and maximums, plus time of last sample,
+            arrays are empty when decimator has no samples
+        """
+
+        filled = self.__filled
+        times = self.__times[:filled]
+        minimum = self.__minimum[:filled]
+        maximum = self.__maximum[:filled]
+        if self.__pendingCount:
+            times = np.append(times, self.__pendingTime)
+            minimum = np.append(minimum, self.__pendingMinimum)
+            maximum = np.append(maximum, self.__pendingMaximum)
+        count = len(times)
+        if count <= columns:
+            return times.copy(), minimum.copy(), maximum.copy(), self.__lastTime
+        starts = np.unique(np.linspace(0, count, int(columns), endpoint = False).astype(np.intp))
+        return times[starts], np.minimum.reduceat(minimum, starts), np.maximum.reduceat(maximum, starts), self.__lastTime
+
+    def __store(self, time, minimum, maximum):
+        self.__times[self.__filled] = time
+        self.__minimum[self.__filled] = minimum
+        self.__maximum[self.__filled] = maximum
+        self.__filled += 1
+
+    def __merge(self):
+        half = self.__bins // 2
+        self.__minimum[:half] = self.__minimum.reshape(half, 2).min(axis = 1)
+        self.__maximum[:half] = self.__maximum.reshape(half, 2).max(axis = 1)
+        self.__times[:half] = self.__times[::2]
+        self.__filled = half
+        self.__span *= 2
@@ -0,0 +1,143 @@
+import time
+import queue
+import threading
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, CancelledError
+
+#Internal imports
+import constants
+
+discoveredDevice = namedtuple('discoveredDevice', ['address', 'identity'])
+discoveredDevice.__doc__ = """Resource found by deviceDiscovery, identity is None when device did not answer *IDN?"""
+
+class deviceDiscovery:
+    """
+    deviceDiscovery, background enumeration of VISA resources
+
+    list_resources runs in background thread and every found address is probed
+    with *IDN? with short timeout. Probes are executed by bus workers of pool
+    (see sessionPool.probeIdentity), devices of different buses are probed in
+    parallel, devices of one bus one by one, so one silent serial port does not
+    delay others. Results are cached for constants.DISCOVERY_TTL seconds: when
+    chooser is opened again, cached list is shown instantly and refresh probes only
+    addresses which are new or whose probe expired. Addresses of sessions already
+    opened by application are never probed, their cached identity is used instead.
+
+    Methods
+    -------
+    cached(self) : list
+        returns devices known from last refresh without any I/O
+    refresh(self, onDevice = None, force = False) : Future
+        enumerates resources and probes changed ones in background
+    close(self):
+        stops background thread
+    """
+
+    def __init__(self, pool, ttl = constants.DISCOVERY_TTL):
+        """Initialization Method
+
+        Parameters
+        ----------
+        pool : sessionPool
+            pool which owns resource manager and opened sessions
+        ttl : float
+            time in seconds for which listing and probe results stay valid
+        """
+
+        self.__pool = pool
+        self.__ttl = ttl
+        self.__lister = ThreadPoolExecutor(max_workers = 1, thread_name_prefix = 'discovery')
+        self.__lock = threading.Lock()
+        self.__addresses = []
+        self.__listedAt = None
+        self.__identities = {}
+        self.__running = None
+        #onDevice of every caller waiting for running refresh
+        self.__listeners = []
+
+    def cached(self):
+        with self.__lock:
+            return self.__snapshot()
+
+    def refresh(self, onDevice = None, force = False):
+        """Function which refreshes list of devices in background
+
+        Parameters
+        ----------
+        onDevice : callable
+            invoked from background thread with every newly probed discoveredDevice,
+            callers joining refresh in progress are notified about devices probed after they joined
+        force : bool
+            ignores cache and probes all addresses again
+
+        Returns
+        -------
+        Future
+            future with list of discoveredDevice, already finished when cache is valid
+        """
+
+        with self.__lock:
+            if not force and self.__isFresh():
+                future = Future()
+                future.set_result(self.__snapshot())
+                return future
+            #Refresh already in progress, nobody should wait for second list_resources
+            if self.__running is not None and not self.__running.done() and not force:
+                if onDevice is not None:
+                    self.__listeners.append(onDevice)
+                return self.__running
+            listeners = self.__listeners = [] if onDevice is None else [onDevice]
+            self.__running = self.__lister.submit(self.__refresh, listeners, force)
+            return self.__running
+
+    def close(self):
+        self.__lister.shutdown(wait = False)
+
+    def __snapshot(self):
+        return [discoveredDevice(address, self.__identities.get(address, (None, 0))[0])
+                for address in self.__addresses]
+
+    def __isFresh(self):
+        if self.__listedAt is None or time.monotonic() - self.__listedAt > self.__ttl:
+            return False
+        now = time.monotonic()
+        return all(now - self.__identities.get(address, (None, 0))[1] <= self.__ttl
+                   for address in self.__addresses)
+
+    def __refresh(self, listeners, force):
+        addresses = list(self.__pool.listResources())
+        now = time.monotonic()
+        with self.__lock:
+            self.__addresses = addresses
+            self.__listedAt = now
+            for address in list(self.__identities):
+                if address not in addresses:
+                    del self.__identities[address]
+            changed = [address for address in addresses
+                       if force or now - self.__identities.get(address, (None, 0))[1] > self.__ttl]
+
+        #Devices are reported in order in which their probes finished, also cancelled ones
+        finished = queue.Queue()
+        for address in changed:
+            probe = self.__pool.probeIdentity(address, constants.DISCOVERY_PROBE_TIMEOUT)
+            probe.add_done_callback(lambda probe, address = address: finished.put((address, probe)))
+        for index in range(len(changed)):
+            self.__store(*finished.get(), listeners)
+        return self.cached()
+
+    def __store(self, address, probe, listeners):
+        try:
+            identity = probe.result()
+        except CancelledError:
+            #Pool was closed meanwhile
+            identity = None
+        with self.__lock:
+            self.__identities[address] = (identity, time.monotonic())
+            listeners = list(listeners)
+        device = discoveredDevice(address, identity)
+        for onDevice in listeners:
+            try:
+                onDevice(device)
+            except RuntimeError:
+                #Signal of chooser window which was already closed
+                pass
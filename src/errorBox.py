@@ -1,9 +1,10 @@
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 
 #Internal imports
+from uiLoader import loadForm
 from errorHandler import errorParser
 
 class ui_ErrorBox(QtWidgets.QWidget):
@@ -42,7 +43,7 @@ class ui_ErrorBox(QtWidgets.QWidget):
         super(ui_ErrorBox, self).__init__()
         self.__errorParser = errorParser()
 
-        uic.loadUi("../UI/errorBar.ui", self)
+        loadForm("errorBar", self)
 
         self.__confirmButton = self.findChild(QtWidgets.QPushButton, 'confirmButton')
         self.__confirmButton.clicked.connect(self.cancelMethod)
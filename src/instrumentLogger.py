@@ -0,0 +1,73 @@
+import sys
+import time
+
+#Internal imports
+import constants
+
+class instrumentLogger:
+    """
+    instrumentLogger, lightweight log writer used by pyVisaInterface
+
+    Caller tag is resolved once during initialization instead of walking
+    the interpreter stack on every call. Time stamp and message are formatted
+    only when record is really emitted, so calls which do not log cost nothing.
+
+    Methods
+    -------
+    log(self, message, *args):
+        emits message with time stamp and caller prefix
+    """
+
+    def __init__(self, output, caller = None):
+        """Initialization Method
+
+        Parameters
+        ----------
+        output : logSink
+            any object which provides thread safe addItem(str), None disables logging
+        caller : str
+            type of device which owns logger, e.g. constants.MULTIMETER
+        """
+
+        self.__output = output
+        self.__prefix = self.__convertCallerToPrev(caller)
+
+    def log(self, message, *args):
+        """Function which emits log record
+
+        Parameters
+        ----------
+        message : str
+            message or %-style format string
+        args :
+            arguments for format string, formatted only on emit
+        """
+
+        if self.__output is None:
+            return
+        if args:
+            message = message % args
+        self.__output.addItem(time.strftime("%H:%M:%S - ") + self.__prefix + message)
+
+    def __convertCallerToPrev(self, string):
+        if string == constants.SIGNALGENERATOR:
+            return 'signalGen: '
+        elif string == constants.MULTIMETER:
+            return 'multimeter: '
+        elif string == constants.OSCILLOSCOPE:
+            return 'oscilloscope: '
+        return ''
+
+class streamOutput:
+    """
+    streamOutput, log output for scripts which writes records into text stream
+
+    Provides the same addItem(str) interface as logSink, so pyVisaInterface can log without GUI.
+    """
+
+    def __init__(self, stream = None):
+        self.__stream = sys.stderr if stream is None else stream
+
+    def addItem(self, string):
+        self.__stream.write(string + '\n')
+        self.__stream.flush()
@@ -0,0 +1,236 @@
+import time
+import bisect
+import threading
+
+#Internal imports
+import constants
+
+#Counters of every device
+TIMEOUTS = 'timeouts'
+ERRORS = 'errors'
+#Errors marked retryable in errorHandler, nothing repeats them, so they are not retries
+RETRYABLE_ERRORS = 'retryableErrors'
+COUNTERS = (TIMEOUTS, ERRORS, RETRYABLE_ERRORS)
+
+#Label of program message with more commands (scpiBatch)
+BATCH = 'BATCH'
+#Label of waiting for operation complete (completionWaiter), includes *OPC, polling and sleeps
+COMPLETION = 'wait:OPC'
+
+def commandHeader(message):
+    """Function which returns label of SCPI message, e.g. "MEAS:VOLT:DC? DEF,DEF" -> "MEAS:VOLT:DC?"
+
+    Values are dropped, so number of labels is limited by set of commands.
+    """
+
+    if ';' in message:
+        return BATCH
+    return message.strip().split(' ', 1)[0].upper()
+
+class latencyHistogram:
+    """
+    latencyHistogram, histogram of durations with fixed buckets (constants.METRICS_BUCKETS)
+
+    Bucket i counts durations <= METRICS_BUCKETS[i], last bucket counts longer ones,
+    the same way as Prometheus histogram. Quantiles are estimated as upper bound of bucket.
+    """
+
+    __slots__ = ('counts', 'count', 'total', 'maximum')
+
+    def __init__(self):
+        self.counts = [0] * (len(constants.METRICS_BUCKETS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.maximum = 0.0
+
+    def observe(self, seconds):
+        self.counts[bisect.bisect_left(constants.METRICS_BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def quantile(self, fraction):
+        rank = fraction * self.count
+        cumulative = 0
+        for bound, count in zip(constants.METRICS_BUCKETS, self.counts):
+            cumulative += count
+            if cumulative >= rank:
+                return min(bound, self.maximum)
+        return self.maximum
+
+class deviceMetrics:
+    """
+    deviceMetrics, statistics of one device, written from its worker thread
+
+    Attributes
+    ----------
+    address : str
+        VISA resource string of device
+    commands : dict
+        latencyHistogram keyed by command label
+    bytesOut : int
+        bytes written to device
+    bytesIn : int
+        bytes read from device
+    counters : dict
+        number of timeouts, other VISA errors and errors which can be retried
+    """
+
+    def __init__(self, address):
+        self.address = address
+        self.commands = {}
+        self.bytesOut = 0
+        self.bytesIn = 0
+        self.counters = dict.fromkeys(COUNTERS, 0)
+        self.lock = threading.Lock()
+
+    def observe(self, label, seconds, bytesOut = 0, bytesIn = 0):
+        with self.lock:
+            histogram = self.commands.get(label)
+            if histogram is None:
+                histogram = self.commands[label] = latencyHistogram()
+            histogram.observe(seconds)
+            self.bytesOut += bytesOut
+            self.bytesIn += bytesIn
+
+    def count(self, name):
+        with self.lock:
+            self.counters[name] += 1
+
+class instrumentMetrics:
+    """
+    instrumentMetrics, instrumentation of all devices opened by one sessionPool
+
+    sessionPool wraps resources into meteredResource only when it gets metrics,
+    so without metrics I/O has no overhead at all. Disabled metrics cost one flag
+    check per I/O call. Module does not import pyVisa, so main window can create
+    metrics without loading VISA.
+
+    Methods
+    -------
+    isEnabled(self) : bool
+        returns True when I/O is measured
+    setEnabled(self, enabled):
+        starts or stops measuring, collected values are kept
+    device(self, address) : deviceMetrics
+        returns statistics of device, creates them for new address
+    setQueueDepthSource(self, function):
+        sets function which returns dictionary of queued commands keyed by address
+    reset(self):
+        drops all collected values
+    snapshot(self) : list
+        returns copy of statistics of all devices as list of dictionaries
+    toPrometheus(self) : str
+        returns statistics in Prometheus text exposition format
+    toJsonLines(self) : str
+        returns one JSON object per device and line
+    export(self, fileName):
+        writes Prometheus text (.prom, .txt) or appends JSON lines (other extensions) into file
+    """
+
+    def __init__(self, enabled = True):
+        self.enabled = enabled
+        self.__devices = {}
+        self.__lock = threading.Lock()
+        self.__queueDepth = None
+
+    def isEnabled(self):
+        return self.enabled
+
+    def setEnabled(self, enabled):
+        self.enabled = enabled
+
+    def device(self, address):
+        with self.__lock:
+            device = self.__devices.get(address)
+            if device is None:
+                device = self.__devices[address] = deviceMetrics(address)
+            return device
+
+    def setQueueDepthSource(self, function):
+        self.__queueDepth = function
+
+    def reset(self):
+        with self.__lock:
+            for device in self.__devices.values():
+                with device.lock:
+                    device.commands = {}
+                    device.bytesOut = 0
+                    device.bytesIn = 0
+                    device.counters = dict.fromkeys(COUNTERS, 0)
+
+    def snapshot(self):
+        """Function which copies statistics, safe to call from any thread
+
+        Returns
+        -------
+        list
+            dictionaries with address, queueDepth, bytesOut, bytesIn, counters and commands,
+            commands are keyed by label and have count, sum, mean, p50, p95, max (seconds) and buckets
+        """
+
+        depths = self.__queueDepth() if self.__queueDepth is not None else {}
+        with self.__lock:
+            devices = list(self.__devices.values())
+        result = []
+        for device in devices:
+            with device.lock:
+                commands = {label : {'count' : histogram.count, 'sum' : histogram.total, 'mean' : histogram.mean(),
+                                     'p50' : histogram.quantile(0.5), 'p95' : histogram.quantile(0.95),
+                                     'max' : histogram.maximum, 'buckets' : list(histogram.counts)}
+                            for label, histogram in device.commands.items()}
+                entry = {'address' : device.address, 'queueDepth' : depths.get(device.address, 0),
+                         'bytesOut' : device.bytesOut, 'bytesIn' : device.bytesIn, 'commands' : commands}
+                entry.update(device.counters)
+            result.append(entry)
+        return result
+
+    def toPrometheus(self):
+        lines = []
+        def header(name, kind, text):
+            lines.append('# HELP %s %s' % (name, text))
+            lines.append('# TYPE %s %s' % (name, kind))
+
+        devices = self.snapshot()
+        header('visa_command_duration_seconds', 'histogram', 'Duration of SCPI command including VISA I/O')
+        for device in devices:
+            for label, command in sorted(device['commands'].items()):
+                labels = 'address="%s",command="%s"' % (_escape(device['address']), _escape(label))
+                cumulative = 0
+                for bound, count in zip(constants.METRICS_BUCKETS + (float('inf'),), command['buckets']):
+                    cumulative += count
+                    lines.append('visa_command_duration_seconds_bucket{%s,le="%s"} %d' % (labels, '+Inf' if bound == float('inf') else '%g' % bound, cumulative))
+                lines.append('visa_command_duration_seconds_sum{%s} %.9g' % (labels, command['sum']))
+                lines.append('visa_command_duration_seconds_count{%s} %d' % (labels, command['count']))
+
+        for name, key, kind, text in (('visa_bytes_sent_total', 'bytesOut', 'counter', 'Bytes written to device'),
+                                      ('visa_bytes_received_total', 'bytesIn', 'counter', 'Bytes read from device'),
+                                      ('visa_timeouts_total', TIMEOUTS, 'counter', 'VISA timeouts'),
+                                      ('visa_errors_total', ERRORS, 'counter', 'VISA errors other than timeout'),
+                                      ('visa_retryable_errors_total', RETRYABLE_ERRORS, 'counter', 'Errors after which operation can be repeated'),
+                                      ('visa_queue_depth', 'queueDepth', 'gauge', 'Commands waiting in worker queue of device')):
+            header(name, kind, text)
+            for device in devices:
+                lines.append('%s{address="%s"} %d' % (name, _escape(device['address']), device[key]))
+        return '\n'.join(lines) + '\n'
+
+    def toJsonLines(self):
+        #json is not needed by main window until export
+        import json
+        timestamp = time.time()
+        return ''.join(json.dumps(dict(device, timestamp = timestamp), sort_keys = True) + '\n' for device in self.snapshot())
+
+    def export(self, fileName):
+        if fileName.endswith(('.prom', '.txt')):
+            with open(fileName, 'w', encoding = 'utf-8') as file:
+                file.write(self.toPrometheus())
+        else:
+            with open(fileName, 'a', encoding = 'utf-8') as file:
+                file.write(self.toJsonLines())
+
+def _escape(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
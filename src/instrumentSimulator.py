@@ -0,0 +1,523 @@
+"""Python stand-in of signal generator and multimeter for offline benchmarks
+
+Every instrument listens on TCP socket and talks SCPI like real device, so it can be
+opened by pyVisa (pyvisa-py backend) as TCPIP0::127.0.0.1::<port>::SOCKET. Unlike
+pyvisa-sim definition (simulator/instruments.yaml), stand-in models timing:
+    latency          - fixed processing time of every received message
+    baud rate        - serial line cost of every transferred byte (10 bits per byte)
+    settle time      - generator output settles after change, *OPC waits for it
+    integration time - multimeter reading takes integration time, INIT runs in background
+    autorange time   - multimeter on autorange spends extra time before every reading
+and keeps state: settings, error queue (SYST:ERR?), *ESE/*ESR status and readings memory.
+Multimeter measures output of generator through simple low-pass DUT with noise.
+
+Run from src directory:
+    python instrumentSimulator.py --baud 9600 --latency 0.002
+"""
+
+import math
+import time
+import random
+import socket
+import struct
+import argparse
+import threading
+import socketserver
+from collections import deque
+
+#Internal imports
+import constants
+from capabilities import generatorCapabilities, multimeterCapabilities
+
+NO_ERROR = '+0,"No error"'
+
+class simulatedInstrument:
+    """
+    simulatedInstrument, IEEE 488.2 part shared by all simulated instruments
+
+    Handles common commands, error queue, Standard Event Status Register and timing
+    model. Subclasses implement handle(header, argument) for their own commands.
+
+    Methods
+    -------
+    execute(self, message) : bytes
+        executes program message, returns response or None
+    transferTime(self, size) : float
+        returns time of transferring size bytes over serial line
+    """
+
+    identity = 'SIMULATED,INSTRUMENT,0,1.0'
+
+    def __init__(self, baudRate = None, latency = 0.0):
+        """Initialization Method
+
+        Parameters
+        ----------
+        baudRate : int
+            simulated serial line speed, None for no transfer cost
+        latency : float
+            processing time of every message in seconds
+        """
+
+        self.baudRate = baudRate
+        self.latency = latency
+        self.lock = threading.Lock()
+        self.__errors = deque(maxlen = constants.SCPI_ERROR_QUEUE_LENGTH)
+        self.__esr = 0
+        self.__ese = 0
+        self.__sre = 0
+        self.__opcPending = False
+        self.busyUntil = 0.0
+
+    def transferTime(self, size):
+        return size * 10.0 / self.baudRate if self.baudRate else 0.0
+
+    def execute(self, message):
+        responses = []
+        with self.lock:
+            for command in message.split(';'):
+                command = command.strip()
+                if not command:
+                    continue
+                try:
+                    response = self.__dispatch(command)
+                except KeyError:
+                    self.addError(-113, 'Undefined header')
+                    continue
+                except ValueError:
+                    self.addError(-222, 'Data out of range')
+                    continue
+                if response is not None:
+                    responses.append(response if isinstance(response, bytes) else response.encode('ascii'))
+        return b';'.join(responses) if responses else None
+
+    def addError(self, code, message):
+        self.__errors.append('%+d,"%s"' % (code, message))
+        #Command errors set CME bit, execution errors EXE bit, query errors QYE bit
+        self.__esr |= 32 if -200 < code <= -100 else 16 if -300 < code <= -200 else 4
+
+    def wait(self):
+        remaining = self.busyUntil - time.monotonic()
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def reset(self):
+        self.__errors.clear()
+        self.__esr = 0
+        self.__opcPending = False
+        self.busyUntil = 0.0
+
+    def handle(self, header, argument):
+        raise KeyError(header)
+
+    def __dispatch(self, command):
+        header, _, argument = command.partition(' ')
+        header = header.upper().lstrip(':')
+        argument = argument.strip()
+
+        if header == '*IDN?':
+            return self.identity
+        elif header == '*RST':
+            self.reset()
+        elif header == '*CLS':
+            self.__errors.clear()
+            self.__esr = 0
+        elif header == '*OPC':
+            self.__opcPending = True
+        elif header == '*OPC?':
+            self.wait()
+            return '1'
+        elif header == '*WAI':
+            self.wait()
+        elif header == '*ESE':
+            self.__ese = int(float(argument))
+        elif header == '*ESE?':
+            return '%+d' % self.__ese
+        elif header == '*SRE':
+            self.__sre = int(float(argument))
+        elif header == '*SRE?':
+            return '%+d' % self.__sre
+        elif header == '*ESR?':
+            if self.__opcPending and time.monotonic() >= self.busyUntil:
+                self.__esr |= 1
+                self.__opcPending = False
+            register, self.__esr = self.__esr, 0
+            return '%+d' % register
+        elif header in ('SYST:ERR?', 'SYSTEM:ERROR?'):
+            return self.__errors.popleft() if self.__errors else NO_ERROR
+        else:
+            return self.handle(header, argument)
+
+class simulatedGenerator(simulatedInstrument):
+    """
+    simulatedGenerator, function generator with limits of capabilities table
+
+    Every change of output (waveform, frequency, amplitude, offset) makes generator
+    busy for settle time, *OPC and *OPC? finish after output is settled.
+    """
+
+    identity = 'HEWLETT-PACKARD,33120A,0,7.0-5.0-1.0'
+
+    __WAVEFORMS = {'SIN' : constants.SINUS, 'SQU' : constants.SQUARE, 'TRI' : constants.TRIANGLE,
+                   'RAMP' : constants.RAMP, 'NOIS' : constants.NOISE, 'DC' : constants.DC}
+    __OUTPUT = ('FUNC:SHAP', 'FREQ', 'VOLT', 'VOLT:OFFS')
+
+    def __init__(self, baudRate = None, latency = 0.0, settleTime = 0.01):
+        super(simulatedGenerator, self).__init__(baudRate, latency)
+        self.settleTime = settleTime
+        self.__capabilities = generatorCapabilities.fromIdentity(self.identity)
+        self.reset()
+
+    def reset(self):
+        super(simulatedGenerator, self).reset()
+        self.settings = {'FUNC:SHAP' : 'SIN', 'FREQ' : 1000.0, 'VOLT' : 0.1, 'VOLT:OFFS' : 0.0,
+                         'AM:INT:FUNC' : 'SIN', 'AM:INT:FREQ' : 100.0, 'AM:DEPT' : 100.0, 'AM:STAT' : 'OFF',
+                         'FM:INT:FUNC' : 'SIN', 'FM:INT:FREQ' : 10.0, 'FM:DEV' : 100.0, 'FM:STAT' : 'OFF'}
+
+    def output(self):
+        """Returns waveform constant, frequency, amplitude and offset of settled output"""
+
+        settings = self.settings
+        return self.__WAVEFORMS[settings['FUNC:SHAP']], settings['FREQ'], settings['VOLT'], settings['VOLT:OFFS']
+
+    def handle(self, header, argument):
+        if header.endswith('?'):
+            value = self.settings[header[:-1]]
+            return value if isinstance(value, str) else '%+.8E' % value
+
+        current = self.settings[header]
+        if isinstance(current, str):
+            value = argument.upper()
+            if header.endswith('FUNC') or header == 'FUNC:SHAP':
+                if value[:4] not in self.__WAVEFORMS and value[:3] not in self.__WAVEFORMS:
+                    raise ValueError(argument)
+                value = value[:4] if value[:4] in self.__WAVEFORMS else value[:3]
+            elif value not in ('ON', 'OFF', '1', '0'):
+                raise ValueError(argument)
+        else:
+            value = float(argument)
+
+        settings = dict(self.settings)
+        settings[header] = value
+        modulation = constants.AM if settings['AM:STAT'] in ('ON', '1') else constants.FM if settings['FM:STAT'] in ('ON', '1') else None
+        errorCode = self.__capabilities.validate(self.__WAVEFORMS[settings['FUNC:SHAP']], settings['FREQ'], settings['VOLT'],
+                                                 settings['VOLT:OFFS'] if header == 'VOLT:OFFS' else None, modulation,
+                                                 settings[modulation + ':INT:FREQ'] if modulation else None,
+                                                 settings['FM:DEV' if modulation == constants.FM else 'AM:DEPT'] if modulation else None)
+        if errorCode is not None:
+            raise ValueError(argument)
+
+        self.settings = settings
+        if header in self.__OUTPUT:
+            self.busyUntil = time.monotonic() + self.settleTime
+
+class simulatedMultimeter(simulatedInstrument):
+    """
+    simulatedMultimeter, digital multimeter measuring output of simulatedGenerator
+
+    Every reading takes integration time. INIT starts SAMP:COUN * TRIG:COUN readings
+    in background, FETCh? waits until they are finished, DATA:POINts? and DATA:REMove?
+    return readings already taken. Readings are true RMS / DC values of generator
+    output passed through first order low-pass DUT, with gaussian noise, rounded to
+    resolution of range (6 digits of full scale). Fixed range (<mode>:RANG, CONF range)
+    returns constants.OVERLOAD above overrange, autorange (DEF, <mode>:RANG:AUTO ON)
+    picks range itself and costs autorange time per reading.
+    """
+
+    identity = 'HEWLETT-PACKARD,34401A,0,11-5-2'
+
+    #Short form of mode mapped to mode of capability tables
+    __MODES = {'VOLT:DC' : constants.VOLTAGE_DC, 'VOLT:AC' : constants.VOLTAGE_AC, 'CURR:DC' : constants.CURRENT_DC,
+               'CURR:AC' : constants.CURRENT_AC, 'RES' : constants.RESISTANCE, 'FRES' : constants.FRESISTANCE,
+               'FREQ' : constants.FREQUENCY, 'PER' : constants.PERIOD}
+    #Crest factor of waveforms, RMS = amplitude / 2 / crest factor
+    __CREST = {constants.SINUS : math.sqrt(2), constants.SQUARE : 1.0, constants.TRIANGLE : math.sqrt(3),
+               constants.RAMP : math.sqrt(3), constants.NOISE : 3.0, constants.DC : float('inf')}
+
+    def __init__(self, source = None, baudRate = None, latency = 0.0, integrationTime = 0.02,
+                 noise = 1e-4, cutoff = 100e3, load = 100.0, autorangeTime = 0.01):
+        """Initialization Method
+
+        Parameters
+        ----------
+        source : simulatedGenerator
+            generator connected to input through DUT, None for open input
+        integrationTime : float
+            time of one reading in seconds
+        noise : float
+            relative standard deviation of readings
+        cutoff : float
+            -3 dB frequency of DUT in Hz
+        load : float
+            resistance of DUT in ohms, used for current and resistance modes
+        autorangeTime : float
+            extra time of every reading on autorange in seconds
+        """
+
+        super(simulatedMultimeter, self).__init__(baudRate, latency)
+        self.source = source
+        self.integrationTime = integrationTime
+        self.noise = noise
+        self.cutoff = cutoff
+        self.load = load
+        self.autorangeTime = autorangeTime
+        self.capabilities = multimeterCapabilities()
+        self.reset()
+
+    def reset(self):
+        super(simulatedMultimeter, self).reset()
+        #Fixed range of every mode, None is autorange
+        self.__ranges = {}
+        self.__configure('VOLT:DC')
+        self.__format = 'ASC'
+        self.__readings = []
+        self.__times = []
+
+    def handle(self, header, argument):
+        if header.startswith('SENS:'):
+            header = header[5:]
+        if header.startswith('CONF:'):
+            self.__configure(self.__mode(header[5:]), argument)
+        elif header.startswith('MEAS:') and header.endswith('?'):
+            self.__configure(self.__mode(header[5:-1]), argument)
+            self.__initiate()
+            return self.__fetch()
+        elif header == 'CONF?':
+            return '"%s"' % self.__selected
+        elif header == 'SAMP:COUN':
+            self.__sampleCount = self.__count(argument)
+        elif header == 'TRIG:COUN':
+            self.__triggerCount = self.__count(argument)
+        elif header == 'SAMP:TIM':
+            self.__sampleTime = float(argument)
+        elif header in ('TRIG:SOUR', 'SAMP:SOUR'):
+            if argument.upper()[:3] not in ('IMM', 'BUS', 'EXT', 'TIM'):
+                raise ValueError(argument)
+        elif header == 'FORM:DATA':
+            self.__format = 'REAL' if argument.upper().startswith('REAL') else 'ASC'
+        elif header == 'INIT':
+            self.__initiate()
+        elif header == 'FETC?':
+            return self.__fetch()
+        elif header == 'READ?':
+            self.__initiate()
+            return self.__fetch()
+        elif header.endswith(':RANG:AUTO'):
+            mode = self.__mode(header[:-10])
+            if argument.upper() in ('ON', '1'):
+                self.__ranges[mode] = None
+            elif argument.upper() in ('OFF', '0'):
+                self.__ranges[mode] = self.__range(mode)
+            else:
+                raise ValueError(argument)
+        elif header.endswith(':RANG:AUTO?'):
+            return '1' if self.__ranges.get(self.__mode(header[:-11])) is None else '0'
+        elif header.endswith(':RANG'):
+            mode = self.__mode(header[:-5])
+            self.__ranges[mode] = self.__selectRange(mode, argument)
+        elif header.endswith(':RANG?'):
+            return '%+.8E' % self.__range(self.__mode(header[:-6]))
+        elif header == 'DATA:POIN?':
+            return '%+d' % self.__available()
+        elif header == 'DATA:REM?':
+            count = int(float(argument))
+            if count > self.__available():
+                raise ValueError(argument)
+            readings, self.__readings = self.__readings[:count], self.__readings[count:]
+            self.__times = self.__times[count:]
+            return self.__format_(readings)
+        else:
+            raise KeyError(header)
+
+    def __mode(self, string):
+        mode = string.split(' ')[0]
+        if mode not in self.__MODES:
+            raise KeyError(string)
+        return mode
+
+    def __count(self, argument):
+        count = int(float(argument))
+        if count < 1 or count > 50000:
+            raise ValueError(argument)
+        return count
+
+    def __configure(self, mode, argument = ''):
+        #CONFigure and MEASure? take range as first parameter
+        self.__ranges[mode] = self.__selectRange(mode, argument.split(',')[0])
+        self.__selected = mode
+        self.__sampleCount = 1
+        self.__triggerCount = 1
+        self.__sampleTime = None
+
+    def __selectRange(self, mode, argument):
+        """Returns range for CONF or RANG parameter: the lowest range which measures value, None for autorange"""
+
+        argument = argument.strip().upper()
+        ranges = self.capabilities.getRanges(self.__MODES.get(mode))
+        if argument in ('', 'DEF', 'AUTO') or ranges is None:
+            return None
+        if argument == 'MIN':
+            return ranges[0]
+        if argument == 'MAX':
+            return ranges[-1]
+        value = abs(float(argument))
+        for fullScale in ranges:
+            if value <= fullScale:
+                return fullScale
+        raise ValueError(argument)
+
+    def __range(self, mode):
+        """Returns fixed range of mode, the highest range on autorange"""
+
+        ranges = self.capabilities.getRanges(self.__MODES.get(mode))
+        fixed = self.__ranges.get(mode)
+        return fixed if fixed is not None else ranges[-1] if ranges else 0.0
+
+    def __initiate(self):
+        count = self.__sampleCount * self.__triggerCount
+        period = max(self.integrationTime, self.__sampleTime or 0.0)
+        if self.__ranges.get(self.__selected) is None and self.capabilities.getRanges(self.__MODES.get(self.__selected)):
+            period += self.autorangeTime
+        start = max(time.monotonic(), self.busyUntil)
+        self.__readings = [self.__reading() for _ in range(count)]
+        self.__times = [start + (index + 1) * period for index in range(count)]
+        self.busyUntil = self.__times[-1]
+
+    def __available(self):
+        now = time.monotonic()
+        return sum(1 for moment in self.__times if moment <= now)
+
+    def __fetch(self):
+        self.wait()
+        return self.__format_(self.__readings)
+
+    def __format_(self, readings):
+        if self.__format == 'REAL':
+            data = struct.pack('>%dd' % len(readings), *readings)
+            length = str(len(data)).encode('ascii')
+            return b'#' + str(len(length)).encode('ascii') + length + data
+        return ','.join('%+.8E' % reading for reading in readings)
+
+    def __reading(self):
+        mode = self.__selected
+        if self.source is None:
+            value = 0.0
+        else:
+            waveform, frequency, amplitude, offset = self.source.output()
+            gain = 1.0 / math.sqrt(1.0 + (frequency / self.cutoff) ** 2)
+            if mode in ('VOLT:DC', 'CURR:DC'):
+                value = offset + (amplitude / 2 if waveform == constants.DC else 0.0)
+            elif mode in ('VOLT:AC', 'CURR:AC'):
+                value = gain * amplitude / 2 / self.__CREST[waveform]
+            elif mode == 'FREQ':
+                value = frequency
+            elif mode == 'PER':
+                value = 1.0 / frequency
+            else:
+                value = self.load
+            if mode.startswith('CURR'):
+                value /= self.load
+        value = value * (1.0 + random.gauss(0.0, self.noise)) + random.gauss(0.0, self.noise * 1e-3)
+
+        ranges = self.capabilities.getRanges(self.__MODES.get(mode))
+        if not ranges:
+            return value
+        fullScale = self.__ranges.get(mode)
+        if fullScale is None:
+            fullScale = next((fullScale for fullScale in ranges if abs(value) <= fullScale), ranges[-1])
+        if abs(value) > fullScale * self.capabilities.getOverrange():
+            return constants.OVERLOAD
+        resolution = fullScale * 1e-6
+        return round(value / resolution) * resolution
+
+class instrumentServer(socketserver.ThreadingTCPServer):
+    """
+    instrumentServer, TCP socket server which exposes simulated instrument to pyVisa
+
+    Messages are terminated by new line. Every message costs latency of instrument
+    and transfer time of its bytes, response costs transfer time of its bytes.
+
+    Methods
+    -------
+    getAddress(self) : str
+        returns VISA resource string of server
+    start(self):
+        serves in background thread
+    """
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, instrument, port = 0, host = '127.0.0.1'):
+        self.instrument = instrument
+        super(instrumentServer, self).__init__((host, port), _messageHandler)
+
+    def getAddress(self):
+        host, port = self.server_address[:2]
+        return 'TCPIP0::%s::%d::SOCKET' % (host, port)
+
+    def start(self):
+        threading.Thread(target = self.serve_forever, name = self.getAddress(), daemon = True).start()
+        return self
+
+class _messageHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        instrument = self.server.instrument
+        for line in self.__lines():
+            time.sleep(instrument.latency + instrument.transferTime(len(line)))
+            response = instrument.execute(line.decode('ascii', 'replace').strip())
+            if response is not None:
+                response += b'\n'
+                time.sleep(instrument.transferTime(len(response)))
+                self.wfile.write(response)
+                self.wfile.flush()
+
+    def __lines(self):
+        #Client writes without waiting for answer (e.g. *OPC and *ESR?) would be held by Nagle
+        #algorithm until delayed ACK of server (40 ms), so every received message is ACKed at once
+        quickAck = getattr(socket, 'TCP_QUICKACK', None)
+        while True:
+            if quickAck is not None:
+                self.connection.setsockopt(socket.IPPROTO_TCP, quickAck, 1)
+            line = self.rfile.readline()
+            if not line:
+                return
+            yield line
+
+def startSimulators(baudRate = None, latency = 0.0, settleTime = 0.01, integrationTime = 0.02, noise = 1e-4, host = '127.0.0.1',
+                    generatorPort = 0, multimeterPort = 0, autorangeTime = 0.01):
+    """Function which starts generator and multimeter connected together, port 0 means free port
+
+    Returns
+    -------
+    touple
+        generator server and multimeter server, both already serving
+    """
+
+    generator = simulatedGenerator(baudRate, latency, settleTime)
+    multimeter = simulatedMultimeter(generator, baudRate, latency, integrationTime, noise, autorangeTime = autorangeTime)
+    return (instrumentServer(generator, generatorPort, host).start(),
+            instrumentServer(multimeter, multimeterPort, host).start())
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description = 'Simulated signal generator and multimeter on TCP sockets')
+    parser.add_argument('--host', default = '127.0.0.1')
+    parser.add_argument('--generator-port', type = int, default = 5025)
+    parser.add_argument('--multimeter-port', type = int, default = 5026)
+    parser.add_argument('--baud', type = int, default = None, help = 'simulated serial speed, no transfer cost by default')
+    parser.add_argument('--latency', type = float, default = 0.0, help = 'processing time of every message in seconds')
+    parser.add_argument('--settle', type = float, default = 0.01, help = 'settle time of generator in seconds')
+    parser.add_argument('--integration', type = float, default = 0.02, help = 'integration time of one reading in seconds')
+    parser.add_argument('--noise', type = float, default = 1e-4, help = 'relative noise of readings')
+    parser.add_argument('--autorange', type = float, default = 0.01, help = 'extra time of reading on autorange in seconds')
+    arguments = parser.parse_args()
+
+    servers = startSimulators(arguments.baud, arguments.latency, arguments.settle, arguments.integration, arguments.noise,
+                              arguments.host, arguments.generator_port, arguments.multimeter_port, arguments.autorange)
+    for name, server in zip(('generator', 'multimeter'), servers):
+        print('%-10s %s' % (name, server.getAddress()))
+    print('use pyVisa backend "@py", e.g. python cli.py --backend @py measure %s' % servers[1].getAddress())
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,178 @@
+import os
+import threading
+from collections import deque
+
+#Gui imports
+from PyQt5.QtCore import Qt, QObject, QTimer, QAbstractListModel, QModelIndex
+
+#Internal imports
+import constants
+
+class logModel(QAbstractListModel):
+    """
+    logModel, bounded list model of log records
+
+    Records are kept in deque of fixed length, the oldest records are dropped
+    when model is full. View asks only for rows which are visible, so model
+    with million of records is as fast as model with ten.
+
+    Methods
+    -------
+    appendRecords(self, records):
+        appends many records with one insert notification
+    clear(self):
+        removes all records
+    """
+
+    def __init__(self, capacity = constants.LOG_CAPACITY, parent = None):
+        super(logModel, self).__init__(parent)
+        self.__records = deque(maxlen = capacity)
+
+    def rowCount(self, parent = QModelIndex()):
+        if parent.isValid():
+            return 0
+        return len(self.__records)
+
+    def data(self, index, role = Qt.DisplayRole):
+        if role == Qt.DisplayRole and index.isValid():
+            return self.__records[index.row()]
+        return None
+
+    def appendRecords(self, records):
+        """Function which appends records, overflow removes rows from beginning of model
+
+        Parameters
+        ----------
+        records : list
+            records in order of arrival
+        """
+
+        capacity = self.__records.maxlen
+        records = records[-capacity:]
+        overflow = len(self.__records) + len(records) - capacity
+        if overflow > 0:
+            self.beginRemoveRows(QModelIndex(), 0, overflow - 1)
+            for _ in range(overflow):
+                self.__records.popleft()
+            self.endRemoveRows()
+
+        first = len(self.__records)
+        self.beginInsertRows(QModelIndex(), first, first + len(records) - 1)
+        self.__records.extend(records)
+        self.endInsertRows()
+
+    def clear(self):
+        self.beginResetModel()
+        self.__records.clear()
+        self.endResetModel()
+
+class logSink(QObject):
+    """
+    logSink, thread safe and throttled log output
+
+    Replacement for writing directly into QListWidget. addItem only puts record
+    into bounded queue, so it is cheap and can be called from worker threads.
+    Timer in GUI thread moves queued records into logModel in one batch, view
+    is laid out once per flush instead of once per record. When GUI cannot
+    keep up, the oldest queued records are dropped and number of dropped
+    records is logged. Optionally every record is also written into rotating file.
+
+    Methods
+    -------
+    addItem(self, string):
+        queues record, interface used by instrumentLogger
+    getModel(self) : logModel
+        returns model which should be set on QListView
+    flush(self):
+        moves queued records into model and file
+    close(self):
+        flushes and closes file
+    """
+
+    def __init__(self, view = None, fileName = None, parent = None):
+        """Initialization Method
+
+        Parameters
+        ----------
+        view : QtWidgets.QListView
+            view which shows records, None when model is used in other way
+        fileName : str
+            path of rotating log file, None disables file output
+        parent : QObject
+            owner of sink
+        """
+
+        super(logSink, self).__init__(parent)
+        self.__pending = deque(maxlen = constants.LOG_CAPACITY)
+        self.__dropped = 0
+        self.__lock = threading.Lock()
+        self.__model = logModel(constants.LOG_CAPACITY, self)
+        self.__fileName = fileName
+        self.__file = None
+        if fileName is not None:
+            self.__file = open(fileName, 'a', encoding = 'utf-8')
+
+        self.__view = view
+        if view is not None:
+            view.setModel(self.__model)
+            view.setUniformItemSizes(True)
+
+        self.__timer = QTimer(self)
+        self.__timer.timeout.connect(self.flush)
+        self.__timer.start(constants.LOG_FLUSH_INTERVAL)
+
+    def getModel(self):
+        return self.__model
+
+    def addItem(self, string):
+        with self.__lock:
+            if len(self.__pending) == self.__pending.maxlen:
+                self.__dropped += 1
+            self.__pending.append(string)
+
+    def flush(self):
+        with self.__lock:
+            if not self.__pending:
+                return
+            records = list(self.__pending)
+            self.__pending.clear()
+            dropped = self.__dropped
+            self.__dropped = 0
+
+        if dropped:
+            records.insert(0, '%d log records dropped' % dropped)
+
+        if self.__file is not None:
+            self.__write(records)
+
+        follow = self.__isAtBottom()
+        self.__model.appendRecords(records)
+        if follow:
+            self.__view.scrollToBottom()
+
+    def close(self):
+        self.__timer.stop()
+        self.flush()
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __write(self, records):
+        """Writes whole batch at once, file is rotated when it exceeds constants.LOG_FILE_SIZE"""
+
+        self.__file.write('\n'.join(records) + '\n')
+        self.__file.flush()
+        if self.__file.tell() >= constants.LOG_FILE_SIZE:
+            self.__file.close()
+            for index in range(constants.LOG_FILE_COUNT - 1, 0, -1):
+                source = '%s.%d' % (self.__fileName, index)
+                if os.path.exists(source):
+                    os.replace(source, '%s.%d' % (self.__fileName, index + 1))
+            os.replace(self.__fileName, self.__fileName + '.1')
+            self.__file = open(self.__fileName, 'w', encoding = 'utf-8')
+
+    def __isAtBottom(self):
+        if self.__view is None:
+            return False
+        scrollBar = self.__view.verticalScrollBar()
+        return scrollBar.value() == scrollBar.maximum()
@@ -1,22 +1,24 @@
-import sys
-import numpy as np
+import importlib
 
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 
 #Internal imports
+from uiLoader import loadForm
 import constants
 
 from chooseType import ui_ChooseType
-from chooseDevice import ui_ChooseDevice
-from signalGenerator import ui_SignalGenerator
-from errorBox import ui_ErrorBox
-from osciloscope import ui_Osciloscope
-from multimeter import ui_Multimeter
+from logSink import logSink
+from instrumentMetrics import instrumentMetrics
 
-from pV import pyVisaInterface
+#Controller windows, module and class are imported when user opens first window of that type
+CONTROLLERS = {
+    constants.MULTIMETER : ('multimeter', 'ui_Multimeter'),
+    constants.OSCILLOSCOPE : ('osciloscope', 'ui_Osciloscope'),
+    constants.SIGNALGENERATOR : ('signalGenerator', 'ui_SignalGenerator'),
+    }
 
 class ui_MainWindow(QtWidgets.QMainWindow):
     """
@@ -38,20 +40,43 @@ class ui_MainWindow(QtWidgets.QMainWindow):
         method for all nested windows to inform main window about closing event
     """
 
-    def __init__(self, pyVisaInit):
+    def __init__(self, pyVisaInit, logFile = constants.LOG_FILE_ENABLED):
+        """Initialization Method
+
+        Parameters
+        ----------
+        pyVisaInit : str
+            VISA library or backend, e.g. 'simulator/instruments.yaml@sim'
+        logFile : bool
+            also writes log into constants.LOG_FILE_NAME
+        """
+
         super(ui_MainWindow, self).__init__()
 
-        uic.loadUi("../UI/mainPanel.ui", self)
+        loadForm("mainPanel", self)
         self.__controlers=[]
         self.__window=[]
 
         self.__newControlerButton = self.findChild(QtWidgets.QPushButton, 'addControler')
         self.__newControlerButton.clicked.connect(self.__addNextControler)
 
-        self.__infoLog = self.findChild(QtWidgets.QListWidget, 'listWidget')
+        self.__statisticsButton = self.findChild(QtWidgets.QPushButton, 'statisticsButton')
+        self.__statisticsButton.clicked.connect(self.__showStatistics)
+        self.__statsPanel = None
+
+        self.__infoLog = self.findChild(QtWidgets.QListView, 'listWidget')
+        self.__logSink = logSink(self.__infoLog, constants.LOG_FILE_NAME if logFile else None, self)
 
-        #self.__pyVisa = pyVisaInterface('C:\Windows\System32\\visa64.dll',self.__infoLog) #temporary specifier "@sim" it's basicly a mock
-        self.__pyVisa = pyVisaInterface(pyVisaInit, self.__infoLog) #temporary specifier "@sim" it's basicly a mock
+        #pyVisa and VISA backend are loaded with first controller window
+        #self.__pyVisaInit = 'C:\Windows\System32\\visa64.dll'
+        self.__pyVisaInit = pyVisaInit #temporary specifier "@sim" it's basicly a mock
+        self.__sessionPool = None
+        #Metrics do not load pyVisa, they are filled by sessions of pool
+        self.__metrics = instrumentMetrics(constants.METRICS_ENABLED)
+
+        self.__sessionTimer = QTimer(self)
+        self.__sessionTimer.timeout.connect(self.__collectIdle)
+        self.__sessionTimer.start(constants.SESSION_COLLECT_INTERVAL)
 
         self.show()
 
@@ -60,6 +85,11 @@ class ui_MainWindow(QtWidgets.QMainWindow):
                                      QMessageBox.Yes | QMessageBox.No, (QMessageBox.No))
         if reply == QMessageBox.Yes:
             if not self.__controlers and not self.__window:
+                if self.__sessionPool is not None:
+                    self.__sessionPool.closeAll()
+                self.__logSink.close()
+                if self.__statsPanel is not None:
+                    self.__statsPanel.close()
                 event.accept()
             else:
                 QMessageBox.information(self, 'Warning', 'Cannot close main window when other instances are opened!')
@@ -68,13 +98,11 @@ class ui_MainWindow(QtWidgets.QMainWindow):
             event.ignore()
 
     def callBackDeviceType(self, string):
-        if string == constants.MULTIMETER:
-            self.__controlers.append(ui_Multimeter(self, self.__pyVisa))
-        elif string == constants.OSCILLOSCOPE:
-            #self.controlers.append(ui_Osciloscope(self))
-            self.__errorWindow = ui_ErrorBox(9999999999)
-        elif string == constants.SIGNALGENERATOR:
-            self.__controlers.append(ui_SignalGenerator(self, self.__pyVisa))
+        if string in CONTROLLERS:
+            from pV import pyVisaInterface
+            moduleName, className = CONTROLLERS[string]
+            controler = getattr(importlib.import_module(moduleName), className)
+            self.__controlers.append(controler(self, pyVisaInterface(self.__getSessionPool(), self.__logSink, string)))
 
     def deleteElement(self, string):
         if string == constants.EXTERNALWINDOW:
@@ -82,6 +110,23 @@ class ui_MainWindow(QtWidgets.QMainWindow):
         elif string == constants.INTERNALWINDOW:
             self.__window.pop()
 
+    def __getSessionPool(self):
+        if self.__sessionPool is None:
+            from sessionPool import sessionPool
+            self.__sessionPool = sessionPool(self.__pyVisaInit, metrics = self.__metrics)
+        return self.__sessionPool
+
+    def __showStatistics(self):
+        if self.__statsPanel is None:
+            from statsPanel import ui_StatsPanel
+            self.__statsPanel = ui_StatsPanel(self.__metrics)
+        self.__statsPanel.show()
+        self.__statsPanel.raise_()
+
+    def __collectIdle(self):
+        if self.__sessionPool is not None:
+            self.__sessionPool.collectIdle()
+
     def __addNextControler(self):
         self.__deviceTypeTemp = ""
         if not self.__window:
@@ -0,0 +1,313 @@
+import os
+import json
+import time
+import queue
+import threading
+
+import numpy as np
+
+#Internal imports
+import constants
+
+INDEX_FILE_NAME = 'index.json'
+TIMESTAMP = 'timestamp'
+VALUE = 'value'
+
+class measurementStore:
+    """
+    measurementStore, append-only columnar store of timestamped readings on disk
+
+    Store is directory with index and .npy segments:
+        index.json                     - streams, their segments and number of written rows
+        s<stream>-<segment>.<column>.npy - one column of one segment, preallocated for its size,
+                                         first segment has firstSegmentSize rows and every
+                                         next one twice as many, up to segmentSize rows
+    Stream is series of readings of one instrument in one mode and unit, every stream
+    has timestamp column and its own columns (value, or e.g. frequency, amplitude and value
+    of sweep). Segment files are plain .npy, so they can be read back with numpy.load(mmap_mode = 'r')
+    without loading them into RAM, see storeReader.
+
+    append() only puts copy of arrays into queue, writer thread copies them into memory
+    mapped segments and rewrites index every constants.STORE_FLUSH_INTERVAL seconds, so
+    acquisition thread never waits for disk. Index is replaced atomically and counts only
+    rows already flushed to segments, so readers (also during recording) never see unwritten rows.
+    Opening existing directory continues its streams.
+
+    Methods
+    -------
+    append(self, instrument, mode, unit, timestamps, values):
+        queues readings of instrument
+    appendRecords(self, instrument, mode, unit, records):
+        queues structured array (e.g. sweepEngine results), fields become columns
+    flush(self, timeout = None) : bool
+        waits until all queued readings are written and index is updated
+    close(self):
+        writes queued readings and stops writer thread
+    getDirectory(self) : str
+        returns directory of store
+    getReader(self) : storeReader
+        returns reader of this store
+    """
+
+    def __init__(self, directory, segmentSize = constants.STORE_SEGMENT_SIZE, firstSegmentSize = constants.STORE_FIRST_SEGMENT_SIZE):
+        """Initialization Method
+
+        Parameters
+        ----------
+        directory : str
+            directory of store, created when it does not exist
+        segmentSize : int
+            maximal rows of one segment, used only by new store
+        firstSegmentSize : int
+            rows of first segment of stream, short recordings do not allocate whole segmentSize
+        """
+
+        self.__directory = directory
+        os.makedirs(directory, exist_ok = True)
+        self.__index = _readIndex(directory) or {'version' : 1, 'segmentSize' : int(segmentSize), 'streams' : []}
+        self.__segmentSize = self.__index['segmentSize']
+        self.__firstSegmentSize = max(1, min(int(firstSegmentSize), self.__segmentSize))
+        #Opened memory maps of last segment of every stream, keyed by stream id
+        self.__open = {}
+        self.__queue = queue.Queue()
+        self.__thread = threading.Thread(target = self.__run, name = 'measurementStore', daemon = True)
+        self.__thread.start()
+
+    def getDirectory(self):
+        return self.__directory
+
+    def getReader(self):
+        return storeReader(self.__directory)
+
+    def append(self, instrument, mode, unit, timestamps, values):
+        """Function which queues readings, safe to call from any thread
+
+        Parameters
+        ----------
+        instrument : str
+            address or name of instrument
+        mode : str
+            measured quantity, e.g. constants.VOLTAGE_DC
+        unit : str
+            unit of values, e.g. constants.unitVoltage
+        timestamps : array_like
+            time of readings, seconds since epoch, increasing
+        values : array_like
+            readings
+        """
+
+        self.__queue.put(((instrument, mode, unit, (TIMESTAMP, VALUE)),
+                          (np.array(timestamps, dtype = np.float64, ndmin = 1), np.array(values, dtype = np.float64, ndmin = 1))))
+
+    def appendRecords(self, instrument, mode, unit, records):
+        """Function which queues structured array, it has to contain timestamp field"""
+
+        names = records.dtype.names
+        if TIMESTAMP not in names:
+            raise ValueError('Records have no %s field' % TIMESTAMP)
+        names = (TIMESTAMP,) + tuple(name for name in names if name != TIMESTAMP)
+        self.__queue.put(((instrument, mode, unit, names), tuple(np.array(records[name], ndmin = 1) for name in names)))
+
+    def flush(self, timeout = None):
+        done = threading.Event()
+        self.__queue.put(done)
+        return done.wait(timeout)
+
+    def close(self):
+        if self.__thread.is_alive():
+            self.__queue.put(None)
+            self.__thread.join()
+
+    def __run(self):
+        lastIndex = time.monotonic()
+        dirty = False
+        while True:
+            try:
+                item = self.__queue.get(timeout = constants.STORE_FLUSH_INTERVAL)
+            except queue.Empty:
+                item = False
+
+            if item is None or isinstance(item, threading.Event):
+                if dirty:
+                    self.__writeIndex()
+                    dirty = False
+                lastIndex = time.monotonic()
+                if item is None:
+                    self.__release()
+                    return
+                item.set()
+                continue
+
+            if item:
+                key, arrays = item
+                self.__write(self.__stream(*key), arrays)
+                dirty = True
+            if dirty and time.monotonic() - lastIndex >= constants.STORE_FLUSH_INTERVAL:
+                self.__writeIndex()
+                dirty = False
+                lastIndex = time.monotonic()
+
+    def __stream(self, instrument, mode, unit, columns):
+        for stream in self.__index['streams']:
+            if (stream['instrument'], stream['mode'], stream['unit'], tuple(stream['columns'])) == (instrument, mode, unit, columns):
+                return stream
+        stream = {'id' : len(self.__index['streams']), 'instrument' : instrument, 'mode' : mode, 'unit' : unit,
+                  'columns' : list(columns), 'dtypes' : None, 'segments' : []}
+        self.__index['streams'].append(stream)
+        return stream
+
+    def __write(self, stream, arrays):
+        if stream['dtypes'] is None:
+            stream['dtypes'] = [array.dtype.str for array in arrays]
+        length = len(arrays[0])
+        written = 0
+        while written < length:
+            segment, maps = self.__segment(stream)
+            count = min(length - written, self.__sizeOf(segment) - segment['count'])
+            for memoryMap, array in zip(maps, arrays):
+                memoryMap[segment['count']:segment['count'] + count] = array[written:written + count]
+            timestamps = arrays[0][written:written + count]
+            if segment['count'] == 0:
+                segment['first'] = float(timestamps[0])
+            segment['last'] = float(timestamps[-1])
+            segment['count'] += count
+            written += count
+
+    def __segment(self, stream):
+        """Returns last segment of stream with free rows and its opened columns"""
+
+        segments = stream['segments']
+        opened = self.__open.get(stream['id'])
+        if segments and segments[-1]['count'] < self.__sizeOf(segments[-1]):
+            segment = segments[-1]
+            if opened is None or opened[0] is not segment:
+                opened = (segment, [np.lib.format.open_memmap(self.__path(segment, column), mode = 'r+')
+                                    for column in stream['columns']])
+                self.__open[stream['id']] = opened
+            return opened
+        if opened is not None:
+            for memoryMap in opened[1]:
+                memoryMap.flush()
+
+        #Segments grow geometrically, short recording does not leave megabytes of preallocated rows
+        size = min(self.__segmentSize, self.__sizeOf(segments[-1]) * 2) if segments else self.__firstSegmentSize
+        segment = {'file' : 's%03d-%06d' % (stream['id'], len(segments)), 'count' : 0, 'first' : None, 'last' : None, 'size' : size}
+        maps = [np.lib.format.open_memmap(self.__path(segment, column), mode = 'w+', dtype = np.dtype(dtype),
+                                          shape = (size,))
+                for column, dtype in zip(stream['columns'], stream['dtypes'])]
+        segments.append(segment)
+        self.__open[stream['id']] = (segment, maps)
+        return segment, maps
+
+    def __sizeOf(self, segment):
+        #Stores written before segments grew have all segments of segmentSize rows
+        return segment.get('size', self.__segmentSize)
+
+    def __path(self, segment, column):
+        return os.path.join(self.__directory, '%s.%s.npy' % (segment['file'], column))
+
+    def __writeIndex(self):
+        #Data first, index never counts rows which are not on disk yet
+        for _, maps in self.__open.values():
+            for memoryMap in maps:
+                memoryMap.flush()
+        path = os.path.join(self.__directory, INDEX_FILE_NAME)
+        with open(path + '.tmp', 'w', encoding = 'utf-8') as file:
+            json.dump(self.__index, file, indent = 1)
+        os.replace(path + '.tmp', path)
+
+    def __release(self):
+        self.__open.clear()
+
+class storeReader:
+    """
+    storeReader, read access to measurementStore directory
+
+    Columns are memory-mapped, only rows which are really used are loaded from disk.
+    Segments without rows in requested time range are not opened at all, time range
+    inside segment is found by binary search on memory-mapped timestamps.
+
+    Methods
+    -------
+    refresh(self):
+        reads index again, e.g. while store is still recording
+    streams(self) : list
+        returns dictionaries with id, instrument, mode, unit, columns, count, first and last timestamp
+    find(self, instrument = None, mode = None, unit = None) : list
+        returns ids of streams matching given fields
+    segments(self, stream, start = None, stop = None) : generator
+        yields dictionaries of memory-mapped columns, one per segment, limited to time range
+    read(self, stream, start = None, stop = None) : dict
+        returns columns of time range as arrays, copies only selected rows
+    """
+
+    def __init__(self, directory):
+        self.__directory = directory
+        self.refresh()
+
+    def refresh(self):
+        self.__index = _readIndex(self.__directory) or {'streams' : []}
+
+    def streams(self):
+        result = []
+        for stream in self.__index['streams']:
+            segments = [segment for segment in stream['segments'] if segment['count']]
+            result.append({'id' : stream['id'], 'instrument' : stream['instrument'], 'mode' : stream['mode'],
+                           'unit' : stream['unit'], 'columns' : list(stream['columns']),
+                           'count' : sum(segment['count'] for segment in segments),
+                           'first' : segments[0]['first'] if segments else None,
+                           'last' : segments[-1]['last'] if segments else None})
+        return result
+
+    def find(self, instrument = None, mode = None, unit = None):
+        return [stream['id'] for stream in self.__index['streams']
+                if (instrument is None or stream['instrument'] == instrument) and
+                   (mode is None or stream['mode'] == mode) and (unit is None or stream['unit'] == unit)]
+
+    def segments(self, stream, start = None, stop = None):
+        """Function which yields columns of every segment of stream
+
+        Parameters
+        ----------
+        stream : int
+            id of stream
+        start : float
+            first timestamp, None from beginning
+        stop : float
+            last timestamp (included), None until end
+
+        Yields
+        ------
+        dict
+            numpy.memmap (read-only) of every column keyed by column name
+        """
+
+        stream = self.__index['streams'][stream]
+        for segment in stream['segments']:
+            if not segment['count']:
+                continue
+            if (start is not None and segment['last'] < start) or (stop is not None and segment['first'] > stop):
+                continue
+            columns = {column : np.load(os.path.join(self.__directory, '%s.%s.npy' % (segment['file'], column)),
+                                        mmap_mode = 'r')[:segment['count']]
+                       for column in stream['columns']}
+            timestamps = columns[TIMESTAMP]
+            first = 0 if start is None or segment['first'] >= start else int(np.searchsorted(timestamps, start, 'left'))
+            last = segment['count'] if stop is None or segment['last'] <= stop else int(np.searchsorted(timestamps, stop, 'right'))
+            if first < last:
+                yield {column : values[first:last] for column, values in columns.items()}
+
+    def read(self, stream, start = None, stop = None):
+        parts = list(self.segments(stream, start, stop))
+        columns = self.__index['streams'][stream]['columns']
+        if not parts:
+            dtypes = self.__index['streams'][stream]['dtypes'] or [np.float64] * len(columns)
+            return {column : np.zeros(0, dtype = dtype) for column, dtype in zip(columns, dtypes)}
+        return {column : np.concatenate([part[column] for part in parts]) for column in columns}
+
+def _readIndex(directory):
+    try:
+        with open(os.path.join(directory, INDEX_FILE_NAME), encoding = 'utf-8') as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return None
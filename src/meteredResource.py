@@ -0,0 +1,123 @@
+import time
+import struct
+
+import pyvisa
+from pyvisa import util
+from pyvisa.constants import StatusCode
+
+#Internal imports
+from errorHandler import getError
+from instrumentMetrics import commandHeader, TIMEOUTS, ERRORS, RETRYABLE_ERRORS
+
+class meteredResource:
+    """
+    meteredResource, proxy of pyVisa resource which measures every I/O call
+
+    Installed by sessionPool when application collects metrics. Every write, read
+    and query is timed into histogram of its SCPI header, written and read bytes
+    are counted, VISA timeouts and errors are counted and raised further. Other
+    attributes (timeout, baud_rate, events...) are forwarded to resource, so
+    pyVisaInterface, scpiBatch and completionWaiter use proxy like resource.
+    When metrics are disabled calls go straight to resource.
+    """
+
+    def __init__(self, resource, device, metrics):
+        """Initialization Method
+
+        Parameters
+        ----------
+        resource : pyvisa.resources.MessageBasedResource
+            opened resource
+        device : deviceMetrics
+            statistics of device
+        metrics : instrumentMetrics
+            owner of statistics, holds enabled flag
+        """
+
+        object.__setattr__(self, '_meteredResource__resource', resource)
+        object.__setattr__(self, '_meteredResource__device', device)
+        object.__setattr__(self, '_meteredResource__metrics', metrics)
+
+    def __getattr__(self, name):
+        return getattr(self.__resource, name)
+
+    def __setattr__(self, name, value):
+        setattr(self.__resource, name, value)
+
+    def write(self, message, termination = None, encoding = None):
+        if not self.__metrics.enabled:
+            return self.__resource.write(message, termination, encoding)
+        start = time.perf_counter()
+        result = self.__call(self.__resource.write, message, termination, encoding)
+        self.__device.observe(commandHeader(message), time.perf_counter() - start,
+                              len(message) + len(self.__resource.write_termination if termination is None else termination))
+        return result
+
+    def read(self, termination = None, encoding = None):
+        if not self.__metrics.enabled:
+            return self.__resource.read(termination, encoding)
+        start = time.perf_counter()
+        response = self.__call(self.__resource.read, termination, encoding)
+        self.__device.observe('read', time.perf_counter() - start, 0, len(response) + len(self.__resource.read_termination or ''))
+        return response
+
+    def query(self, message, delay = None):
+        if not self.__metrics.enabled:
+            return self.__resource.query(message, delay)
+        start = time.perf_counter()
+        response = self.__call(self.__resource.query, message, delay)
+        self.__device.observe(commandHeader(message), time.perf_counter() - start,
+                              len(message) + len(self.__resource.write_termination),
+                              len(response) + len(self.__resource.read_termination or ''))
+        return response
+
+    def query_ascii_values(self, message, converter = 'f', separator = ',', container = list, delay = None):
+        if not self.__metrics.enabled:
+            return self.__resource.query_ascii_values(message, converter, separator, container, delay)
+        #Same as pyVisa: one query, response parsed by util.from_ascii_block
+        return util.from_ascii_block(self.query(message, delay), converter, separator, container)
+
+    def query_binary_values(self, message, datatype = 'f', is_big_endian = False, container = list, *args, **kwargs):
+        if not self.__metrics.enabled:
+            return self.__resource.query_binary_values(message, datatype, is_big_endian, container, *args, **kwargs)
+        start = time.perf_counter()
+        values = self.__call(self.__resource.query_binary_values, message, datatype, is_big_endian, container, *args, **kwargs)
+        #IEEE 488.2 definite-length block: #<digits><length><data><termination>
+        length = len(values) * struct.calcsize(datatype)
+        self.__device.observe(commandHeader(message), time.perf_counter() - start,
+                              len(message) + len(self.__resource.write_termination),
+                              2 + len(str(length)) + length + len(self.__resource.read_termination or ''))
+        return values
+
+    def write_raw(self, message):
+        if not self.__metrics.enabled:
+            return self.__resource.write_raw(message)
+        start = time.perf_counter()
+        result = self.__call(self.__resource.write_raw, message)
+        self.__device.observe(commandHeader(message.decode('ascii', 'replace')), time.perf_counter() - start, len(message))
+        return result
+
+    def read_raw(self, size = None):
+        if not self.__metrics.enabled:
+            return self.__resource.read_raw(size)
+        start = time.perf_counter()
+        data = self.__call(self.__resource.read_raw, size)
+        self.__device.observe('read', time.perf_counter() - start, 0, len(data))
+        return data
+
+    def read_bytes(self, count, *args, **kwargs):
+        if not self.__metrics.enabled:
+            return self.__resource.read_bytes(count, *args, **kwargs)
+        start = time.perf_counter()
+        data = self.__call(self.__resource.read_bytes, count, *args, **kwargs)
+        self.__device.observe('read', time.perf_counter() - start, 0, len(data))
+        return data
+
+    def __call(self, function, *args, **kwargs):
+        try:
+            return function(*args, **kwargs)
+        except pyvisa.errors.VisaIOError as error:
+            self.__device.count(TIMEOUTS if error.error_code == StatusCode.error_timeout else ERRORS)
+            if getError(error.error_code).retryable:
+                self.__device.count(RETRYABLE_ERRORS)
+            raise
@@ -0,0 +1,181 @@
+import re
+import math
+
+import numpy as np
+
+#Internal imports
+import constants
+
+#Engineering prefixes from the smallest one, every next one is 1000 times larger
+PREFIXES = ((constants.signPico, constants.pico), (constants.signNano, constants.nano),
+            (constants.signMicro, constants.micro), (constants.signMili, constants.mili),
+            ('', constants.none), (constants.signKilo, constants.kilo),
+            (constants.signMega, constants.Mega), (constants.signGiga, constants.Giga))
+_LOWEST = -12
+_HIGHEST = 9
+
+#Signs accepted on input, u and micro sign are typed more easily than greek mu
+_FACTORS = dict(PREFIXES)
+_FACTORS.update({constants.signNone : constants.none, 'u' : constants.micro, 'µ' : constants.micro, 'K' : constants.kilo})
+_SIGNS = np.array([sign for sign, _ in PREFIXES])
+
+#Units which may follow value when caller does not tell which one is expected
+UNITS = (constants.unitVoltage, constants.unitCurrent, constants.unitResistance, constants.unitFrequency,
+         constants.unitPeroid, constants.unitAmplitude, 'Ohm')
+
+_NUMBER = r'[+-]?(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?'
+_PREFIX = '[' + ''.join(sign for sign in _FACTORS if len(sign) == 1 and sign != constants.signNone) + ']'
+_VALUE = re.compile(r'\s*(' + _NUMBER + r')\s*(' + _PREFIX + r'?)\s*(\S*)\s*$')
+
+def prefixFactor(sign):
+    """Function which returns factor of metric prefix, e.g. 'k' -> 1000.0, constants.signNone and '' -> 1.0
+
+    Raises
+    ------
+    ValueError
+        when sign is not metric prefix
+    """
+
+    try:
+        return _FACTORS[sign]
+    except KeyError:
+        raise ValueError('Unknown metric prefix %r' % sign) from None
+
+def prefixOf(value):
+    """Function which returns engineering prefix of value, e.g. 0.047 -> ('m', 0.001), 470 -> ('', 1.0)
+
+    Returns
+    -------
+    touple
+        sign of prefix, empty for values from 1 to 999, and its factor
+    """
+
+    exponent = _exponent(value)
+    return PREFIXES[(exponent - _LOWEST) // 3]
+
+def parseValue(text, unit = None):
+    """Function which reads value written in engineering notation
+
+    Accepted are plain numbers, exponents and metric prefixes optionally followed by unit,
+    e.g. "4.7k", "120 mV", "1e-6", "2.5 MHz", "-0.1". Prefix is case sensitive (m is mili,
+    M is Mega), unit is not.
+
+    Parameters
+    ----------
+    text : str
+        value typed by user
+    unit : str
+        expected unit, e.g. constants.unitFrequency, None accepts every unit of UNITS
+
+    Returns
+    -------
+    float
+        value in base unit, e.g. 0.12 for "120 mV"
+
+    Raises
+    ------
+    ValueError
+        when text is not value or it has other unit
+    """
+
+    match = _VALUE.match(text)
+    if match is None:
+        raise ValueError('Invalid value %r' % text)
+    number, sign, rest = match.groups()
+    units = UNITS if unit is None else (unit,)
+    if rest and not _isUnit(rest, units):
+        #Unit starting with letter of prefix, e.g. "m" of unit "mil"
+        if not sign or not _isUnit(sign + rest, units):
+            raise ValueError('Invalid unit of value %r' % text)
+        sign = ''
+    if not sign:
+        return float(number)
+    #Prefix is added to exponent of text, so "3.3n" is exactly 3.3e-09, not product of two rounded floats
+    mantissa, _, exponent = number.lower().partition('e')
+    return float('%se%d' % (mantissa, int(exponent or 0) + round(math.log10(_FACTORS[sign]))))
+
+def inputPattern(unit = '', signed = False):
+    """Function which returns regular expression of parseValue input, e.g. for QRegExpValidator
+
+    Parameters
+    ----------
+    unit : str
+        unit which may follow value
+    signed : bool
+        allows negative values
+    """
+
+    number = _NUMBER[len('[+-]?'):]
+    return '%s%s\\s*%s?%s' % ('[+-]?' if signed else '', number, _PREFIX, ('(%s)?' % re.escape(unit)) if unit else '')
+
+def formatValue(value, unit = '', digits = constants.ENGINEERING_DIGITS):
+    """Function which writes value in engineering notation, e.g. (0.12, 'V') -> '120 mV'
+
+    Overloaded reading (constants.OVERLOAD) is written as constants.OVERLOAD_TEXT,
+    NaN and infinity without prefix.
+
+    Parameters
+    ----------
+    value : float
+        value in base unit
+    unit : str
+        unit written after prefix
+    digits : int
+        significant digits
+    """
+
+    if constants.OVERLOAD <= abs(value) < math.inf:
+        return ('-' if value < 0 else '') + constants.OVERLOAD_TEXT
+    exponent = _exponent(value)
+    mantissa = value / 10.0 ** exponent if exponent else value
+    #Rounding may reach next prefix, e.g. 999.9999 -> 1000
+    if math.isfinite(mantissa) and abs(mantissa) >= _carryLimit(digits) and exponent < _HIGHEST:
+        exponent += 3
+        mantissa = value / 10.0 ** exponent if exponent else value
+    text = '%.*g %s%s' % (digits, mantissa, PREFIXES[(exponent - _LOWEST) // 3][0], unit)
+    return text.rstrip()
+
+def formatArray(values, unit = '', digits = constants.ENGINEERING_DIGITS):
+    """Function which writes every value of array in engineering notation, the same way as formatValue
+
+    Prefix of every value is chosen separately, all values are converted at once by NumPy,
+    so thousands of readings do not need Python loop.
+
+    Returns
+    -------
+    numpy.ndarray
+        strings of the same shape as values
+    """
+
+    values = np.asarray(values, dtype = np.float64)
+    magnitude = np.abs(values)
+    valid = np.isfinite(magnitude) & (magnitude > 0)
+    exponents = np.zeros(values.shape, dtype = np.intp)
+    exponents[valid] = np.floor(np.log10(magnitude[valid]) / 3).astype(np.intp) * 3
+    np.clip(exponents, _LOWEST, _HIGHEST, out = exponents)
+    mantissa = values / 10.0 ** exponents
+    carry = valid & (np.abs(mantissa) >= _carryLimit(digits)) & (exponents < _HIGHEST)
+    if carry.any():
+        exponents[carry] += 3
+        mantissa[carry] = values[carry] / 10.0 ** exponents[carry]
+    text = np.char.rstrip(np.char.add(np.char.mod('%%.%dg ' % digits, mantissa), np.char.add(_SIGNS[(exponents - _LOWEST) // 3], unit)))
+    overload = valid & (magnitude >= constants.OVERLOAD)
+    if overload.any():
+        text = text.astype('<U%d' % max(text.itemsize // 4, len(constants.OVERLOAD_TEXT) + 1))
+        text[overload] = np.where(values[overload] < 0, '-' + constants.OVERLOAD_TEXT, constants.OVERLOAD_TEXT)
+    return text
+
+def _exponent(value):
+    """Returns exponent of engineering prefix of value, multiple of 3, 0 for zero, NaN and infinity"""
+
+    magnitude = abs(value)
+    if not magnitude > 0 or magnitude == math.inf:
+        return 0
+    exponent = math.floor(math.log10(magnitude) / 3) * 3
+    return min(max(exponent, _LOWEST), _HIGHEST)
+
+def _carryLimit(digits):
+    return 1000.0 - 0.5 * 10.0 ** (3 - digits)
+
+def _isUnit(text, units):
+    return any(text.lower() == unit.lower() for unit in units)
@@ -1,20 +1,25 @@
-import sys
-import numpy as np
+import os
 import time
 
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import QRegExpValidator
 
 #Internal imports
+from uiLoader import loadForm
 import constants
 
 from chooseDevice import ui_ChooseDevice
 from errorBox import ui_ErrorBox
-
-from pV import pyVisaInterface
+from asyncDispatcher import asyncDispatcher
+from acquisition import acquisitionEngine
+from measurementStore import measurementStore
+from trendPlot import trendPlot
+from autoRange import rangePredictor, rangePrefix, measureWithRange
+from metricPrefix import prefixFactor
+from capabilities import multimeterCapabilities
 
 class ui_Multimeter(QtWidgets.QMainWindow):
     """
@@ -46,11 +51,16 @@ class ui_Multimeter(QtWidgets.QMainWindow):
     modeSelector : QtWidgets.QComboBox
         UI widget combo box which allow to select the shape of output function
     metricPrefixSelector : QtWidgets.QComboBox
-        UI widget combo box which allot to select metric prefix
+        UI widget combo box which allot to select metric prefix, Auto keeps range of
+        continuous acquisition with rangePredictor and shows prefix of selected range
     measureButton : QtWidgets.QPushButton
-        UI widget button which call measure start method
+        UI widget button which starts and stops continuous acquisition
+    sampleRateSpinBox : QtWidgets.QDoubleSpinBox
+        UI widget spin box to enter acquisition rate in Hz
+    recordCheckBox : QtWidgets.QCheckBox
+        UI widget check box which enables recording of readings into measurement store
     autoMeasureButton : QtWidgets.QPushButton
-        UI widget button which call automeasure start method
+        UI widget button which measures one reading on range predicted from previous readings
     statusTextBrowser : QtWidgets.QTextBrowser
         UI widget text browser which shows status of connection
     checkErrorButton : QtWidgets.QPushButton
@@ -61,6 +71,21 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         Baud Rate value for specifed device
     errorWindow : ui_ErrorBox
         UI widget for error window hook
+    dispatcher : asyncDispatcher
+        delivers results of instrument I/O executed in worker thread
+    acquisition : acquisitionEngine
+        continuous sampling engine which fills ring buffer
+    displayTimer : QTimer
+        refreshes valueDisplay from ring buffer, independent of acquisition rate
+    trendPlot : trendPlot
+        UI widget plot of whole continuous acquisition, redrawn by own timer
+    capabilities : multimeterCapabilities
+        ranges of connected multimeter
+    predictors : dict
+        rangePredictor of every mode, range history is kept while window is opened
+    store : measurementStore
+        store of recorded readings, created with first recorded reading in
+        constants.STORE_DIRECTORY, one directory per window
 
     Methods
     -------
@@ -73,7 +98,9 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         super(ui_Multimeter, self).__init__()
         self.__external = external
         self.__pyVisa = pyVisa
-        uic.loadUi("../UI/multimeter.ui", self)
+        self.__dispatcher = asyncDispatcher(self, self.__pyVisa.getLogger())
+        self.__pyVisa.setErrorCallback(self.__dispatcher.reportError)
+        loadForm("multimeter", self)
 
         self.textBrowser = self.findChild(QtWidgets.QTextBrowser,'textBrowser')
         self.textBrowser.setReadOnly(True)
@@ -110,11 +137,33 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         self.metricPrefixSelector.addItem(constants.signNone)
         self.metricPrefixSelector.addItem(constants.signKilo)
         self.metricPrefixSelector.addItem(constants.signMega)
+        self.metricPrefixSelector.addItem(constants.signAuto)
         self.metricPrefixSelector.setCurrentIndex(2)
 
         self.measureButton = self.findChild(QtWidgets.QPushButton, 'measureButton')
         self.measureButton.clicked.connect(self.__measureStart)
 
+        self.sampleRateSpinBox = self.findChild(QtWidgets.QDoubleSpinBox, 'sampleRateSpinBox')
+        self.sampleRateSpinBox.setRange(0.1, constants.MAX_SAMPLE_RATE)
+        self.sampleRateSpinBox.setValue(constants.DEFAULT_SAMPLE_RATE)
+
+        self.recordCheckBox = self.findChild(QtWidgets.QCheckBox, 'recordCheckBox')
+
+        self.trendPlot = self.findChild(trendPlot, 'trendPlot')
+
+        self.__acquisition = acquisitionEngine(self.__pyVisa)
+        self.__store = None
+        self.__capabilities = multimeterCapabilities()
+        self.__predictors = {}
+        #Mode and predictor of running acquisition, mode and range shown in rangeInfoTextBrowser
+        self.__activeMode = None
+        self.__activePredictor = None
+        self.__shownRange = None
+        self.__prefixFactor = 1.0
+
+        self.displayTimer = QTimer(self)
+        self.displayTimer.timeout.connect(self.__refreshDisplay)
+
         self.autoMeasureButton = self.findChild(QtWidgets.QPushButton, 'autoMeasureButton')
         self.autoMeasureButton.clicked.connect(self.__auto)
 
@@ -123,7 +172,7 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         self.statusTextBrowser.append(self.__pyVisa.getDeviceStatus())
 
         self.checkErrorButton = self.findChild(QtWidgets.QPushButton, 'checkErrorButton')   
-        self.checkErrorButton.clicked.connect(self.__pyVisa.checkErrorBus)
+        self.checkErrorButton.clicked.connect(self.__checkErrorBus)
 
         self.show()
 
@@ -142,6 +191,15 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         reply = QMessageBox.question(self, 'Window Close', 'Are you sure you want to close the window?',
                                      QMessageBox.Yes | QMessageBox.No, (QMessageBox.No))
         if reply == QMessageBox.Yes:
+            self.__acquisition.stop()
+            self.displayTimer.stop()
+            self.trendPlot.stop()
+            if self.__store is not None:
+                #Burst in flight may still be recorded, store is closed after acquisition thread ends
+                store = self.__store
+                self.__acquisition.finished().add_done_callback(lambda finished: store.close())
+            self.__dispatcher.cancelAll()
+            self.__pyVisa.submit(self.__pyVisa.closeResource)
             self.__external.deleteElement(constants.EXTERNALWINDOW)
             event.accept()
         else:
@@ -187,8 +245,6 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         self.baudRate = baudRate
 
         self.__configureInstrument()
-        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
-            self.__pyVisa.getDeviceName(self.__callBackAppendDeviceName)
 
     def __chooseDeviceWindow(self):
         """Choose device Window
@@ -203,26 +259,141 @@ class ui_Multimeter(QtWidgets.QMainWindow):
     def __configureInstrument(self):
         instrumentName = self.textBrowser.toPlainText()
         if instrumentName:
-            self.__pyVisa.openResource(instrumentName)
-            if self.__pyVisa.getDeviceStatus() == constants.OPENED:
-                self.__pyVisa.configureCommunication(self.baudRate)
-                self.statusTextBrowser.append(self.__pyVisa.getDeviceStatus())
-            else:
-                self.errorWindow = ui_ErrorBox(1000000101)
+            future = self.__pyVisa.submit(self.__openInstrument, instrumentName, self.baudRate, address = instrumentName)
+            self.__dispatcher.watch(future, self.__callBackInstrumentConfigured, constants.COMMAND_TIMEOUT)
+
+    def __openInstrument(self, instrumentName, baudRate):
+        """Function executed in worker thread which opens and configures device
+
+        Returns
+        -------
+        touple
+            flag if device was opened, state of device and its name,
+            name is None when device is not configured
+        """
+
+        names = []
+        self.__pyVisa.openResource(instrumentName)
+        if not self.__pyVisa.getDeviceStatus() == constants.OPENED:
+            return False, self.__pyVisa.getDeviceStatus(), None
+        self.__pyVisa.configureCommunication(baudRate)
+        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
+            self.__pyVisa.getDeviceName(names.append)
+        return True, self.__pyVisa.getDeviceStatus(), (names[0] if names else None)
+
+    def __callBackInstrumentConfigured(self, result):
+        opened, state, name = result
+        if not opened:
+            self.errorWindow = ui_ErrorBox(1000000101)
+            return
+        self.statusTextBrowser.append(state)
+        if name is not None:
+            self.__callBackAppendDeviceName(name)
+        #Range history belongs to previous device
+        self.__capabilities = multimeterCapabilities.fromIdentity(name)
+        self.__predictors = {}
+
+    def __checkErrorBus(self):
+        self.__dispatcher.watch(self.__pyVisa.submit(self.__pyVisa.checkErrorBus))
 
     def __auto(self):
+        """Auto Measure
+
+        Measures one reading without autorange of device: range is predicted from previous
+        readings of the same mode and changed only on overload or underrange. Modes
+        without fixed ranges (frequency, period) use autorange of device.
+        """
+
+        if self.__acquisition.isRunning():
+            return
         if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
-            self.__setInfo(self.__convertModeToUnit(str(self.modeSelector.currentText())), constants.signNone)
-            self.__pyVisa.autoMeasure(str(self.modeSelector.currentText()), __callBackOnMeasureDone)
+            mode = str(self.modeSelector.currentText())
+            predictor = self.__getPredictor(mode)
+            if predictor is None:
+                self.__prefixFactor = 1.0
+                self.__shownRange = None
+                self.__setInfo(self.__convertModeToUnit(mode), constants.signNone)
+                future = self.__pyVisa.submit(self.__pyVisa.triggerMeasure, mode, timeout = constants.COMMAND_TIMEOUT)
+            else:
+                future = self.__pyVisa.submit(measureWithRange, self.__pyVisa, mode, predictor, timeout = constants.COMMAND_TIMEOUT)
+            self.__dispatcher.watch(future, lambda value: self.__callBackOnMeasureDone(value, mode, predictor))
         else:
             self.errorWindow = ui_ErrorBox(1000000100)
 
+    def __getPredictor(self, mode):
+        """Returns rangePredictor of mode, None when mode has no fixed ranges"""
+
+        if mode not in self.__predictors:
+            ranges = self.__capabilities.getRanges(mode)
+            self.__predictors[mode] = rangePredictor(ranges, self.__capabilities.getOverrange()) if ranges else None
+        return self.__predictors[mode]
+
+    def __showRange(self, mode, predictor):
+        """Shows prefix of range selected by predictor, readings are displayed in that prefix"""
+
+        fullScale = predictor.getRange()
+        if (mode, fullScale) != self.__shownRange:
+            sign, self.__prefixFactor = rangePrefix(fullScale)
+            self.__setInfo(self.__convertModeToUnit(mode), sign)
+            self.__shownRange = (mode, fullScale)
+
     def __measureStart(self):
-        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
-            self.__setInfo(self.__convertModeToUnit(str(self.modeSelector.currentText())),str(self.metricPrefixSelector.currentText()))
+        """Measure Start
+
+        Starts continuous acquisition of selected mode, or stops it when it is already running.
+        Samples go to ring buffer of acquisitionEngine, display is refreshed by displayTimer
+        and trendPlot by its own timer.
+        """
+
+        if self.__acquisition.isRunning():
+            self.__measureStop()
+        elif self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
+            mode = str(self.modeSelector.currentText())
+            prefix = str(self.metricPrefixSelector.currentText())
+            self.__activeMode = mode
+            self.__activePredictor = self.__getPredictor(mode) if prefix == constants.signAuto else None
+            self.__shownRange = None
+            if self.__activePredictor is not None:
+                self.__showRange(mode, self.__activePredictor)
+            else:
+                #Modes without fixed ranges stay on autorange of device
+                self.__setInfo(self.__convertModeToUnit(mode), constants.signNone if prefix == constants.signAuto else prefix)
+                self.__prefixFactor = self.__convertPrefixToFactor(prefix)
+            #Plot starts before acquisition, so it gets first burst
+            self.trendPlot.start(self.__acquisition.getBuffer(), self.__convertModeToUnit(mode))
+            if self.recordCheckBox.isChecked():
+                finished = self.__acquisition.start(mode, self.sampleRateSpinBox.value(), self.__getStore(),
+                                                    self.textBrowser.toPlainText(), self.__convertModeToUnit(mode), self.__activePredictor)
+            else:
+                finished = self.__acquisition.start(mode, self.sampleRateSpinBox.value(), predictor = self.__activePredictor)
+            #Error which stopped acquisition is shown by dispatcher, display is stopped in both cases
+            self.__dispatcher.watch(finished, lambda result: self.__callBackAcquisitionFinished(finished),
+                                    onError = lambda: self.__callBackAcquisitionFinished(finished))
+            self.displayTimer.start(constants.DISPLAY_REFRESH_INTERVAL)
+            self.measureButton.setText('Stop')
         else:
             self.errorWindow = ui_ErrorBox(1000000100)
 
+    def __measureStop(self):
+        #Does not wait for burst in flight, engine thread finishes in background
+        self.__acquisition.stop()
+        self.displayTimer.stop()
+        self.trendPlot.stop()
+        self.__refreshDisplay()
+        self.measureButton.setText('Measure')
+
+    def __callBackAcquisitionFinished(self, finished):
+        #Acquisition stops by itself on device error, stopped one was already handled
+        if finished is self.__acquisition.finished() and self.displayTimer.isActive():
+            self.__measureStop()
+
+    def __refreshDisplay(self):
+        if self.__activePredictor is not None:
+            self.__showRange(self.__activeMode, self.__activePredictor)
+        latest = self.__acquisition.getBuffer().latest()
+        if latest is not None:
+            self.__convertToDisplay(latest[1])
+
     def __setInfo(self, stringMode, stringMetricPrefix):
         self.rangeInfoTextBrowser.clear()
         self.rangeInfoTextBrowser.append(stringMetricPrefix + stringMode)
@@ -239,11 +410,31 @@ class ui_Multimeter(QtWidgets.QMainWindow):
         elif string == constants.PERIOD:
             return constants.unitPeroid
         else:
-            return constatns.ERROR
-
-    def __callBackOnMeasureDone(string):
-        self.__convertToDisplay(string)
-
-    def __convertToDisplay(string):
-        pass
-        #zmiana na normalne wartości
+            return constants.ERROR
+
+    def __convertPrefixToFactor(self, string):
+        #Auto without fixed ranges shows values as device returns them
+        if string == constants.signAuto:
+            return constants.none
+        return prefixFactor(string)
+
+    def __callBackOnMeasureDone(self, value, mode, predictor = None):
+        if value is not None:
+            if predictor is not None:
+                self.__showRange(mode, predictor)
+            self.__convertToDisplay(value)
+            if self.recordCheckBox.isChecked():
+                self.__getStore().append(self.textBrowser.toPlainText(), mode, self.__convertModeToUnit(mode), time.time(), value)
+
+    def __getStore(self):
+        if self.__store is None:
+            self.__store = measurementStore(os.path.join(constants.STORE_DIRECTORY, time.strftime('%Y%m%d-%H%M%S')))
+            self.recordCheckBox.setToolTip(self.__store.getDirectory())
+        return self.__store
+
+    def __convertToDisplay(self, value):
+        #Overloaded reading is shown like on display of multimeter, not as scaled +9.9E+37
+        if abs(value) >= constants.OVERLOAD:
+            self.valueDisplay.display(('-' if value < 0 else '') + constants.OVERLOAD_TEXT)
+        else:
+            self.valueDisplay.display(value / self.__prefixFactor)
@@ -1,18 +1,246 @@
+import time
+
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 
 #Internal imports
-from pV import pyVisaInterface
+from uiLoader import loadForm
+import constants
+
+from chooseDevice import ui_ChooseDevice
+from errorBox import ui_ErrorBox
+from asyncDispatcher import asyncDispatcher
+from metricPrefix import formatValue, formatArray
 
 class ui_Osciloscope(QtWidgets.QMainWindow):
+    """
+    Template oscilloscope manager class
+
+    That class provides UI which allows user to capture waveforms from oscilloscope.
+    Outside caller have to provide to initialize that object, pyVisaInterface which
+    is required for low-level communication with device. Also caller have to provide hook to himself,
+    and caller have to implement function "void deleteElement(self)".
+    Capture is transferred as binary block in worker thread of device, so GUI stays responsive
+    even for millions of points.
+
+    Attributes
+    ----------
+    external : parent object
+        It allows to inform parent object about state
+    pyVisa : pyVisaInterface
+        VISA interface wrapper
+    textBrowser : QtWidgets.QTextBrowser
+        UI widget text browser responsible for showing address of selected device
+    confirmButton : QtWidgets.QPushButton
+        UI widget button which opens widget to choose device
+    nameOfDeviceTextBrowser : QtWidgets.QTextBrowser
+        UI widget text browser responsible for showing name of selected device
+    waveformInfoTextBrowser : QtWidgets.QTextBrowser
+        UI widget text browser which shows summary of last capture
+    channelSelector : QtWidgets.QComboBox
+        UI widget combo box which allow to select source channel
+    formatSelector : QtWidgets.QComboBox
+        UI widget combo box which allow to select 8 or 16 bit samples
+    captureButton : QtWidgets.QPushButton
+        UI widget button which starts capture
+    statusTextBrowser : QtWidgets.QTextBrowser
+        UI widget text browser which shows status of connection
+    checkErrorButton : QtWidgets.QPushButton
+        UI widget button which calls error checking function
+    window : ui_ChooseDevice
+        UI widget for choosing device hook
+    baudRate : int
+        Baud Rate value for specifed device
+    errorWindow : ui_ErrorBox
+        UI widget for error window hook
+    dispatcher : asyncDispatcher
+        delivers results of instrument I/O executed in worker thread
+    times : numpy.ndarray
+        time axis of last capture in seconds
+    volts : numpy.ndarray
+        samples of last capture in volts
+
+    Methods
+    -------
+    closeEvent(self, event):
+        function which overrides closeEvent fun
+
+    """
+
     def __init__(self, external, pyVisa):
+        """Initialization Method
+
+        In init all UI widgets get assigned to hook variables.
+
+        Parameters
+        ----------
+        external : parent object
+            It allows to inform parent object about state
+        pyVisa : pyVisaInterface
+            VISA interface wrapper
+        """
+
         super(ui_Osciloscope, self).__init__()
-        self.external = external
-        self.pyVisa = pyVisa
+        self.__external = external
+        self.__pyVisa = pyVisa
+        self.__dispatcher = asyncDispatcher(self, self.__pyVisa.getLogger())
+        self.__pyVisa.setErrorCallback(self.__dispatcher.reportError)
+        loadForm("osciloscope", self)
+
+        self.times = None
+        self.volts = None
+
+        self.__textBrowser = self.findChild(QtWidgets.QTextBrowser,'textBrowser')
+        self.__textBrowser.setReadOnly(True)
+
+        self.__confirmButton = self.findChild(QtWidgets.QPushButton, 'confirmButton')
+        self.__confirmButton.clicked.connect(self.__chooseDeviceWindow)
+
+        self.__nameOfDeviceTextBrowser = self.findChild(QtWidgets.QTextBrowser,'nameOfDeviceTextBrowser')
+        self.__nameOfDeviceTextBrowser.setReadOnly(True)
+
+        self.__waveformInfoTextBrowser = self.findChild(QtWidgets.QTextBrowser,'waveformInfoTextBrowser')
+        self.__waveformInfoTextBrowser.setReadOnly(True)
+
+        self.__channelSelector = self.findChild(QtWidgets.QComboBox, 'channelSelector')
+        self.__channelSelector.addItem(constants.CHANNEL1)
+        self.__channelSelector.addItem(constants.CHANNEL2)
+        self.__channelSelector.addItem(constants.CHANNEL3)
+        self.__channelSelector.addItem(constants.CHANNEL4)
+
+        self.__formatSelector = self.findChild(QtWidgets.QComboBox, 'formatSelector')
+        self.__formatSelector.addItem(constants.WAVEFORM_BYTE)
+        self.__formatSelector.addItem(constants.WAVEFORM_WORD)
+
+        self.__captureButton = self.findChild(QtWidgets.QPushButton, 'captureButton')
+        self.__captureButton.clicked.connect(self.__capture)
+
+        self.__statusTextBrowser = self.findChild(QtWidgets.QTextBrowser,'statusTextBrowser')
+        self.__statusTextBrowser.setReadOnly(True)
+        self.__statusTextBrowser.append(self.__pyVisa.getDeviceStatus())
+
+        self.__checkErrorButton = self.findChild(QtWidgets.QPushButton, 'checkErrorButton')
+        self.__checkErrorButton.clicked.connect(self.__checkErrorBus)
+
+        self.show()
+
+    def closeEvent(self, event):
+        """Close Event Function
 
-        if self.external:
-            uic.loadUi("../UI/signalGeneratorNested.ui", self)
+        That functions is invoked when user try to close window.
+        Function creates MassageBox to ask user sure to close the window.
+
+        Parameters
+        ----------
+        event :
+            event occured on window
+        """
+
+        reply = QMessageBox.question(self, 'Window Close', 'Are you sure you want to close the window?',
+                                     QMessageBox.Yes | QMessageBox.No, (QMessageBox.No))
+        if reply == QMessageBox.Yes:
+            self.__dispatcher.cancelAll()
+            self.__pyVisa.submit(self.__pyVisa.closeResource)
+            self.__external.deleteElement(constants.EXTERNALWINDOW)
+            event.accept()
+        else:
+            event.ignore()
+
+    def __callBackAppendDeviceName(self, string):
+        self.__nameOfDeviceTextBrowser.clear()
+        self.__nameOfDeviceTextBrowser.append(string)
+
+    def __callBackChooseDevice(self, string, baudRate):
+        """CallBack for choosing device
+
+        Parameters
+        ----------
+        string : str
+            address of device
+        baudRate : int
+            baud rate provided by user
+        """
+
+        self.__textBrowser.clear()
+        self.__textBrowser.append(string)
+
+        self.__nameOfDeviceTextBrowser.clear()
+        self.__statusTextBrowser.clear()
+
+        self.__baudRate = baudRate
+
+        self.__configureInstrument()
+
+    def __chooseDeviceWindow(self):
+        self.__window = ui_ChooseDevice(self.__pyVisa, self.__callBackChooseDevice)
+
+    def __configureInstrument(self):
+        instrumentAddress = self.__textBrowser.toPlainText()
+        if instrumentAddress:
+            future = self.__pyVisa.submit(self.__openInstrument, instrumentAddress, self.__baudRate, address = instrumentAddress)
+            self.__dispatcher.watch(future, self.__callBackInstrumentConfigured, constants.COMMAND_TIMEOUT)
+
+    def __openInstrument(self, instrumentAddress, baudRate):
+        """Function executed in worker thread which opens and configures device
+
+        Returns
+        -------
+        touple
+            flag if device was opened, state of device and its name,
+            name is None when device is not configured
+        """
+
+        names = []
+        self.__pyVisa.openResource(instrumentAddress)
+        if not self.__pyVisa.getDeviceStatus() == constants.OPENED:
+            return False, self.__pyVisa.getDeviceStatus(), None
+        self.__pyVisa.configureCommunication(baudRate)
+        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
+            self.__pyVisa.getDeviceName(names.append)
+        return True, self.__pyVisa.getDeviceStatus(), (names[0] if names else None)
+
+    def __callBackInstrumentConfigured(self, result):
+        opened, state, name = result
+        if not opened:
+            self.__errorWindow = ui_ErrorBox(1000000101)
+            return
+        self.__statusTextBrowser.append(state)
+        if name is not None:
+            self.__callBackAppendDeviceName(name)
+
+    def __checkErrorBus(self):
+        self.__dispatcher.watch(self.__pyVisa.submit(self.__pyVisa.checkErrorBus))
+
+    def __capture(self):
+        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
+            self.__captureButton.setEnabled(False)
+            future = self.__pyVisa.submit(self.__timedCapture,
+                                          str(self.__channelSelector.currentText()),
+                                          str(self.__formatSelector.currentText()))
+            self.__dispatcher.watch(future, self.__callBackCaptureDone, onError = lambda: self.__captureButton.setEnabled(True))
         else:
-            uic.loadUi("../UI/signalGenerator.ui", self)
+            self.__errorWindow = ui_ErrorBox(1000000100)
+
+    def __timedCapture(self, channel, format):
+        """Function executed in worker thread which captures waveform and measures transfer time"""
+
+        start = time.perf_counter()
+        capture = self.__pyVisa.captureWaveform(channel, format)
+        return capture, time.perf_counter() - start
+
+    def __callBackCaptureDone(self, result):
+        self.__captureButton.setEnabled(True)
+        capture, duration = result
+        if capture is None:
+            return
+        self.times, self.volts = capture
+
+        self.__waveformInfoTextBrowser.clear()
+        self.__waveformInfoTextBrowser.append('Points: %d' % len(self.volts))
+        if len(self.volts):
+            self.__waveformInfoTextBrowser.append('Time span: ' + formatValue(self.times[-1] - self.times[0], constants.unitPeroid))
+            self.__waveformInfoTextBrowser.append('Min: %s  Max: %s  Vpp: %s' % tuple(formatArray((self.volts.min(), self.volts.max(), self.volts.max() - self.volts.min()),
+                                                                                                  constants.unitVoltage)))
+        self.__waveformInfoTextBrowser.append('Transfer: %.3f s (%.0f points/s)' % (duration, len(self.volts) / duration if duration else 0))
@@ -1,22 +1,29 @@
-import re
-import time
 import math
-import inspect
-from datetime import datetime
+from concurrent.futures import Future
 
 import pyvisa
 from pyvisa import constants
 
 #Internal imports
 import constants
-from errorHandler import errorParser
-from errorBox import ui_ErrorBox
+from errorHandler import getError, instrumentError
+from instrumentLogger import instrumentLogger
+from scpiBatch import scpiBatch, isNoError, readErrors
+from settingsCache import settingsCache
+
+#CONFigure and MEASure? set trigger system to these defaults
+_CONFIGURE_DEFAULTS = (('TRIG:SOUR', 'IMM'), ('TRIG:COUN', '1'), ('SAMP:COUN', '1'))
 
 class pyVisaInterface:
     """
     pyVisaInterface, wrapper for pyVisa library
 
-    Class provides API like methods to manage measurement devices for GUI classes.
+    Class provides API like methods to manage measurement devices for GUI classes
+    and scripts. It does not depend on PyQt5: errors are raised as instrumentError,
+    unless error callback is set (GUI windows show them in ui_ErrorBox).
+
+    Every controller window owns separate pyVisaInterface, all of them share one
+    sessionPool, so each window talks only to its own instrument.
 
     Attributes
     ----------
@@ -25,8 +32,29 @@ class pyVisaInterface:
     -------
     listOfResource(self):touple
         returns list of avalivables devices
+    getDiscovery(self) : deviceDiscovery
+        returns cached background discovery of devices shared by all windows
+    getMetrics(self) : instrumentMetrics
+        returns per command timing, bytes and error counters of all devices, None when not collected
+    getLogger(self) : instrumentLogger
+        returns logger of device, e.g. for errors which do not come from VISA
     openResource(self,string):
-        opens selected device
+        opens selected device, or reuses session already opened in pool
+    closeResource(self):
+        gives session of device back to pool
+    submit(self, function, *args, address = None, timeout = None, priority = constants.PRIORITY_USER) : Future
+        runs function in worker thread of bus of device
+    setErrorCallback(self, callback):
+        replaces raising of instrumentError with function which shows error codes, None restores raising
+    getLastError(self) : errorInfo
+        returns last reported error from errorHandler registry, None when nothing failed
+    beginBatch(self):
+        collects following insert* commands instead of writing them one by one
+    commitBatch(self) : bool
+        sends collected commands as one program message followed by *OPC?
+    discardBatch(self):
+        drops collected commands, call it in finally after beginBatch, so error of insert*
+        does not leave interface collecting commands forever
     getDeviceStatus(self) : string
         returns state of pyVisa about connections
     getDeviceName(self,callback):
@@ -47,118 +75,229 @@ class pyVisaInterface:
         inserting deviation of modulation into device
     insertDepth(self, depth):
         inserting Depth of modulation into device
+    configureMeasure(self, string) : bool
+        selects multimeter mode once for series of initiateMeasure
+    setMeasureRange(self, string, value) : bool
+        selects fixed range of mode, None turns autorange of device on
+    initiateMeasure(self) : bool
+        triggers measurement and waits until it is finished
+    fetchMeasure(self) : float
+        reads result of last initiateMeasure
+    readBurst(self, count, format = constants.READINGS_ASCII, interval = None) : numpy.ndarray
+        reads many readings with one INIT and one FETCh?
+    captureWaveform(self, channel, format) : touple
+        reads waveform of oscilloscope channel as time and voltage arrays
     """
 
-    def __init__(self, type, logOutput):
-        self.__resourceManager = pyvisa.ResourceManager(type)
-        self.__logOutput = logOutput
-        self.__errorParser = errorParser()
+    def __init__(self, pool, logOutput, caller = None):
+        self.__pool = pool
+        self.__session = None
+        self.__logger = instrumentLogger(logOutput, caller)
+        self.__errorCallback = None
+        self.__lastError = None
+        self.__batch = None
+        self.__pending = {}
         self.__state = constants.DISCONNECTED
 
 #Generic functions
 
     def listOfResources(self):
-        stack = inspect.stack()
-        the_class = stack[1][0].f_locals["self"].__class__.__name__
-        caller = self.__convertCallerToPrev('{}'.format(the_class))
-
-        now = datetime.now()
-        current_time = now.strftime("%H:%M:%S - ")
         try:
-            return self.__resourceManager.list_resources()
+            return self.__pool.listResources()
         except pyvisa.errors.VisaIOError as error:
-            self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-            self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+            self.__logger.log(str(error))
+            self.__reportError(error.error_code)
 
-    def openResource(self, string):
-        stack = inspect.stack()
-        the_class = stack[1][0].f_locals["self"].__class__.__name__
-        caller = self.__convertCallerToPrev('{}'.format(the_class))
+    def getDiscovery(self):
+        return self.__pool.getDiscovery()
+
+    def getMetrics(self):
+        return self.__pool.getMetrics()
+
+    def getLogger(self):
+        return self.__logger
 
-        now = datetime.now()
-        current_time = now.strftime("%H:%M:%S - ")
+    def openResource(self, string):
         try:
-            self.__instrument = self.__resourceManager.open_resource(string)
+            if self.__session is not None and self.__session.address != string:
+                self.closeResource()
+            if self.__session is None:
+                self.__session = self.__pool.acquire(string)
+            self.__instrument = self.__session.resource
             self.__state = constants.OPENED
         except pyvisa.errors.VisaIOError as error:
             self.__state = constants.ERROR
-            self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-            self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+            self.__logger.log(str(error))
+            self.__reportError(error.error_code)
+
+    def closeResource(self):
+        if self.__session is not None:
+            self.__pool.release(self.__session)
+            self.__session = None
+            self.__instrument = None
+        self.__state = constants.DISCONNECTED
+
+    def submit(self, function, *args, address = None, timeout = None, priority = constants.PRIORITY_USER):
+        """Function which runs instrument I/O outside of caller thread
+
+        All commands of one device are executed in order by its commandQueue,
+        so GUI thread never waits for slow device. Queues of devices on one bus
+        are served by commandScheduler of session pool.
+
+        Parameters
+        ----------
+        function : callable
+            function executed in worker thread, usually method of this object
+        address : str
+            address of device, by default address of opened session
+        timeout : float
+            time in seconds in which command has to start
+        priority : int
+            constants.PRIORITY_USER for actions of user, constants.PRIORITY_BACKGROUND
+            for continuous work which may wait, e.g. acquisition
+
+        Returns
+        -------
+        Future
+            future with result of function
+        """
+
+        if address is None and self.__session is not None:
+            address = self.__session.address
+        if address is None:
+            #Nothing to block on, function only reports disconnected device
+            future = Future()
+            future.set_running_or_notify_cancel()
+            try:
+                future.set_result(function(*args))
+            except Exception as error:
+                future.set_exception(error)
+            return future
+        return self.__pool.getQueue(address).submit(function, *args, timeout = timeout, priority = priority)
+
+    def setErrorCallback(self, callback):
+        self.__errorCallback = callback
+
+    def getLastError(self):
+        return self.__lastError
 
     def getDeviceStatus(self):
         return self.__state
 
     def getDeviceName(self, callback):
         if not self.__state == constants.DISCONNECTED:
-            stack = inspect.stack()
-            the_class = stack[1][0].f_locals["self"].__class__.__name__
-            caller = self.__convertCallerToPrev('{}'.format(the_class))
-
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S - ")
             try:
-                infoTemp = self.__instrument.query('*IDN?', delay=0.1)
-                callback(infoTemp)
+                if self.__session.identity is None:
+                    self.__session.identity = self.__instrument.query('*IDN?')
+                callback(self.__session.identity)
             except pyvisa.errors.VisaIOError as error:
-                self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-                self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def configureCommunication(self, baud_rate):
         if not self.__state == constants.DISCONNECTED:
-            stack = inspect.stack()
-            the_class = stack[1][0].f_locals["self"].__class__.__name__
-            caller = self.__convertCallerToPrev('{}'.format(the_class))
-
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S - ")
             try:
-                self.__instrument.write('*RST')
-                self.__instrument.write('*CLS')
+                #Session already configured by other window, *RST would drop its settings
+                if self.__session.baudRate == baud_rate:
+                    self.__logger.log('session reused')
+                    self.__state = constants.CONFIGURED
+                    return
 
+                #Terminations are set first, otherwise *RST and *CLS end with default one and are rejected
                 self.__instrument.baud_rate = int(baud_rate)
                 self.__instrument.read_termination = '\n'
                 self.__instrument.write_termination = '\n'
-                infoTemp = self.__instrument.query('*IDN?', delay=0.1)
+                self.__instrument.write('*RST')
+                self.__instrument.write('*CLS')
+                self.__session.settings.invalidate()
+                self.__session.completion.wait()
+                infoTemp = self.__instrument.query('*IDN?')
 
                 #LogOutput probalby temporary, so far very usefull for debug purposes
-                self.__logOutput.addItem(current_time + caller + 'baud_rate = ' + baud_rate)
-                self.__logOutput.addItem(current_time + caller + '*IDN?')
-                self.__logOutput.addItem(current_time + caller + infoTemp)
+                self.__logger.log('baud_rate = %s', baud_rate)
+                self.__logger.log('*IDN?')
+                self.__logger.log(infoTemp)
+                self.__session.baudRate = baud_rate
+                self.__session.identity = infoTemp
                 self.__state = constants.CONFIGURED
             except pyvisa.errors.VisaIOError as error:
+                self.__session.baudRate = None
                 self.__state = constants.ERROR
-                self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-                self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
 #Signal Generator
 
+    def beginBatch(self):
+        self.__batch = scpiBatch()
+        self.__pending = {}
+
+    def discardBatch(self):
+        self.__batch = None
+        self.__pending = {}
+
+    def commitBatch(self):
+        """Function which sends commands collected since beginBatch
+
+        Rejected commands are written to log and reported with error code.
+
+        Returns
+        -------
+        bool
+            True when device accepted all commands
+        """
+
+        batch = self.__batch
+        self.__batch = None
+        if batch is None or batch.isEmpty():
+            return True
+        if self.__state == constants.DISCONNECTED:
+            self.__reportError(1000000100)
+            return False
+        try:
+            failed = batch.flush(self.__instrument)
+        except pyvisa.errors.VisaIOError as error:
+            self.__session.settings.invalidate()
+            self.__logger.log(str(error))
+            self.__reportError(error.error_code)
+            return False
+        for command, message in failed:
+            self.__logger.log('%s rejected: %s', command, message)
+        if failed:
+            self.__session.settings.invalidate()
+            self.__reportError(1000000008)
+            return False
+        for header, value in self.__pending.items():
+            self.__session.settings.store(header, value)
+        return True
+
     def insertWaveform(self, waveform):
         if not self.__state == constants.DISCONNECTED:
             temp = 'FUNC:SHAP' + ' ' + self.__constToInputString(waveform)
-            self.__instrument.write(temp)
+            self.__send(temp)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def insertFrequency(self, frequency):
         if not self.__state == constants.DISCONNECTED:
             temp = 'FREQ' + ' ' + frequency
-            self.__instrument.write(temp)
+            self.__send(temp)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def insertAmplitude(self, amplitude, offSet = ''):
         if not self.__state == constants.DISCONNECTED:
             temp = 'VOLT' + ' ' + amplitude
-            self.__instrument.write(temp)
+            self.__send(temp)
             if offSet:
                 temp = 'VOLT:OFFS' + ' ' + offSet
-                self.__instrument.write(temp)
+                self.__send(temp)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def insertModulation(self, modulation, waveform):
         if not self.__state == constants.DISCONNECTED:
@@ -166,9 +305,9 @@ class pyVisaInterface:
                 temp = 'AM:INT:FUNC' + ' ' + self.__constToInputString(waveform)
             elif modulation == constants.FM:
                 temp = 'FM:INT:FUNC' + ' ' + self.__constToInputString(waveform)
-            self.__instrument.write(temp)
+            self.__send(temp)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def insertModulationFreq(self, modulation, frequency):
         if not self.__state == constants.DISCONNECTED:
@@ -176,144 +315,389 @@ class pyVisaInterface:
                 temp = 'AM:INT:FREQ' + ' ' + frequency
             elif modulation == constants.FM:
                 temp = 'FM:INT:FREQ' + ' ' + frequency
-            self.__instrument.write(temp)
+            self.__send(temp)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def insertDeviation(self, deviation):
         if not self.__state == constants.DISCONNECTED:
             temp = 'FM:DEV' + ' ' + deviation
-            self.__instrument.write(temp)
-            self.__instrument.write('FM:STAT ON')
+            self.__send(temp)
+            self.__send('FM:STAT ON')
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def insertDepth(self, depth):
         if not self.__state == constants.DISCONNECTED:
             temp = 'AM:DEPT' + ' ' + depth
-            self.__instrument.write(temp)
-            self.__instrument.write('AM:STAT ON')
+            self.__send(temp)
+            self.__send('AM:STAT ON')
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
     def checkErrorBus(self):
         if not self.__state == constants.DISCONNECTED:
-            stack = inspect.stack()
-            the_class = stack[1][0].f_locals["self"].__class__.__name__
-            caller = self.__convertCallerToPrev('{}'.format(the_class))
-
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S - ")
             try:
                 temp = self.__instrument.query('SYST:ERR?')
                 if temp:
-                    self.__logOutput.addItem(temp)
+                    self.__logger.log(temp)
+                    if not isNoError(temp):
+                        self.__session.settings.invalidate()
             except pyvisa.errors.VisaIOError as error:
-                self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-                self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
-    def checkWaveform(self, waveform):
+    def checkWaveform(self, waveform, verify = False):
         if not self.__state == constants.DISCONNECTED:
-            stack = inspect.stack()
-            the_class = stack[1][0].f_locals["self"].__class__.__name__
-            caller = self.__convertCallerToPrev('{}'.format(the_class))
-
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S - ")
             try:
-                temp = self.__instrument.query('FUNC:SHAP?')
+                temp = self.__session.settings.get('FUNC:SHAP')
+                if verify or temp is None:
+                    temp = self.__instrument.query('FUNC:SHAP?').strip()
+                    self.__session.settings.store('FUNC:SHAP', temp)
                 if temp == self.__constToInputString(waveform):
                     return True
                 return False
             except pyvisa.errors.VisaIOError as error:
-                self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-                self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
-    def checkFrequency(self, frequency):
+    def checkFrequency(self, frequency, verify = False):
         if not self.__state == constants.DISCONNECTED:
-            stack = inspect.stack()
-            the_class = stack[1][0].f_locals["self"].__class__.__name__
-            caller = self.__convertCallerToPrev('{}'.format(the_class))
-
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S - ")
             try:
-                temp = self.__instrument.query_ascii_values('FREQ?')
-                if math.isclose(self.__convertToFloat(temp), frequency, abs_rel = 1e-09, abs_tol = 0.1):
+                temp = self.__session.settings.get('FREQ')
+                if verify or temp is None:
+                    temp = '{}'.format(self.__instrument.query_ascii_values('FREQ?')[0])
+                    self.__session.settings.store('FREQ', temp)
+                if math.isclose(self.__convertToFloat(temp), float(frequency), rel_tol = 1e-09, abs_tol = 0.1):
                     return True
                 return False
             except pyvisa.errors.VisaIOError as error:
-                self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-                self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
 #Multimeter
 
     def autoMeasure(self, string):
         if not self.__state == constants.DISCONNECTED:
-            stack = inspect.stack()
-            the_class = stack[1][0].f_locals["self"].__class__.__name__
-            caller = self.__convertCallerToPrev('{}'.format(the_class))
-            now = datetime.now()
-            current_time = now.strftime("%H:%M:%S - ")
             try:
-                self.__instrument.query_ascii_values(self.__constToInputString(constants.MEASURE + ':' + string) + '? DEF,DEF')
-                return temp
+                temp = self.__instrument.query_ascii_values(self.__constToInputString(constants.MEASURE + ':' + string) + '? DEF,DEF')
+                #MEASure? configures device in the same way as CONFigure
+                self.__storeConfigured(string)
+                return temp[0]
+            except pyvisa.errors.VisaIOError as error:
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+
+    def triggerMeasure(self, string):
+        """Function which measures without fixed delays
+
+        Device is configured and triggered, reading is fetched as soon as
+        device reports operation complete (service request or *ESR? polling).
+
+        Parameters
+        ----------
+        string : str
+            multimeter mode, e.g. constants.VOLTAGE_DC
+
+        Returns
+        -------
+        float
+            measured value, None on error
+        """
+
+        if not self.__state == constants.DISCONNECTED:
+            try:
+                self.__instrument.write('CONF:' + self.__constToInputString(string) + ' DEF,DEF')
+                self.__storeConfigured(string)
+                self.__instrument.write('INIT')
+                self.__session.completion.wait()
+                temp = self.__instrument.query_ascii_values('FETC?')
+                return temp[0]
+            except pyvisa.errors.VisaIOError as error:
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+
+    def configureMeasure(self, string):
+        """Function which selects multimeter mode, write is skipped when mode did not change
+
+        Returns
+        -------
+        bool
+            True when device is configured
+        """
+
+        if not self.__state == constants.DISCONNECTED:
+            try:
+                mode = self.__constToInputString(string)
+                if not self.__session.settings.isCurrent('CONF', mode):
+                    self.__instrument.write('CONF:' + mode + ' DEF,DEF')
+                    self.__storeConfigured(string)
+                #Single reading per INIT, also after readBurst
+                self.__send('SAMP:COUN 1')
+                return True
+            except pyvisa.errors.VisaIOError as error:
+                self.__session.settings.invalidate()
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+        return False
+
+    def setMeasureRange(self, string, value):
+        """Function which selects range of mode, write is skipped when range did not change
+
+        Fixed range saves time of autorange of device before every reading, see autoRange.
+
+        Parameters
+        ----------
+        string : str
+            multimeter mode, e.g. constants.VOLTAGE_DC
+        value : float
+            full scale of range, e.g. 10 for 10 V range, None turns autorange of device on
+
+        Returns
+        -------
+        bool
+            True when range is set
+        """
+
+        if not self.__state == constants.DISCONNECTED:
+            try:
+                mode = self.__constToInputString(string)
+                if value is None:
+                    self.__send(mode + ':RANG:AUTO ON')
+                    self.__session.settings.forget(mode + ':RANG')
+                else:
+                    self.__send(mode + ':RANG %g' % value)
+                    #Fixed range turns autorange off
+                    self.__session.settings.store(mode + ':RANG:AUTO', 'OFF')
+                return True
+            except pyvisa.errors.VisaIOError as error:
+                self.__session.settings.invalidate()
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+        return False
+
+    def initiateMeasure(self):
+        """Function which triggers measurement configured by configureMeasure
+
+        Returns when device finished measurement, reading stays in device
+        memory until fetchMeasure, so other device can be set meanwhile.
+
+        Returns
+        -------
+        bool
+            True when measurement is finished
+        """
+
+        if not self.__state == constants.DISCONNECTED:
+            try:
+                self.__instrument.write('INIT')
+                self.__session.completion.wait()
+                return True
+            except pyvisa.errors.VisaIOError as error:
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+        return False
+
+    def fetchMeasure(self):
+        """Function which reads result of last initiateMeasure, returns None on error"""
+
+        if not self.__state == constants.DISCONNECTED:
+            try:
+                return self.__instrument.query_ascii_values('FETC?')[0]
+            except pyvisa.errors.VisaIOError as error:
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+
+    def readBurst(self, count, format = constants.READINGS_ASCII, interval = None):
+        """Function which reads many readings with one trigger
+
+        Mode has to be selected before with configureMeasure. Device takes count
+        readings into its memory (SAMP:COUN), all of them are fetched with one FETCh?
+        straight into NumPy array, so there is one round trip per burst instead of per reading.
+        Settings are cached, repeated bursts send only INIT and FETCh?. Error queue is
+        read after settings were changed. Device which returns fewer readings than
+        SAMP:COUN (e.g. pyvisa-sim) is read with bursts of one reading from then on,
+        so burst still returns count readings. More readings than requested, or none,
+        are reported as error.
+
+        Parameters
+        ----------
+        count : int
+            number of readings in burst
+        format : str
+            constants.READINGS_ASCII, or constants.READINGS_REAL (64 bit binary block, meters which support FORM:DATA)
+        interval : float
+            time between readings in seconds (SAMP:TIM), None means as fast as device can (SAMP:SOUR IMM)
+
+        Returns
+        -------
+        numpy.ndarray
+            readings, None on error
+        """
+
+        if not self.__state == constants.DISCONNECTED:
+            import numpy as np
+            try:
+                size = count if self.__session.burstLimit is None else min(count, self.__session.burstLimit)
+                sent = [self.__send('TRIG:SOUR IMM'), self.__send('TRIG:COUN 1'), self.__send('SAMP:COUN %d' % size)]
+                if interval is None:
+                    sent.append(self.__send('SAMP:SOUR IMM'))
+                else:
+                    sent.append(self.__send('SAMP:SOUR TIM'))
+                    sent.append(self.__send('SAMP:TIM %.9g' % interval))
+                #ASCII is default of device, FORM:DATA is sent only after binary format was used
+                if format == constants.READINGS_REAL or self.__session.settings.get('FORM:DATA') is not None:
+                    sent.append(self.__send('FORM:DATA ' + format))
+                if any(sent):
+                    errors = readErrors(self.__instrument)
+                    if errors:
+                        for error in errors:
+                            self.__logger.log('burst settings rejected: %s', error)
+                        self.__session.settings.invalidate()
+                        self.__reportError(1000000008)
+                        return None
+
+                readingTime = constants.READING_TIME if interval is None else max(interval, constants.READING_TIME)
+                values = self.__fetchBurst(size, format, readingTime)
+                if 0 < len(values) < size and self.__session.burstLimit is None:
+                    self.__logger.log('FETC? returned %d of %d readings, bursts of 1 reading are used', len(values), size)
+                    self.__session.burstLimit = size = 1
+                    self.__send('SAMP:COUN 1')
+                bursts = [values]
+                received = len(values)
+                while received < count and len(values) == size:
+                    values = self.__fetchBurst(size, format, readingTime)
+                    bursts.append(values)
+                    received += len(values)
+                if received != count:
+                    self.__logger.log('FETC? returned %d of %d readings', received, count)
+                    self.__reportError(1000000010)
+                    return None
+                return bursts[0] if len(bursts) == 1 else np.concatenate(bursts)
+            except pyvisa.errors.VisaIOError as error:
+                self.__session.settings.invalidate()
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
+        else:
+            self.__reportError(1000000100)
+
+#Oscilloscope
+
+    def captureWaveform(self, channel, format = constants.WAVEFORM_BYTE):
+        """Function which captures waveform with binary block transfer
+
+        Samples are read as IEEE 488.2 definite-length block straight into
+        NumPy array (no ASCII parsing, no intermediate Python list) and scaled
+        with preamble of capture.
+
+        Parameters
+        ----------
+        channel : str
+            source channel, e.g. constants.CHANNEL1
+        format : str
+            constants.WAVEFORM_BYTE (8 bit samples) or constants.WAVEFORM_WORD (16 bit samples)
+
+        Returns
+        -------
+        touple
+            arrays of time in seconds and voltage in volts, None on error
+        """
+
+        if not self.__state == constants.DISCONNECTED:
+            #NumPy is needed only for waveforms, it is loaded by first capture
+            import numpy as np
+            from waveform import DATATYPES, parsePreamble, scaleWaveform
+            try:
+                self.__send(':WAV:SOUR ' + self.__constToInputString(channel))
+                self.__send(':WAV:FORM ' + format)
+                #Samples are parsed as unsigned integers, yReference of preamble refers to them
+                self.__send(':WAV:UNS ON')
+                if format == constants.WAVEFORM_WORD:
+                    self.__send(':WAV:BYT MSBF')
+                preamble = parsePreamble(self.__instrument.query(':WAV:PRE?'))
+
+                timeout = self.__instrument.timeout
+                self.__instrument.timeout = None if timeout is None else max(timeout, constants.WAVEFORM_TIMEOUT)
+                try:
+                    raw = self.__instrument.query_binary_values(':WAV:DATA?', datatype = DATATYPES[format],
+                                                                is_big_endian = True, container = np.array,
+                                                                chunk_size = constants.WAVEFORM_CHUNK_SIZE)
+                finally:
+                    self.__instrument.timeout = timeout
+                return scaleWaveform(raw, preamble)
             except pyvisa.errors.VisaIOError as error:
-                self.__logOutput.addItem(current_time + caller + '{}'.format(error))
-                self.__errorWindow = ui_ErrorBox(self.__extractValueFromString('{}'.format(error)))
+                self.__logger.log(str(error))
+                self.__reportError(error.error_code)
         else:
-            self.__errorWindow = ui_ErrorBox(1000000100)
+            self.__reportError(1000000100)
 
 #Helper functions
 
+    def __fetchBurst(self, size, format, readingTime):
+        """Triggers one burst of size readings and reads them into NumPy array"""
+
+        import numpy as np
+        self.__instrument.write('INIT')
+        self.__session.completion.wait(constants.COMPLETION_TIMEOUT + size * readingTime)
+        if format == constants.READINGS_REAL:
+            return self.__instrument.query_binary_values('FETC?', datatype = 'd', is_big_endian = True, container = np.array)
+        return self.__instrument.query_ascii_values('FETC?', container = np.array)
+
+    def __send(self, command):
+        """Writes or batches command, returns False when device already has that setting"""
+
+        header, value = settingsCache.splitCommand(command)
+        if self.__session.settings.isCurrent(header, value):
+            return False
+        if self.__batch is not None:
+            self.__batch.add(command)
+            self.__pending[header] = value
+        else:
+            self.__instrument.write(command)
+            self.__session.settings.store(header, value)
+        return True
+
+    def __storeConfigured(self, string):
+        settings = self.__session.settings
+        mode = self.__constToInputString(string)
+        settings.store('CONF', mode)
+        #DEF range of CONFigure and MEASure? is autorange
+        settings.forget(mode + ':RANG')
+        settings.store(mode + ':RANG:AUTO', 'ON')
+        settings.forget('SAMP:SOUR', 'SAMP:TIM')
+        for header, value in _CONFIGURE_DEFAULTS:
+            settings.store(header, value)
+
+    def __reportError(self, errorCode):
+        self.__lastError = getError(errorCode)
+        if self.__errorCallback is None:
+            raise instrumentError(errorCode)
+        self.__errorCallback(errorCode)
+
     def __constToInputString(self, string):
         return ''.join(c for c in string if c.isupper() or c == ':')
 
     def __convertToFloat(self, value):
         return float(value)
 
-    def __extractValueFromString(self, string):
-        return int(''.join(i for i in string if i.isdigit() or i == "-"))
-
-    def __convertCallerToPrev(self, string):
-        if string == 'ui_SignalGenerator':
-            return 'signalGen: '
-        elif string == 'ui_Multimeter':
-            return 'multimerer: '
-
     def __clearDevice(self):
         self.__instrument.query("status:measurement?")
         self.__instrument.write("trace:clear; trace:feed:control next")
-
-    def __handleEvent(self, resource, event, user_handle):
-        resource.called = True;
-        self.__logOutput.addItem("Handled event {event.event_type} on {resource}")
-        self.__instrument.called = False;
-        
-        # Type of event we want to be notified about
-        #event_type = constants.EventType.service_request
-        
-        # Mechanism by which we want to be notified
-        #event_mech = constants.EventMechanism.queue
-        
-        wrapped = __instrument.wrap_handler(handle_event)
-
-        user_handle = __instrument.install_handler(event_type, wrapped, 42)
-        __instrument.enable_event(event_type, event_mech, None)
-
-        # __instrument specific code to enable service request
-        # (for example on operation complete OPC)
-        __instrument.write("*SRE 1")
-        __instrument.write("INIT")
-
-        while not __instrument.called:
-            sleep(2)
-
-        __instrument.disable_event(event_type, event_mech)
-        __instrument.uninstall_handler(event_type, wrapped, user_handle)
@@ -0,0 +1,108 @@
+import threading
+
+import numpy as np
+
+class ringBuffer:
+    """
+    ringBuffer, preallocated NumPy storage for timestamped samples
+
+    Memory is allocated once during initialization, so buffer can be filled
+    for days without growing. When buffer is full the oldest samples are overwritten.
+    Writer (acquisition thread) and readers (GUI thread) are synchronized with lock.
+
+    Methods
+    -------
+    append(self, timestamp, value):
+        stores one sample
+    extend(self, timestamps, values):
+        stores many samples at once
+    latest(self) : touple
+        returns newest timestamp and value, None when buffer is empty
+    toArrays(self) : touple
+        returns copy of stored timestamps and values ordered from the oldest one
+    since(self, total) : touple
+        returns copy of samples appended after total() had given value and current total(),
+        samples already overwritten are skipped
+    clear(self):
+        removes all samples
+    """
+
+    def __init__(self, capacity):
+        """Initialization Method
+
+        Parameters
+        ----------
+        capacity : int
+            maximal number of samples kept in buffer
+        """
+
+        self.__capacity = int(capacity)
+        self.__timestamps = np.empty(self.__capacity, dtype = np.float64)
+        self.__values = np.empty(self.__capacity, dtype = np.float64)
+        self.__head = 0
+        self.__count = 0
+        self.__total = 0
+        self.__lock = threading.Lock()
+
+    def __len__(self):
+        return self.__count
+
+    def capacity(self):
+        return self.__capacity
+
+    def total(self):
+        """Returns number of samples appended since creation, including overwritten ones"""
+
+        return self.__total
+
+    def append(self, timestamp, value):
+        with self.__lock:
+            self.__timestamps[self.__head] = timestamp
+            self.__values[self.__head] = value
+            self.__head = (self.__head + 1) % self.__capacity
+            self.__count = min(self.__count + 1, self.__capacity)
+            self.__total += 1
+
+    def extend(self, timestamps, values):
+        timestamps = np.asarray(timestamps, dtype = np.float64)
+        values = np.asarray(values, dtype = np.float64)
+        skipped = max(len(timestamps) - self.__capacity, 0)
+        if skipped:
+            timestamps = timestamps[skipped:]
+            values = values[skipped:]
+        with self.__lock:
+            size = len(timestamps)
+            first = min(size, self.__capacity - self.__head)
+            self.__timestamps[self.__head:self.__head + first] = timestamps[:first]
+            self.__values[self.__head:self.__head + first] = values[:first]
+            self.__timestamps[:size - first] = timestamps[first:]
+            self.__values[:size - first] = values[first:]
+            self.__head = (self.__head + size) % self.__capacity
+            self.__count = min(self.__count + size, self.__capacity)
+            self.__total += size + skipped
+
+    def latest(self):
+        with self.__lock:
+            if self.__count == 0:
+                return None
+            index = self.__head - 1
+            return self.__timestamps[index], self.__values[index]
+
+    def toArrays(self):
+        with self.__lock:
+            start = (self.__head - self.__count) % self.__capacity
+            order = (np.arange(self.__count) + start) % self.__capacity
+            return self.__timestamps[order], self.__values[order]
+
+    def since(self, total):
+        with self.__lock:
+            size = min(self.__total - total, self.__count)
+            if size <= 0:
+                return self.__timestamps[:0].copy(), self.__values[:0].copy(), self.__total
+            order = np.arange(self.__head - size, self.__head) % self.__capacity
+            return self.__timestamps[order], self.__values[order], self.__total
+
+    def clear(self):
+        with self.__lock:
+            self.__head = 0
+            self.__count = 0
@@ -0,0 +1,114 @@
+#Internal imports
+import constants
+
+def isNoError(response):
+    """Function which returns True for answer of SYST:ERR? meaning empty error queue, e.g. '+0,"No error"'"""
+
+    try:
+        return int(response.split(',')[0]) == 0
+    except ValueError:
+        return False
+
+def readErrors(instrument):
+    """Function which empties error queue of device, returns list of answers for SYST:ERR? other than 'No error'"""
+
+    errors = []
+    for _ in range(constants.SCPI_ERROR_QUEUE_LENGTH):
+        response = instrument.query('SYST:ERR?').strip()
+        if not response or isNoError(response):
+            break
+        errors.append(response)
+    return errors
+
+class scpiBatch:
+    """
+    scpiBatch, collects SCPI commands and sends them as one program message
+
+    Commands are joined with ";:" so every unit starts again from root of
+    SCPI tree, e.g. "FUNC:SHAP SIN;:FREQ 1000;:VOLT 1". Whole batch costs one
+    write and one *OPC? round trip instead of one write per setting.
+    When error queue is not empty after flush, batch replays commands one by one
+    to find which of them was rejected by device.
+
+    Methods
+    -------
+    add(self, command):
+        appends command to batch
+    isEmpty(self) : bool
+        returns True when there is nothing to send
+    programMessages(self) : list
+        returns program messages which will be written to device
+    flush(self, instrument) : list
+        sends batch and returns list of rejected commands with error messages
+    """
+
+    def __init__(self, maxLength = constants.SCPI_MAX_MESSAGE_LENGTH):
+        """Initialization Method
+
+        Parameters
+        ----------
+        maxLength : int
+            maximal length of one program message, longer batch is split
+        """
+
+        self.__commands = []
+        self.__maxLength = maxLength
+
+    def add(self, command):
+        self.__commands.append(command)
+
+    def isEmpty(self):
+        return not self.__commands
+
+    def programMessages(self):
+        return self.__split(self.__commands)
+
+    def flush(self, instrument):
+        """Function which sends batch to device
+
+        Parameters
+        ----------
+        instrument : pyvisa.resources.MessageBasedResource
+            opened device
+
+        Returns
+        -------
+        list
+            touples of rejected command and error message, empty when everything was accepted
+        """
+
+        commands = self.__commands
+        self.__commands = []
+        if not commands:
+            return []
+
+        for message in self.__split(commands):
+            instrument.write(message)
+        instrument.query('*OPC?')
+
+        if not readErrors(instrument):
+            return []
+
+        #Error queue does not tell which unit failed, so commands are checked separately
+        failed = []
+        for command in commands:
+            instrument.write(command)
+            errors = readErrors(instrument)
+            if errors:
+                failed.append((command, '; '.join(errors)))
+        return failed
+
+    def __split(self, commands):
+        messages = []
+        current = ''
+        for command in commands:
+            if not current:
+                current = command
+            elif len(current) + 2 + len(command) <= self.__maxLength:
+                current += ';:' + command
+            else:
+                messages.append(current)
+                current = command
+        if current:
+            messages.append(current)
+        return messages
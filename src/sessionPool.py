@@ -0,0 +1,265 @@
+import time
+import threading
+from concurrent.futures import Future, wait
+
+import pyvisa
+
+#Internal imports
+import constants
+from commandScheduler import commandScheduler
+from settingsCache import settingsCache
+from completionWaiter import completionWaiter
+from deviceDiscovery import deviceDiscovery
+from instrumentMetrics import COMPLETION
+
+class instrumentSession:
+    """
+    instrumentSession, single opened VISA session kept by sessionPool
+
+    Attributes
+    ----------
+    address : str
+        VISA resource string of device
+    resource : pyvisa.resources.Resource
+        opened pyVisa resource
+    users : int
+        number of interfaces which currently hold that session
+    lastUsed : float
+        monotonic time of last acquire or release
+    baudRate : str
+        baud rate used during configuration, None when session is not configured
+    identity : str
+        cached answer for *IDN? query
+    settings : settingsCache
+        last settings confirmed by device, new session always starts with empty cache
+    completion : completionWaiter
+        waits for operation complete reported by device
+    burstLimit : int
+        readings which device returns for one FETCh?, None when it returns all of SAMP:COUN
+    """
+
+    def __init__(self, address, resource, observer = None):
+        self.address = address
+        self.resource = resource
+        self.users = 0
+        self.lastUsed = time.monotonic()
+        self.baudRate = None
+        self.identity = None
+        self.settings = settingsCache()
+        self.completion = completionWaiter(resource, observer)
+        self.burstLimit = None
+
+    def isConfigured(self):
+        return self.baudRate is not None
+
+class sessionPool:
+    """
+    sessionPool, container for all VISA sessions opened by application
+
+    Sessions are keyed by VISA resource string, so every controller window which
+    opens the same address gets the same session, and different addresses never
+    overwrite each other. Session without users is closed after idle timeout.
+    All I/O of sessions goes through commandScheduler of pool, which serves devices
+    of one physical bus by one worker thread with priorities and rate limits, also
+    probes of discovery. Resource is closed only after last command of its queue returned.
+
+    Methods
+    -------
+    listResources(self):touple
+        returns list of avalivables devices
+    getDiscovery(self) : deviceDiscovery
+        returns background discovery which caches avalivables devices and their names
+    probeIdentity(self, address, timeout) : Future
+        asks device for *IDN? in worker of its bus, future returns None when device did not answer
+    acquire(self, address) : instrumentSession
+        returns opened session for address, opens it when necessary
+    release(self, session):
+        informs pool that session is not used by caller anymore
+    getQueue(self, address) : commandQueue
+        returns worker queue of device, all I/O of one device goes through it
+    getQueueDepths(self) : dict
+        returns number of waiting commands keyed by address
+    getScheduler(self) : commandScheduler
+        returns scheduler of I/O of all devices
+    setMinInterval(self, address, seconds):
+        sets minimal time between starts of two commands of device
+    getMetrics(self) : instrumentMetrics
+        returns instrumentation of sessions, None when I/O is not measured
+    collectIdle(self):
+        closes sessions which are not used longer than idle timeout
+    closeAll(self):
+        cancels waiting commands and closes all sessions
+    """
+
+    def __init__(self, type, idleTimeout = constants.SESSION_IDLE_TIMEOUT, metrics = None, minInterval = constants.DEVICE_MIN_INTERVAL):
+        """Initialization Method
+
+        Parameters
+        ----------
+        type : str
+            pyVisa backend specifier, e.g. "@sim" or path to visa library
+        idleTimeout : float
+            time in seconds after which unused session gets closed
+        metrics : instrumentMetrics
+            statistics of I/O, resources are wrapped into meteredResource only when given
+        minInterval : float
+            minimal time in seconds between starts of two commands of one device
+        """
+
+        self.__resourceManager = pyvisa.ResourceManager(type)
+        self.__idleTimeout = idleTimeout
+        self.__sessions = {}
+        self.__scheduler = commandScheduler(minInterval)
+        self.__lock = threading.RLock()
+        #Addresses opened by probeIdentity, acquire waits until probe closes them
+        self.__probing = set()
+        self.__probed = threading.Condition(self.__lock)
+        self.__discovery = deviceDiscovery(self)
+        self.__metrics = metrics
+        if metrics is not None:
+            metrics.setQueueDepthSource(self.getQueueDepths)
+
+    def listResources(self):
+        return self.__resourceManager.list_resources()
+
+    def getDiscovery(self):
+        return self.__discovery
+
+    def getMetrics(self):
+        return self.__metrics
+
+    def probeIdentity(self, address, timeout):
+        """Function which asks device for its name without keeping it opened
+
+        Device which already has session is not touched, its I/O belongs to its worker queue.
+        Probe is executed by worker of bus of device with constants.PRIORITY_BACKGROUND, so it
+        never talks to bus together with other device of the same GPIB board. Serial devices
+        are probed with constants.DISCOVERY_BAUD_RATE.
+
+        Parameters
+        ----------
+        address : str
+            VISA resource string of device
+        timeout : int
+            timeout of opening and query in milliseconds
+
+        Returns
+        -------
+        Future
+            future with answer for *IDN?, cancelled when pool was closed meanwhile
+        """
+
+        return self.__scheduler.getQueue(address).submit(self.__probe, address, timeout, priority = constants.PRIORITY_BACKGROUND)
+
+    def acquire(self, address):
+        with self.__lock:
+            #Second session of the same device can not be opened while probe holds it
+            while address in self.__probing:
+                self.__probed.wait()
+            self.collectIdle()
+            session = self.__sessions.get(address)
+            if session is None:
+                session = self.__open(address)
+                self.__sessions[address] = session
+            session.users += 1
+            session.lastUsed = time.monotonic()
+            return session
+
+    def getQueue(self, address):
+        return self.__scheduler.getQueue(address)
+
+    def getQueueDepths(self):
+        return self.__scheduler.getQueueDepths()
+
+    def getScheduler(self):
+        return self.__scheduler
+
+    def setMinInterval(self, address, seconds):
+        self.__scheduler.setMinInterval(address, seconds)
+
+    def release(self, session):
+        with self.__lock:
+            if session.users > 0:
+                session.users -= 1
+            session.lastUsed = time.monotonic()
+
+    def collectIdle(self):
+        with self.__lock:
+            now = time.monotonic()
+            for address, session in list(self.__sessions.items()):
+                if session.users == 0 and now - session.lastUsed > self.__idleTimeout:
+                    self.__close(address)
+
+    def closeAll(self):
+        self.__discovery.close()
+        with self.__lock:
+            closing = [self.__close(address, cancel = True) for address in list(self.__sessions)]
+            self.__scheduler.stopAll()
+        #Command which already runs may need lock of pool, so pool waits for its end without lock
+        wait(closing, timeout = constants.SESSION_CLOSE_TIMEOUT)
+
+    def __probe(self, address, timeout):
+        #Executed by bus worker, acquire from other thread waits until resource is closed again
+        with self.__lock:
+            session = self.__sessions.get(address)
+            if session is not None:
+                return session.identity
+            self.__probing.add(address)
+
+        try:
+            return self.__query(address, timeout)
+        finally:
+            with self.__lock:
+                self.__probing.discard(address)
+                self.__probed.notify_all()
+
+    def __query(self, address, timeout):
+        try:
+            resource = self.__resourceManager.open_resource(address, open_timeout = timeout)
+        except pyvisa.errors.VisaIOError:
+            return None
+        try:
+            resource.timeout = timeout
+            if address.upper().startswith('ASRL'):
+                resource.baud_rate = constants.DISCOVERY_BAUD_RATE
+            resource.read_termination = '\n'
+            resource.write_termination = '\n'
+            return resource.query('*IDN?').strip()
+        except (pyvisa.errors.VisaIOError, AttributeError, UnicodeDecodeError):
+            return None
+        finally:
+            try:
+                resource.close()
+            except pyvisa.errors.VisaIOError:
+                pass
+
+    def __open(self, address):
+        resource = self.__resourceManager.open_resource(address)
+        if self.__metrics is None:
+            return instrumentSession(address, resource)
+        from meteredResource import meteredResource
+        metrics = self.__metrics
+        device = metrics.device(address)
+        def observeWait(seconds):
+            if metrics.enabled:
+                device.observe(COMPLETION, seconds)
+        return instrumentSession(address, meteredResource(resource, device, metrics), observeWait)
+
+    def __close(self, address, cancel = False):
+        """Removes session, its resource is closed after last command of its queue, returns Future of closing"""
+
+        session = self.__sessions.pop(address)
+        queue = self.__scheduler.remove(address, cancel)
+        closed = Future()
+        def close(finished = None):
+            session.completion.close()
+            try:
+                session.resource.close()
+            except pyvisa.errors.VisaIOError:
+                pass
+            closed.set_result(None)
+        if queue is None:
+            close()
+        else:
+            queue.finished().add_done_callback(close)
+        return closed
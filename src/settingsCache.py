@@ -0,0 +1,48 @@
+class settingsCache:
+    """
+    settingsCache, shadow copy of settings confirmed by device
+
+    Cache keeps last value written for every SCPI header (FUNC:SHAP, FREQ, VOLT,
+    VOLT:OFFS, AM:*, FM:*). It allows to skip writes which would not change anything
+    and to answer check* calls without querying device. Cache has to be invalidated
+    whenever real state of device is unknown: after *RST, reconnect or reported error.
+
+    Methods
+    -------
+    isCurrent(self, header, value) : bool
+        returns True when device already has that value
+    get(self, header) : str
+        returns cached value or None
+    store(self, header, value):
+        remembers value confirmed by device
+    forget(self, *headers):
+        forgets values of selected headers
+    invalidate(self):
+        forgets all values
+    """
+
+    def __init__(self):
+        self.__values = {}
+
+    def isCurrent(self, header, value):
+        return self.__values.get(header) == value
+
+    def get(self, header):
+        return self.__values.get(header)
+
+    def store(self, header, value):
+        self.__values[header] = value
+
+    def forget(self, *headers):
+        for header in headers:
+            self.__values.pop(header, None)
+
+    def invalidate(self):
+        self.__values.clear()
+
+    @staticmethod
+    def splitCommand(command):
+        """Splits SCPI command into header and value, e.g. "FREQ 1000" -> ("FREQ", "1000")"""
+
+        header, _, value = command.partition(' ')
+        return header, value
@@ -1,19 +1,18 @@
-import sys
-import numpy as np
-
 #Gui imports
-from PyQt5 import QtWidgets, QtGui, uic
+from PyQt5 import QtWidgets, QtGui
 from PyQt5.QtWidgets import *
 from PyQt5.QtCore import *
 from PyQt5.QtGui import QRegExpValidator
 
 #Internal imports
+from uiLoader import loadForm
 import constants
 
 from chooseDevice import ui_ChooseDevice
 from errorBox import ui_ErrorBox
-
-from pV import pyVisaInterface
+from asyncDispatcher import asyncDispatcher
+from capabilities import generatorCapabilities
+from metricPrefix import inputPattern, parseValue
 
 class ui_SignalGenerator(QtWidgets.QMainWindow):
     """
@@ -70,6 +69,10 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         Baud Rate value for specifed device
     errorWindow : ui_ErrorBox
         UI widget for error window hook
+    dispatcher : asyncDispatcher
+        delivers results of instrument I/O executed in worker thread
+    capabilities : generatorCapabilities
+        limits of connected model, used to validate settings before sending
 
     Methods
     -------
@@ -94,7 +97,10 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         super(ui_SignalGenerator, self).__init__()
         self.__external = external
         self.__pyVisa = pyVisa
-        uic.loadUi("../UI/signalGenerator.ui", self)
+        self.__dispatcher = asyncDispatcher(self, self.__pyVisa.getLogger())
+        self.__pyVisa.setErrorCallback(self.__dispatcher.reportError)
+        self.__capabilities = generatorCapabilities()
+        loadForm("signalGenerator", self)
 
         self.__textBrowser = self.findChild(QtWidgets.QTextBrowser,'textBrowser')
         self.__textBrowser.setReadOnly(True)
@@ -124,7 +130,8 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         #Built-In Arbs  100 uHz to 5   MHz
         #*For Specifed waveforms this values can be diffrent
         self.__frequencyLineEdit = self.findChild(QtWidgets.QLineEdit, 'frequencyLineEdit')
-        regex = QRegExp("(([0-9]{1,8})((\.([0-9]{1,8})))?)")
+        #Values are typed in engineering notation, e.g. 4.7k, 2.5 MHz or 1e3
+        regex = QRegExp(inputPattern(constants.unitFrequency))
         inputValidator = QRegExpValidator(regex, self.__frequencyLineEdit)
         self.__frequencyLineEdit.setValidator(inputValidator)
 
@@ -138,7 +145,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         #Built-In Arbs  50 mVpp to  10 Vpp
         #*For Specifed waveforms this values can be diffrent
         self.__amplitudeLineEdit = self.findChild(QtWidgets.QLineEdit, 'amplitudeLineEdit')
-        regexAmp = QRegExp("(([0-9]{1,8})((\.([0-9]{1,8})))?)")
+        regexAmp = QRegExp(inputPattern(constants.unitAmplitude))
         inputValidatorAmp = QRegExpValidator(regexAmp, self.__amplitudeLineEdit)
         self.__amplitudeLineEdit.setValidator(inputValidatorAmp)
 
@@ -146,7 +153,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         self.__offSetCheckBox.toggled.connect(self.__onCheckedOffSet)
 
         self.__offsetLineEdit = self.findChild(QtWidgets.QLineEdit, 'offsetLineEdit')
-        regexoffSet = QRegExp("[-]?(([0-9]{1,2})((\.([0-9]{1,8})))?)")
+        regexoffSet = QRegExp(inputPattern(constants.unitVoltage, signed = True))
         inputValidatorOffSet = QRegExpValidator(regexoffSet, self.__offsetLineEdit)
         self.__offsetLineEdit.setValidator(inputValidatorOffSet)
         self.__offsetLineEdit.setStyleSheet("background-color: lightgrey; border: lightgrey;")
@@ -167,7 +174,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         #AM           10 mHz to 20 kHz
         #FM           10 mHz to 10 kHz
         self.__frequencyModulationLineEdit = self.findChild(QtWidgets.QLineEdit, 'frequencyModulationLineEdit')
-        regex = QRegExp("(([0-9]{1,5})((\.([0-9]{1,3})))?)")
+        regex = QRegExp(inputPattern(constants.unitFrequency))
         inputValidatorfrequencyModulation = QRegExpValidator(regex, self.__frequencyModulationLineEdit)
         self.__frequencyModulationLineEdit.setValidator(inputValidatorfrequencyModulation)
         self.__frequencyModulationLineEdit.setStyleSheet("background-color: lightgrey; border: lightgrey;")
@@ -177,7 +184,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         #AM Depth     0  %   to 120 %
         #FM Deviation 10 mHz to 7.5 MHz
         self.__depthDeviationLineEdit = self.findChild(QtWidgets.QLineEdit, 'depthDeviationLineEdit')
-        regex = QRegExp("(([0-9]{1,8})((\.([0-9]{1,3})))?)")
+        regex = QRegExp(inputPattern(constants.unitFrequency))
         inputValidatordepthDeviationLineEdit = QRegExpValidator(regex, self.__depthDeviationLineEdit)
         self.__depthDeviationLineEdit.setValidator(inputValidatordepthDeviationLineEdit)
         self.__depthDeviationLineEdit.setStyleSheet("background-color: lightgrey; border: lightgrey;")
@@ -195,7 +202,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         self.__statusTextBrowser.append(self.__pyVisa.getDeviceStatus())
 
         self.__checkErrorButton = self.findChild(QtWidgets.QPushButton, 'checkErrorButton')
-        self.__checkErrorButton.clicked.connect(self.__pyVisa.checkErrorBus)
+        self.__checkErrorButton.clicked.connect(self.__checkErrorBus)
 
         self.show()
 
@@ -214,6 +221,8 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         reply = QMessageBox.question(self, 'Window Close', 'Are you sure you want to close the window?',
                                      QMessageBox.Yes | QMessageBox.No, (QMessageBox.No))
         if reply == QMessageBox.Yes:
+            self.__dispatcher.cancelAll()
+            self.__pyVisa.submit(self.__pyVisa.closeResource)
             self.__external.deleteElement(constants.EXTERNALWINDOW)
             event.accept()
         else:
@@ -233,6 +242,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
 
         self.__nameOfDeviceTextBrowser.clear()
         self.__nameOfDeviceTextBrowser.append(string)
+        self.__capabilities = generatorCapabilities.fromIdentity(string)
 
     def __callBackChooseDevice(self, string, baudRate):
         """CallBack for choosing device
@@ -259,8 +269,6 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         self.__baudRate = baudRate
 
         self.__configureInstrument()
-        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
-            self.__pyVisa.getDeviceName(self.__callBackAppendDeviceName)
 
     def __chooseDeviceWindow(self):
         """Choose device Window
@@ -310,7 +318,7 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
 
         if string == constants.FM:
             self.__depthDeviationLineEdit.clear()
-            regex = QRegExp("(([0-9]{1,8})((\.([0-9]{1,3})))?)")
+            regex = QRegExp(inputPattern(constants.unitFrequency))
             inputValidatordepthDeviationLineEdit = QRegExpValidator(regex, self.__depthDeviationLineEdit)
             self.__depthDeviationLineEdit.setValidator(inputValidatordepthDeviationLineEdit)
         elif string == constants.AM:
@@ -357,114 +365,160 @@ class ui_SignalGenerator(QtWidgets.QMainWindow):
         """Function which insert values for signal generator.
 
         That function insert in proper provided by pyvisa way all data provided by user.
+        Values are read from widgets here, writes are executed in worker thread of device.
         """
         if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
             if self.__checkCorrectness():
-                self.__pyVisa.insertWaveform(str(self.__waveFormSelector.currentText()))
-                self.__pyVisa.insertFrequency(str(self.__frequencyLineEdit.text()))
+                offSet = ''
                 if self.__offSetCheckBox.isChecked():
-                    self.__pyVisa.insertAmplitude(str(self.__amplitudeLineEdit.text()), str(self.__offsetLineEdit.text()))
-                else:
-                    self.__pyVisa.insertAmplitude(str(self.__amplitudeLineEdit.text()))
+                    offSet = self.__readCommandValue(self.__offsetLineEdit, constants.unitVoltage)
+                modulation = None
                 if self.__modulationCheckBox.isChecked():
-                    self.__pyVisa.insertModulation(str(self.__modulationSelector.currentText()), str(self.__modulatingWaveformSelector.currentText()))
-                    self.__pyVisa.insertModulationFreq(str(self.__modulationSelector.currentText()), str(self.__frequencyLineEdit.text()))
-                    if self.__modulationSelector.currentText() == constants.FM:
-                        self.__pyVisa.insertDeviation(str(self.__depthDeviationLineEdit.text()))
-                    elif self.__modulationSelector.currentText() == constants.AM:
-                        self.__pyVisa.insertDepth(str(self.__depthDeviationLineEdit.text()))
+                    modulation = str(self.__modulationSelector.currentText())
+                future = self.__pyVisa.submit(self.__writeSettings,
+                                              str(self.__waveFormSelector.currentText()),
+                                              self.__readCommandValue(self.__frequencyLineEdit, constants.unitFrequency),
+                                              self.__readCommandValue(self.__amplitudeLineEdit, constants.unitAmplitude),
+                                              offSet,
+                                              modulation,
+                                              str(self.__modulatingWaveformSelector.currentText()),
+                                              self.__readCommandValue(self.__frequencyModulationLineEdit, constants.unitFrequency),
+                                              self.__readCommandValue(self.__depthDeviationLineEdit, self.__depthDeviationUnit()),
+                                              timeout = constants.COMMAND_TIMEOUT)
+                self.__dispatcher.watch(future)
         else:
             self.errorWindow = ui_ErrorBox(1000000100)
 
+    def __writeSettings(self, waveform, frequency, amplitude, offSet, modulation, modulatingWaveform, modulationFrequency, depthDeviation):
+        """Function executed in worker thread which writes all settings into device
+
+        All settings are sent as one batched program message followed by single *OPC?.
+        """
+
+        self.__pyVisa.beginBatch()
+        try:
+            self.__pyVisa.insertWaveform(waveform)
+            self.__pyVisa.insertFrequency(frequency)
+            self.__pyVisa.insertAmplitude(amplitude, offSet)
+            if modulation is not None:
+                self.__pyVisa.insertModulation(modulation, modulatingWaveform)
+                self.__pyVisa.insertModulationFreq(modulation, modulationFrequency)
+                if modulation == constants.FM:
+                    self.__pyVisa.insertDeviation(depthDeviation)
+                elif modulation == constants.AM:
+                    self.__pyVisa.insertDepth(depthDeviation)
+            return self.__pyVisa.commitBatch()
+        finally:
+            self.__pyVisa.discardBatch()
+
     #selected for refactoring
     def __configureInstrument(self):
         instrumentAddress = self.__textBrowser.toPlainText()
         if instrumentAddress:
-            self.__pyVisa.openResource(instrumentAddress)
-            if self.__pyVisa.getDeviceStatus() == constants.OPENED:
-                self.__pyVisa.configureCommunication(self.__baudRate)
-                self.__statusTextBrowser.append(self.__pyVisa.getDeviceStatus())
-            else:
-                self.__errorWindow = ui_ErrorBox(1000000101)
+            future = self.__pyVisa.submit(self.__openInstrument, instrumentAddress, self.__baudRate, address = instrumentAddress)
+            self.__dispatcher.watch(future, self.__callBackInstrumentConfigured, constants.COMMAND_TIMEOUT)
+
+    def __openInstrument(self, instrumentAddress, baudRate):
+        """Function executed in worker thread which opens and configures device
+
+        Returns
+        -------
+        touple
+            flag if device was opened, state of device and its name,
+            name is None when device is not configured
+        """
+
+        names = []
+        self.__pyVisa.openResource(instrumentAddress)
+        if not self.__pyVisa.getDeviceStatus() == constants.OPENED:
+            return False, self.__pyVisa.getDeviceStatus(), None
+        self.__pyVisa.configureCommunication(baudRate)
+        if self.__pyVisa.getDeviceStatus() == constants.CONFIGURED:
+            self.__pyVisa.getDeviceName(names.append)
+        return True, self.__pyVisa.getDeviceStatus(), (names[0] if names else None)
+
+    def __callBackInstrumentConfigured(self, result):
+        opened, state, name = result
+        if not opened:
+            self.__errorWindow = ui_ErrorBox(1000000101)
+            return
+        self.__statusTextBrowser.append(state)
+        if name is not None:
+            self.__callBackAppendDeviceName(name)
+
+    def __checkErrorBus(self):
+        self.__dispatcher.watch(self.__pyVisa.submit(self.__pyVisa.checkErrorBus))
 
     #All Values in this function are explained above
     def __checkCorrectness(self):
-        if self.__frequencyLineEdit.text():
-            if not self.__frequencyLineEdit.text() == constants.DEFAULT:
-                if self.__waveFormSelector.currentText() == constants.SINUS:
-                    if not (float(self.__frequencyLineEdit.text()) >= float(constants.micro) * 100 and float(self.__frequencyLineEdit.text()) <= 15 * float(constants.Mega)):
-                        self.__errorWindow = ui_ErrorBox(1100000001)
-                        return False
-                elif self.__waveFormSelector.currentText() == constants.SQUARE:
-                    if not (float(self.__frequencyLineEdit.text()) >= float(constants.micro) * 100 and float(self.__frequencyLineEdit.text()) <= 15 * float(constants.Mega)):
-                        self.__errorWindow = ui_ErrorBox(1100000002)
-                        return False
-                elif self.__waveFormSelector.currentText() == constants.RAMP:
-                    if not (float(self.__frequencyLineEdit.text()) >= float(constants.micro) * 100 and float(self.__frequencyLineEdit.text()) <= 100 * float(constants.kilo)):
-                        self.__errorWindow = ui_ErrorBox(1100000003)
-                        return False
-                elif self.__waveFormSelector.currentText() == constants.TRIANGLE:
-                    if not (float(self.__frequencyLineEdit.text()) >= float(constants.micro) * 100 and float(self.__frequencyLineEdit.text()) <= 100 * float(constants.kilo)):
-                        self.__errorWindow = ui_ErrorBox(1100000004)
-                        return False
-                elif self.__waveFormSelector.currentText() == constants.NOISE:
-                    if not (float(self.__frequencyLineEdit.text()) >= float(constants.micro) * 100 and float(self.__frequencyLineEdit.text()) <= 15 * float(constants.kilo)):
-                        self.__errorWindow = ui_ErrorBox(1100000005)
-                        return False
-                elif self.__waveFormSelector.currentText() == constants.DC:
-                    if not (float(self.__frequencyLineEdit.text()) >= float(constants.micro) * 100 and float(self.__frequencyLineEdit.text()) <= 15 * float(constants.kilo)):
-                        self.__errorWindow = ui_ErrorBox(1100000006)
-                        return False
-        else:
-            self.__errorWindow = ui_ErrorBox(1000000001)
-            return False
+        """Function which validates settings against capabilities of connected model
 
-        if self.__amplitudeLineEdit.text():
-            if not self.__amplitudeLineEdit.text() == constants.DEFAULT:
-                if not (float(self.__amplitudeLineEdit.text()) >= float(constants.mili) * 100 and float(self.__amplitudeLineEdit.text()) <= 20):
-                    self.__errorWindow = ui_ErrorBox(1000000002)
-                    return False
-        else:
+        Widgets only provide values, limits and error codes are kept in capabilities table.
+        Empty field is reported as missing value, DEFault frequency or amplitude is not checked.
+        """
+
+        frequency = self.__readValue(self.__frequencyLineEdit, constants.unitFrequency)
+        amplitude = self.__readValue(self.__amplitudeLineEdit, constants.unitAmplitude)
+        if frequency is None or amplitude is None:
             self.__errorWindow = ui_ErrorBox(1000000001)
             return False
 
-        #Explanation: |Voffset| + Vpp/2 <= Vmax and |Voffset| <= 2xVpp
-        #We have to ensure that both cases are satisfied.
+        offSet = None
         if self.__offSetCheckBox.isChecked():
-            if self.__offsetLineEdit.text():
-                if not (abs(float(self.__offsetLineEdit.text())) + float(self.__amplitudeLineEdit.text()) / 2 <= 20 and abs(float(self.__offsetLineEdit.text())) <= 2 * float(self.__amplitudeLineEdit.text())):
-                    self.__errorWindow = ui_ErrorBox(1000000003)
-                    return False
-            else:
+            offSet = self.__readValue(self.__offsetLineEdit, constants.unitVoltage)
+            if offSet is None:
                 self.__errorWindow = ui_ErrorBox(1000000001)
                 return False
 
+        modulation = None
+        modulationFrequency = None
+        depthDeviation = None
         if self.__modulationCheckBox.isChecked():
-            if self.__modulationSelector.currentText() == constants.FM:
-                if self.__frequencyModulationLineEdit.text():
-                    if not (float(self.__frequencyModulationLineEdit.text()) > float(constants.mili) * 10 and float(self.__amplitudeLineEdit.text()) < 10 * float(constants.kilo)):
-                        self.__errorWindow = ui_ErrorBox(1000000004)
-                        return False
-                else:
-                    self.__errorWindow = ui_ErrorBox(1000000001)
-                    return False
-
-                if self.__depthDeviationLineEdit.text():
-                    if not (float(self.__depthDeviationLineEdit.text()) > float(constants.mili) * 10 and float(self.__depthDeviationLineEdit.text()) < 7.5  * float(constants.Mega)):
-                        self.__errorWindow = ui_ErrorBox(1000000005)
-                        return False
-
-            elif self.__modulationSelector.currentText() == constants.AM:
-                if self.__frequencyModulationLineEdit.text():
-                    if not (float(self.__frequencyModulationLineEdit.text()) > float(constants.mili) * 10 and float(self.__amplitudeLineEdit.text()) < 20 * float(constants.kilo)):
-                        self.__errorWindow = ui_ErrorBox(1000000006)
-                        return False
-                else:
-                    self.__errorWindow = ui_ErrorBox(1000000001)
-                    return False
-
-                if self.__depthDeviationLineEdit.text():
-                    if not (float(self.__depthDeviationLineEdit.text()) >= 0 and float(self.__depthDeviationLineEdit.text()) <= 120):
-                        self.__errorWindow = ui_ErrorBox(1000000007)
-                        return False
-        return True
\ No newline at end of file
+            modulation = str(self.__modulationSelector.currentText())
+            modulationFrequency = self.__readValue(self.__frequencyModulationLineEdit, constants.unitFrequency)
+            if modulationFrequency is None:
+                self.__errorWindow = ui_ErrorBox(1000000001)
+                return False
+            depthDeviation = self.__readValue(self.__depthDeviationLineEdit, self.__depthDeviationUnit())
+
+        #DEFault values are chosen by device itself, they are not checked
+        values = [None if value is constants.DEFAULT else value for value in (frequency, amplitude, offSet, modulationFrequency, depthDeviation)]
+        errorCode = self.__capabilities.validate(str(self.__waveFormSelector.currentText()), values[0], values[1], values[2],
+                                                 modulation, values[3], values[4])
+        if errorCode is not None:
+            self.__errorWindow = ui_ErrorBox(errorCode)
+            return False
+        return True
+
+    def __readValue(self, lineEdit, unit):
+        """Returns value of line edit as float, constants.DEFAULT for DEFault and None for empty or unfinished field
+
+        Text is in engineering notation, e.g. "4.7k", "120 mV" or "1e-6", see metricPrefix.parseValue.
+        """
+
+        text = lineEdit.text()
+        if not text:
+            return None
+        if text == constants.DEFAULT:
+            return constants.DEFAULT
+        try:
+            return parseValue(text, unit)
+        except ValueError:
+            #Validator accepts unfinished input, e.g. "1e"
+            return None
+
+    def __readCommandValue(self, lineEdit, unit):
+        """Returns value of line edit as SCPI parameter, prefixes are not sent to device"""
+
+        value = self.__readValue(lineEdit, unit)
+        if value is None:
+            return ''
+        if value is constants.DEFAULT:
+            return constants.DEFAULT
+        return '%.10g' % value
+
+    def __depthDeviationUnit(self):
+        #Depth of AM is in %, deviation of FM in Hz
+        if str(self.__modulationSelector.currentText()) == constants.AM:
+            return '%'
+        return constants.unitFrequency
\ No newline at end of file
@@ -1,22 +1,14 @@
-from PyQt5 import QtWidgets, QtGui, uic
-from PyQt5.QtWidgets import *
-from PyQt5.QtCore import *
-from PyQt5.QtGui import QRegExpValidator
+import sys
 
-from pV import pyVisaInterface
-import constants
+from PyQt5 import QtWidgets
 
-from chooseDevice import ui_ChooseDevice
-from signalGenerator import ui_SignalGenerator
-from errorBox import ui_ErrorBox
-from osciloscope import ui_Osciloscope
-from multimeter import ui_Multimeter
+#Controller windows, pyVisa and NumPy are imported by main window on first use
 from mainWindow import ui_MainWindow
 
-import sys
-
 app = QtWidgets.QApplication(sys.argv)
 
-window = ui_MainWindow('@sim')
+#Bundled pyvisa-sim definition of generator and multimeter, see also instrumentSimulator.py
+#--log-file also writes log into constants.LOG_FILE_NAME
+window = ui_MainWindow('simulator/instruments.yaml@sim', '--log-file' in app.arguments())
 
 app.exec()
\ No newline at end of file
@@ -0,0 +1,112 @@
+#Gui imports
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import Qt, QTimer
+
+#Internal imports
+from uiLoader import loadForm
+from instrumentMetrics import COUNTERS
+import constants
+
+class ui_StatsPanel(QtWidgets.QWidget):
+    """
+    ui_StatsPanel, live view of instrumentation collected by sessionPool
+
+    Upper table shows every device: commands waiting in its worker queue, transferred
+    bytes and error counters. Lower table shows timing of every SCPI command, wait:OPC
+    row is time spent waiting for operation complete. Tables are refreshed only while
+    panel is visible.
+
+    Attributes
+    ----------
+    metrics : instrumentMetrics
+        statistics shown by panel
+    enabledCheckBox : QtWidgets.QCheckBox
+        UI widget check box which starts and stops collecting
+    deviceTable : QtWidgets.QTableWidget
+        UI widget table with row for every device
+    commandTable : QtWidgets.QTableWidget
+        UI widget table with row for every command of every device
+    timer : QTimer
+        refresh timer, constants.METRICS_REFRESH_INTERVAL
+    """
+
+    def __init__(self, metrics):
+        super(ui_StatsPanel, self).__init__()
+        self.__metrics = metrics
+        loadForm("statsPanel", self)
+
+        self.__enabledCheckBox = self.findChild(QtWidgets.QCheckBox, 'enabledCheckBox')
+        self.__enabledCheckBox.setChecked(metrics.isEnabled())
+        self.__enabledCheckBox.toggled.connect(metrics.setEnabled)
+
+        self.__resetButton = self.findChild(QtWidgets.QPushButton, 'resetButton')
+        self.__resetButton.clicked.connect(self.__reset)
+
+        self.__exportPrometheusButton = self.findChild(QtWidgets.QPushButton, 'exportPrometheusButton')
+        self.__exportPrometheusButton.clicked.connect(self.__exportPrometheus)
+
+        self.__exportJsonButton = self.findChild(QtWidgets.QPushButton, 'exportJsonButton')
+        self.__exportJsonButton.clicked.connect(self.__exportJson)
+
+        self.__deviceTable = self.findChild(QtWidgets.QTableWidget, 'deviceTable')
+        self.__commandTable = self.findChild(QtWidgets.QTableWidget, 'commandTable')
+        for table in (self.__deviceTable, self.__commandTable):
+            table.horizontalHeader().setStretchLastSection(True)
+            table.verticalHeader().setVisible(False)
+            table.setColumnWidth(0, 170)
+        self.__commandTable.setColumnWidth(1, 130)
+
+        self.__timer = QTimer(self)
+        self.__timer.timeout.connect(self.refresh)
+
+        self.show()
+
+    def showEvent(self, event):
+        self.refresh()
+        self.__timer.start(constants.METRICS_REFRESH_INTERVAL)
+        super(ui_StatsPanel, self).showEvent(event)
+
+    def hideEvent(self, event):
+        self.__timer.stop()
+        super(ui_StatsPanel, self).hideEvent(event)
+
+    def refresh(self):
+        devices = self.__metrics.snapshot()
+        self.__fill(self.__deviceTable, [[device['address'], device['queueDepth'], device['bytesOut'], device['bytesIn']] +
+                                         [device[counter] for counter in COUNTERS] for device in devices])
+        self.__fill(self.__commandTable, [[device['address'], label, command['count'], command['mean'] * 1e3,
+                                           command['p50'] * 1e3, command['p95'] * 1e3, command['max'] * 1e3, command['sum'] * 1e3]
+                                          for device in devices for label, command in device['commands'].items()])
+
+    def __fill(self, table, rows):
+        #Items keep numbers, so sorting by column is numeric
+        table.setSortingEnabled(False)
+        table.setRowCount(len(rows))
+        for row, values in enumerate(rows):
+            for column, value in enumerate(values):
+                item = QtWidgets.QTableWidgetItem()
+                item.setData(Qt.DisplayRole, round(value, 3) if isinstance(value, float) else value)
+                table.setItem(row, column, item)
+        table.setSortingEnabled(True)
+
+    def __reset(self):
+        self.__metrics.reset()
+        self.refresh()
+
+    def __exportPrometheus(self):
+        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export Prometheus text', 'instruments.prom',
+                                                            'Prometheus text (*.prom *.txt)')
+        self.__export(fileName)
+
+    def __exportJson(self):
+        fileName, _ = QtWidgets.QFileDialog.getSaveFileName(self, 'Export JSON lines', 'instruments.jsonl',
+                                                            'JSON lines (*.jsonl)')
+        self.__export(fileName)
+
+    def __export(self, fileName):
+        if not fileName:
+            return
+        try:
+            self.__metrics.export(fileName)
+        except OSError as error:
+            QtWidgets.QMessageBox.warning(self, 'Export', str(error))
@@ -0,0 +1,202 @@
+import time
+import threading
+
+import numpy as np
+
+#Internal imports
+import constants
+from capabilities import generatorCapabilities
+from errorHandler import instrumentError
+
+#Record of one sweep point
+SWEEP_DTYPE = np.dtype([('frequency', np.float64), ('amplitude', np.float64),
+                        ('value', np.float64), ('timestamp', np.float64)])
+
+def sweepGrid(start, stop, points, spacing = constants.SWEEP_LINEAR):
+    """Function which creates sweep axis
+
+    Parameters
+    ----------
+    start : float
+        first value
+    stop : float
+        last value
+    points : int
+        number of values
+    spacing : str
+        constants.SWEEP_LINEAR or constants.SWEEP_LOG
+
+    Returns
+    -------
+    numpy.ndarray
+        values of axis
+    """
+
+    if spacing == constants.SWEEP_LOG:
+        return np.geomspace(start, stop, int(points))
+    return np.linspace(start, stop, int(points))
+
+class sweepEngine:
+    """
+    sweepEngine, headless frequency/amplitude sweep of signal generator measured by multimeter
+
+    Whole grid is validated against capabilities of generator model before anything
+    is sent. For every point of grid generator is set (one batch with *OPC?), engine waits
+    settle time, triggers multimeter and waits until measurement is finished.
+    Reading is fetched from multimeter while generator is already set to next point,
+    both devices have separate worker queues, so transfer of reading overlaps with
+    write and settling of next point. Results are stored in preallocated structured
+    array, which can be read during sweep.
+
+    Methods
+    -------
+    start(self, frequencies, amplitudes, mode, settle = constants.SWEEP_SETTLE_TIME, onPoint = None, waveform = constants.SINUS):
+        starts sweep in background thread
+    run(self, frequencies, amplitudes, mode, settle = constants.SWEEP_SETTLE_TIME, onPoint = None, waveform = constants.SINUS) : numpy.ndarray
+        executes sweep in calling thread and returns results
+    stop(self):
+        stops sweep after current point
+    isRunning(self) : bool
+        returns True when sweep is active
+    getResults(self) : numpy.ndarray
+        returns copy of already measured points
+    getRate(self) : float
+        returns points per second of last sweep
+    """
+
+    def __init__(self, generator, multimeter):
+        """Initialization Method
+
+        Parameters
+        ----------
+        generator : pyVisaInterface
+            VISA interface wrapper with configured signal generator
+        multimeter : pyVisaInterface
+            VISA interface wrapper with configured multimeter
+        """
+
+        self.__generator = generator
+        self.__multimeter = multimeter
+        self.__results = np.zeros(0, dtype = SWEEP_DTYPE)
+        self.__count = 0
+        self.__elapsed = 0.0
+        self.__stopEvent = threading.Event()
+        self.__thread = None
+
+    def isRunning(self):
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def getResults(self):
+        return self.__results[:self.__count].copy()
+
+    def getRate(self):
+        return self.__count / self.__elapsed if self.__elapsed else 0.0
+
+    def start(self, frequencies, amplitudes, mode, settle = constants.SWEEP_SETTLE_TIME, onPoint = None, waveform = constants.SINUS):
+        self.stop()
+        self.__prepare(frequencies, amplitudes, waveform)
+        self.__thread = threading.Thread(target = self.__run, args = (mode, settle, onPoint, waveform), name = 'sweep', daemon = True)
+        self.__thread.start()
+
+    def run(self, frequencies, amplitudes, mode, settle = constants.SWEEP_SETTLE_TIME, onPoint = None, waveform = constants.SINUS):
+        """Function which executes sweep in calling thread
+
+        Parameters
+        ----------
+        frequencies : array_like
+            frequencies in Hz, inner axis of sweep
+        amplitudes : array_like
+            amplitudes in Vpp, outer axis of sweep
+        mode : str
+            multimeter mode, e.g. constants.VOLTAGE_AC
+        settle : float
+            time in seconds between generator change and measurement
+        onPoint : callable
+            invoked from sweep thread with index and record of every measured point
+        waveform : str
+            waveform of generator, e.g. constants.SINUS
+
+        Returns
+        -------
+        numpy.ndarray
+            structured array of SWEEP_DTYPE, shorter than grid when sweep was stopped
+
+        Raises
+        ------
+        instrumentError
+            when any point of grid is outside of generator capabilities
+        """
+
+        self.stop()
+        self.__prepare(frequencies, amplitudes, waveform)
+        self.__run(mode, settle, onPoint, waveform)
+        return self.getResults()
+
+    def stop(self):
+        self.__stopEvent.set()
+        if self.__thread is not None and self.__thread is not threading.current_thread():
+            self.__thread.join()
+        self.__thread = None
+
+    def __prepare(self, frequencies, amplitudes, waveform):
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype = np.float64))
+        amplitudes = np.atleast_1d(np.asarray(amplitudes, dtype = np.float64))
+        amplitudeGrid, frequencyGrid = np.meshgrid(amplitudes, frequencies, indexing = 'ij')
+
+        names = []
+        self.__generator.submit(self.__generator.getDeviceName, names.append).result()
+        errorCode = generatorCapabilities.fromIdentity(names[0] if names else None).validate(waveform, frequencyGrid, amplitudeGrid)
+        if errorCode is not None:
+            raise instrumentError(errorCode)
+
+        self.__results = np.zeros(frequencyGrid.size, dtype = SWEEP_DTYPE)
+        self.__results['frequency'] = frequencyGrid.ravel()
+        self.__results['amplitude'] = amplitudeGrid.ravel()
+        self.__results['value'] = np.nan
+        self.__count = 0
+        self.__elapsed = 0.0
+        self.__stopEvent.clear()
+
+    def __setPoint(self, waveform, frequency, amplitude):
+        #Executed in worker thread of generator, unchanged values are skipped by settings cache
+        self.__generator.beginBatch()
+        try:
+            self.__generator.insertWaveform(waveform)
+            self.__generator.insertFrequency('%.10g' % frequency)
+            self.__generator.insertAmplitude('%.10g' % amplitude)
+            return self.__generator.commitBatch()
+        finally:
+            self.__generator.discardBatch()
+
+    def __run(self, mode, settle, onPoint, waveform):
+        generator = self.__generator
+        multimeter = self.__multimeter
+        results = self.__results
+        if not len(results) or generator.getDeviceStatus() == constants.DISCONNECTED:
+            return
+        if not multimeter.submit(multimeter.configureMeasure, mode).result():
+            return
+
+        start = time.monotonic()
+        setting = generator.submit(self.__setPoint, waveform, results['frequency'][0], results['amplitude'][0])
+        for index in range(len(results)):
+            if self.__stopEvent.is_set() or not setting.result():
+                break
+            self.__stopEvent.wait(settle)
+            if not multimeter.submit(multimeter.initiateMeasure).result():
+                break
+            fetching = multimeter.submit(multimeter.fetchMeasure)
+
+            #Reading is transferred while generator goes to next point
+            if index + 1 < len(results):
+                setting = generator.submit(self.__setPoint, waveform, results['frequency'][index + 1], results['amplitude'][index + 1])
+
+            value = fetching.result()
+            if value is None:
+                break
+            results['value'][index] = value
+            results['timestamp'][index] = time.time()
+            self.__count = index + 1
+            self.__elapsed = time.monotonic() - start
+            if onPoint is not None:
+                onPoint(index, results[index])
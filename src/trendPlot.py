@@ -0,0 +1,117 @@
+import numpy as np
+
+#Gui imports
+from PyQt5 import QtWidgets
+from PyQt5.QtCore import Qt, QTimer, QPointF, QRectF
+from PyQt5.QtGui import QPainter, QPen, QColor, QPolygonF
+
+#Internal imports
+import constants
+from decimation import minMaxDecimator
+from metricPrefix import formatValue
+
+BACKGROUND = QColor(0, 0, 0)
+FRAME = QColor(113, 113, 113)
+TRACE = QColor(239, 245, 66)
+LABEL = QColor(200, 200, 200)
+MARGIN = 6
+
+class trendPlot(QtWidgets.QWidget):
+    """
+    trendPlot, live plot of whole trace of ringBuffer
+
+    Used as promoted widget in multimeter forms. Every refresh reads only samples appended
+    to buffer since previous refresh (ringBuffer.since) into minMaxDecimator, redraw is
+    scheduled only when something came. Plot draws min/max envelope reduced to one column
+    per pixel, so frame time is bounded by width of widget, not by length of trace.
+    Refresh runs on own timer (constants.PLOT_REFRESH_INTERVAL) independent of acquisition rate.
+
+    Methods
+    -------
+    start(self, buffer, unit = ''):
+        clears plot and starts following buffer
+    stop(self):
+        reads rest of buffer and stops refreshing, trace stays visible
+    refresh(self):
+        reads new samples of buffer and schedules redraw
+    clear(self):
+        removes trace
+    """
+
+    def __init__(self, parent = None):
+        super(trendPlot, self).__init__(parent)
+        self.__decimator = minMaxDecimator()
+        self.__buffer = None
+        self.__cursor = 0
+        self.__unit = ''
+        self.__timer = QTimer(self)
+        self.__timer.timeout.connect(self.refresh)
+        self.setAttribute(Qt.WA_OpaquePaintEvent)
+
+    def start(self, buffer, unit = ''):
+        self.clear()
+        self.__buffer = buffer
+        #Samples already in buffer belong to previous acquisition
+        self.__cursor = buffer.total()
+        self.__unit = unit
+        self.__timer.start(constants.PLOT_REFRESH_INTERVAL)
+
+    def stop(self):
+        self.__timer.stop()
+        self.refresh()
+
+    def clear(self):
+        self.__decimator.clear()
+        self.update()
+
+    def refresh(self):
+        if self.__buffer is None:
+            return
+        timestamps, values, self.__cursor = self.__buffer.since(self.__cursor)
+        if len(values):
+            self.__decimator.extend(timestamps, values)
+            self.update()
+
+    def paintEvent(self, event):
+        painter = QPainter(self)
+        painter.fillRect(self.rect(), BACKGROUND)
+        painter.setPen(FRAME)
+        painter.drawRect(self.rect().adjusted(0, 0, -1, -1))
+
+        area = QRectF(self.rect()).adjusted(MARGIN, MARGIN + self.fontMetrics().height(), -MARGIN, -MARGIN - self.fontMetrics().height())
+        times, minimum, maximum, lastTime = self.__decimator.render(max(1, int(area.width())))
+        if len(times):
+            self.__drawTrace(painter, area, times, minimum, maximum, lastTime)
+        painter.end()
+
+    def __drawTrace(self, painter, area, times, minimum, maximum, lastTime):
+        low = float(minimum.min())
+        high = float(maximum.max())
+        if not np.isfinite(low) or not np.isfinite(high):
+            return
+        if high == low:
+            high, low = high + 0.5 * (abs(high) or 1.0), low - 0.5 * (abs(low) or 1.0)
+        duration = lastTime - times[0]
+
+        #Every column is vertical segment between minimum and maximum, segments are joined into one zigzag line,
+        #odd columns go from maximum to minimum, so line does not jump back across column
+        x = area.left() + (times - times[0]) * (area.width() / duration if duration > 0 else 0.0)
+        yMinimum = area.bottom() - (minimum - low) * (area.height() / (high - low))
+        yMaximum = area.bottom() - (maximum - low) * (area.height() / (high - low))
+        even = np.arange(len(times)) % 2 == 0
+        points = np.empty((2 * len(times), 2))
+        points[0::2, 0] = x
+        points[1::2, 0] = x
+        points[0::2, 1] = np.where(even, yMinimum, yMaximum)
+        points[1::2, 1] = np.where(even, yMaximum, yMinimum)
+
+        painter.setPen(QPen(TRACE))
+        painter.drawPolyline(QPolygonF([QPointF(px, py) for px, py in points.tolist()]))
+
+        painter.setPen(LABEL)
+        height = self.fontMetrics().height()
+        painter.drawText(QRectF(MARGIN, 0, area.width(), height), Qt.AlignLeft | Qt.AlignVCenter, formatValue(high, self.__unit))
+        painter.drawText(QRectF(MARGIN, self.height() - height, area.width(), height), Qt.AlignLeft | Qt.AlignVCenter,
+                         formatValue(low, self.__unit))
+        painter.drawText(QRectF(MARGIN, self.height() - height, area.width(), height), Qt.AlignRight | Qt.AlignVCenter,
+                         '%d samples, %.1f s' % (self.__decimator.total(), duration))
@@ -0,0 +1,83 @@
+import os
+import importlib.util
+
+UI_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'UI')
+FORMS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uiForms')
+
+#Form classes already imported in this process
+_forms = {}
+
+def loadForm(name, widget):
+    """Function which builds widgets described by UI/<name>.ui on widget
+
+    Replacement for uic.loadUi. Every .ui file is compiled once into Python module
+    in uiForms directory and compiled again only when .ui file is newer than module.
+    Form class is imported once per process, so next windows only run setupUi.
+    Like uic.loadUi, all named child widgets become attributes of widget.
+
+    Parameters
+    ----------
+    name : str
+        name of .ui file without extension, e.g. "mainPanel"
+    widget : QtWidgets.QWidget
+        widget on which form is built
+    """
+
+    formClass = _forms.get(name)
+    if formClass is None:
+        try:
+            formClass = _importForm(compileForm(name))
+        except OSError:
+            #Read-only installation, parse .ui at runtime
+            from PyQt5 import uic
+            uic.loadUi(os.path.join(UI_DIRECTORY, name + '.ui'), widget)
+            return
+        _forms[name] = formClass
+
+    form = formClass()
+    form.setupUi(widget)
+    for attribute, value in vars(form).items():
+        setattr(widget, attribute, value)
+
+def compileForm(name):
+    """Function which compiles UI/<name>.ui when compiled module is missing or older
+
+    Returns
+    -------
+    str
+        path of compiled module
+    """
+
+    source = os.path.join(UI_DIRECTORY, name + '.ui')
+    target = os.path.join(FORMS_DIRECTORY, name + '.py')
+    if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(source):
+        return target
+
+    #uic is loaded only when some form has to be compiled
+    from PyQt5 import uic
+    os.makedirs(FORMS_DIRECTORY, exist_ok = True)
+    temporary = target + '.tmp'
+    with open(source, 'r', encoding = 'utf-8') as uiFile, open(temporary, 'w', encoding = 'utf-8') as pyFile:
+        uic.compileUi(uiFile, pyFile)
+    os.replace(temporary, target)
+    return target
+
+def compileAll():
+    """Build step which compiles all .ui files, returns list of compiled modules"""
+
+    return [compileForm(fileName[:-3]) for fileName in sorted(os.listdir(UI_DIRECTORY))
+            if fileName.endswith('.ui') and os.path.getsize(os.path.join(UI_DIRECTORY, fileName)) > 0]
+
+def _importForm(path):
+    name = 'uiForms.' + os.path.splitext(os.path.basename(path))[0]
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    for attribute, value in vars(module).items():
+        if attribute.startswith('Ui_') and isinstance(value, type):
+            return value
+    raise ImportError('No form class in ' + path)
+
+if __name__ == '__main__':
+    for path in compileAll():
+        print(path)
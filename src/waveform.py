@@ -0,0 +1,68 @@
+from collections import namedtuple
+
+import numpy as np
+
+#Internal imports
+import constants
+
+waveformPreamble = namedtuple('waveformPreamble', ['format', 'type', 'points', 'count',
+                                                   'xIncrement', 'xOrigin', 'xReference',
+                                                   'yIncrement', 'yOrigin', 'yReference'])
+waveformPreamble.__doc__ = """Answer of :WAVeform:PREamble? query (IEEE 488.2 oscilloscopes, 10 comma separated fields)"""
+
+#Format of :WAV:FORM mapped to pyVisa datatype of samples, unsigned as selected by :WAV:UNS ON
+DATATYPES = {
+    constants.WAVEFORM_BYTE : 'B',
+    constants.WAVEFORM_WORD : 'H',
+    }
+
+def parsePreamble(string):
+    """Function which parses preamble string
+
+    Parameters
+    ----------
+    string : str
+        answer of :WAV:PRE? query
+
+    Returns
+    -------
+    waveformPreamble
+        parsed preamble
+    """
+
+    fields = string.strip().split(',')
+    return waveformPreamble(int(float(fields[0])), int(float(fields[1])), int(float(fields[2])), int(float(fields[3])),
+                            float(fields[4]), float(fields[5]), float(fields[6]),
+                            float(fields[7]), float(fields[8]), float(fields[9]))
+
+def scaleWaveform(raw, preamble):
+    """Function which converts raw samples into time and voltage arrays
+
+    Whole conversion is done in vectorized NumPy operations, without Python
+    loops, so it stays fast for millions of points.
+        time    = (index - xReference) * xIncrement + xOrigin
+        voltage = (sample - yReference) * yIncrement + yOrigin
+
+    Parameters
+    ----------
+    raw : numpy.ndarray
+        raw integer samples read with query_binary_values
+    preamble : waveformPreamble
+        preamble of the same capture
+
+    Returns
+    -------
+    touple
+        arrays of time in seconds and voltage in volts
+    """
+
+    times = np.arange(len(raw), dtype = np.float64)
+    times -= preamble.xReference
+    times *= preamble.xIncrement
+    times += preamble.xOrigin
+
+    volts = raw.astype(np.float64)
+    volts -= preamble.yReference
+    volts *= preamble.yIncrement
+    volts += preamble.yOrigin
+    return times, volts
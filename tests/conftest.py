@@ -0,0 +1,17 @@
+"""Common setup of tests, modules of application are imported from src like when it runs from there"""
+
+import os
+import sys
+
+import pytest
+
+SOURCE_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'src')
+sys.path.insert(0, SOURCE_DIRECTORY)
+
+#Bundled pyvisa-sim definition, absolute path so tests do not depend on working directory
+SIM_BACKEND = os.path.join(SOURCE_DIRECTORY, 'simulator', 'instruments.yaml') + '@sim'
+
+@pytest.fixture
+def simBackend():
+    pytest.importorskip('pyvisa_sim')
+    return SIM_BACKEND
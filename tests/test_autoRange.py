@@ -0,0 +1,38 @@
+import constants
+from autoRange import rangePredictor, rangePrefix
+from capabilities import multimeterCapabilities
+
+RANGES = multimeterCapabilities().getRanges(constants.VOLTAGE_DC)
+
+def testStartsOnHighestRangeAndGoesDownAtOnce():
+    predictor = rangePredictor(RANGES, 1.2)
+    assert predictor.getRange() == 1000.0
+    assert predictor.observe(0.05) == 0.1
+    assert predictor.getChanges() == 1
+    assert predictor.observe(0.06) is None
+
+def testOverloadSelectsNextRange():
+    predictor = rangePredictor(RANGES, 1.2)
+    predictor.observe(0.05)
+    assert predictor.isOverload(constants.OVERLOAD)
+    assert predictor.observe(constants.OVERLOAD) == 1.0
+    #Overloaded range is remembered, reading near boundary does not switch back
+    assert predictor.observe(0.05) is None
+    assert predictor.getRange() == 1.0
+
+def testLowerRangeNeedsWholeHistory():
+    predictor = rangePredictor(RANGES, 1.2, history = 3)
+    predictor.observe(5.0)
+    assert predictor.getRange() == 10.0
+    assert predictor.observe(0.5) is None
+    assert predictor.observe(0.5) is None
+    assert predictor.observe(0.5) == 1.0
+
+def testNanIsOverload():
+    predictor = rangePredictor(RANGES, 1.2)
+    assert predictor.isOverload(float('nan'))
+
+def testRangePrefix():
+    assert rangePrefix(0.1) == (constants.signMili, constants.mili)
+    assert rangePrefix(10.0) == (constants.signNone, constants.none)
+    assert rangePrefix(1e6) == (constants.signMega, constants.Mega)
@@ -0,0 +1,40 @@
+import numpy as np
+
+import constants
+from capabilities import generatorCapabilities, multimeterCapabilities, modelFromIdentity, MODELS, DEFAULT_MODEL
+
+def testModelFromIdentity():
+    assert modelFromIdentity('HEWLETT-PACKARD,33120A,0,7.0-5.0-1.0', MODELS, DEFAULT_MODEL) == '33120A'
+    assert modelFromIdentity(None, MODELS, DEFAULT_MODEL) == DEFAULT_MODEL
+    assert generatorCapabilities.fromIdentity('Unknown,X1,0,1').getModel() == DEFAULT_MODEL
+    assert multimeterCapabilities.fromIdentity('HEWLETT-PACKARD,34401A,0,11-5-2').getModel() == '34401A'
+
+def testValidateSingleSetting():
+    capabilities = generatorCapabilities()
+    assert capabilities.validate(constants.SINUS, 1000.0, 1.0) is None
+    assert capabilities.validate(constants.SINUS, 20e6, 1.0) == 1100000001
+    assert capabilities.validate(constants.RAMP, 200e3, 1.0) == 1100000003
+    assert capabilities.validate(constants.SINUS, 1000.0, 0.05) == 1000000002
+    #|Voffset| + Vpp/2 <= Vmax and |Voffset| <= 2xVpp
+    assert capabilities.validate(constants.SINUS, 1000.0, 1.0, offset = 2.0) is None
+    assert capabilities.validate(constants.SINUS, 1000.0, 1.0, offset = 3.0) == 1000000003
+    assert capabilities.validate(constants.SINUS, 1000.0, 1.0, modulation = constants.FM,
+                                 modulationFrequency = 100.0, depthDeviation = 10e6) == 1000000005
+    assert capabilities.validate(constants.SINUS, 1000.0, 1.0, modulation = constants.AM,
+                                 modulationFrequency = 100.0, depthDeviation = 150.0) == 1000000007
+
+def testUnsetParametersAreNotChecked():
+    assert generatorCapabilities().validate(constants.SINUS, None, None) is None
+
+def testValidateGrid():
+    capabilities = generatorCapabilities()
+    frequencies = np.array([1.0, 1e3, 1e6, 20e6])
+    assert capabilities.validate(constants.SINUS, frequencies, 1.0) == 1100000001
+    assert list(capabilities.invalidPoints(constants.SINUS, frequencies, 1.0)) == [False, False, False, True]
+    assert capabilities.invalidPoints(constants.SINUS, frequencies[:, None], np.array([0.01, 1.0])).shape == (4, 2)
+
+def testMultimeterRanges():
+    capabilities = multimeterCapabilities()
+    assert capabilities.getRanges(constants.VOLTAGE_DC)[0] == 0.1
+    assert capabilities.getRanges(constants.FREQUENCY) is None
+    assert capabilities.getOverrange() == 1.2
@@ -0,0 +1,103 @@
+import time
+import threading
+from concurrent.futures import TimeoutError
+
+import pytest
+
+from commandScheduler import commandScheduler, busOf
+import constants
+
+def blockBus(scheduler, address):
+    """Occupies worker of bus of address until returned event is set"""
+
+    started = threading.Event()
+    release = threading.Event()
+    def wait():
+        started.set()
+        release.wait(5)
+    future = scheduler.getQueue(address).submit(wait)
+    assert started.wait(5)
+    return release, future
+
+def testBusOf():
+    assert busOf('GPIB0::22::INSTR') == 'GPIB0'
+    assert busOf('GPIB1::5::INSTR') == 'GPIB1'
+    assert busOf('ASRL3::INSTR') == 'ASRL3'
+    assert busOf('TCPIP::host::5025::SOCKET') == 'TCPIP::host::5025::SOCKET'
+    assert busOf('GPIB-VXI0::1::INSTR') == 'GPIB-VXI0::1::INSTR'
+
+def testUserCommandGoesFirst():
+    scheduler = commandScheduler()
+    order = []
+    release, blocker = blockBus(scheduler, 'GPIB0::1::INSTR')
+    queue = scheduler.getQueue('GPIB0::1::INSTR')
+    futures = [queue.submit(order.append, 'background%d' % index, priority = constants.PRIORITY_BACKGROUND) for index in range(2)]
+    futures.append(queue.submit(order.append, 'user', priority = constants.PRIORITY_USER))
+    release.set()
+    for future in futures:
+        future.result(5)
+    assert order == ['user', 'background0', 'background1']
+    scheduler.stopAll()
+
+def testDevicesOfOneBusTakeTurns():
+    scheduler = commandScheduler()
+    order = []
+    release, blocker = blockBus(scheduler, 'GPIB0::1::INSTR')
+    first = scheduler.getQueue('GPIB0::1::INSTR')
+    second = scheduler.getQueue('GPIB0::2::INSTR')
+    futures = [first.submit(order.append, ('a', index)) for index in range(3)]
+    futures += [second.submit(order.append, ('b', index)) for index in range(3)]
+    release.set()
+    for future in futures:
+        future.result(5)
+    #Devices alternate, none of them gets two commands in row
+    assert [device for device, _ in order] in (['a', 'b'] * 3, ['b', 'a'] * 3)
+    assert [index for device, index in order if device == 'a'] == [0, 1, 2]
+    assert scheduler.getBuses() == {'GPIB0' : ['GPIB0::1::INSTR', 'GPIB0::2::INSTR']}
+    scheduler.stopAll()
+
+def testDifferentBusesRunInParallel():
+    scheduler = commandScheduler()
+    release, blocker = blockBus(scheduler, 'GPIB0::1::INSTR')
+    assert scheduler.getQueue('GPIB1::1::INSTR').submit(lambda : 'done').result(5) == 'done'
+    release.set()
+    scheduler.stopAll()
+
+def testMinimalInterval():
+    scheduler = commandScheduler()
+    scheduler.setMinInterval('ASRL1::INSTR', 0.05)
+    queue = scheduler.getQueue('ASRL1::INSTR')
+    starts = [queue.submit(time.monotonic) for _ in range(3)]
+    starts = [future.result(5) for future in starts]
+    assert all(later - earlier >= 0.045 for earlier, later in zip(starts, starts[1:]))
+    scheduler.stopAll()
+
+def testExpiredAndCancelledCommands():
+    scheduler = commandScheduler()
+    release, blocker = blockBus(scheduler, 'ASRL1::INSTR')
+    queue = scheduler.getQueue('ASRL1::INSTR')
+    expired = queue.submit(lambda : None, timeout = 0.01)
+    cancelled = queue.submit(lambda : None)
+    assert cancelled.cancel()
+    time.sleep(0.05)
+    release.set()
+    #Expired command is not executed, its future fails instead
+    with pytest.raises(TimeoutError, match = 'expired'):
+        expired.result(5)
+    assert queue.depth() == 0
+    scheduler.stopAll()
+
+def testRemovedQueueFinishesAfterRunningCommand():
+    scheduler = commandScheduler()
+    release, blocker = blockBus(scheduler, 'ASRL1::INSTR')
+    waiting = scheduler.getQueue('ASRL1::INSTR').submit(lambda : None)
+    queue = scheduler.remove('ASRL1::INSTR', cancel = True)
+    assert waiting.cancelled()
+    assert not queue.finished().done()
+    release.set()
+    queue.finished().result(5)
+    assert blocker.done()
+    #Stopped queue does not take new commands, address gets new queue
+    assert queue.submit(lambda : None).cancelled()
+    assert scheduler.getQueue('ASRL1::INSTR') is not queue
+    scheduler.stopAll()
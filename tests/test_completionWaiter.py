@@ -0,0 +1,116 @@
+import threading
+
+import pytest
+import pyvisa
+from pyvisa.constants import EventType, EventMechanism, InterfaceType, StatusCode
+
+from completionWaiter import completionWaiter, HANDLER, QUEUE, POLLING, NONE
+
+class fakeInstrument:
+    """Device with status registers, operation finishes after given number of *ESR? polls"""
+
+    def __init__(self, interface = InterfaceType.gpib, polls = 0, status = True):
+        self.interface_type = interface
+        self.polls = polls
+        self.status = status
+        self.written = []
+        self.handler = None
+
+    def write(self, message):
+        self.written.append(message)
+        if message == '*OPC' and self.handler is not None:
+            #Service request comes from other thread, like from VISA library
+            threading.Timer(0.01, self.handler, (self, None, None)).start()
+
+    def query(self, message):
+        if message == '*ESE?':
+            if not self.status:
+                raise pyvisa.errors.VisaIOError(StatusCode.error_timeout)
+            return '+1'
+        if message == '*ESR?':
+            if self.polls > 0:
+                self.polls -= 1
+                return '+0'
+            return '+1'
+        raise AssertionError(message)
+
+class handlerInstrument(fakeInstrument):
+    def wrap_handler(self, function):
+        return function
+
+    def install_handler(self, eventType, handler):
+        self.handler = handler
+        return 1
+
+    def enable_event(self, eventType, mechanism):
+        assert mechanism == EventMechanism.handler
+
+    def disable_event(self, eventType, mechanism):
+        self.handler = None
+
+    def uninstall_handler(self, eventType, handler, userHandle):
+        pass
+
+class queueInstrument(fakeInstrument):
+    def __init__(self):
+        super(queueInstrument, self).__init__()
+        self.waits = []
+
+    def wrap_handler(self, function):
+        raise NotImplementedError
+
+    def enable_event(self, eventType, mechanism):
+        assert mechanism == EventMechanism.queue
+
+    def discard_events(self, eventType, mechanism):
+        pass
+
+    def wait_on_event(self, eventType, timeout):
+        self.waits.append((eventType, timeout))
+
+def testSerialDeviceIsPolled():
+    instrument = fakeInstrument(InterfaceType.asrl, polls = 3)
+    waiter = completionWaiter(instrument)
+    waiter.wait(1)
+    assert waiter.getMechanism() == POLLING
+    assert instrument.polls == 0
+    assert instrument.written == ['*ESE 1', '*OPC']
+
+def testPollingTimeout():
+    instrument = fakeInstrument(InterfaceType.asrl, polls = 10 ** 6)
+    waiter = completionWaiter(instrument)
+    with pytest.raises(pyvisa.errors.VisaIOError) as error:
+        waiter.wait(0.05)
+    assert error.value.error_code == StatusCode.error_timeout
+
+def testDeviceWithoutStatusIsNotWaitedFor():
+    instrument = fakeInstrument(status = False)
+    waiter = completionWaiter(instrument)
+    waiter.wait(1)
+    assert waiter.getMechanism() == NONE
+    waiter.wait(1)
+    assert instrument.written == ['*ESE 1']
+
+def testServiceRequestHandler():
+    instrument = handlerInstrument()
+    waiter = completionWaiter(instrument)
+    waiter.wait(1)
+    assert waiter.getMechanism() == HANDLER
+    assert '*SRE 32' in instrument.written
+    waiter.close()
+    assert instrument.handler is None
+
+def testServiceRequestHandlerTimeout():
+    instrument = handlerInstrument()
+    waiter = completionWaiter(instrument)
+    waiter.wait(1)
+    instrument.handler = None
+    with pytest.raises(pyvisa.errors.VisaIOError):
+        waiter.wait(0.05)
+
+def testEventQueue():
+    instrument = queueInstrument()
+    waiter = completionWaiter(instrument)
+    waiter.wait(2)
+    assert waiter.getMechanism() == QUEUE
+    assert instrument.waits == [(EventType.service_request, 2000)]
@@ -0,0 +1,46 @@
+import numpy as np
+
+from decimation import minMaxDecimator
+
+def testEnvelopeOfShortTrace():
+    decimator = minMaxDecimator(8)
+    decimator.extend([0.0, 1.0, 2.0], [1.0, -2.0, 3.0])
+    times, minimum, maximum, last = decimator.render(100)
+    assert list(times) == [0.0, 1.0, 2.0]
+    assert list(minimum) == list(maximum) == [1.0, -2.0, 3.0]
+    assert last == 2.0
+
+def testMergedBinsKeepSpikes():
+    decimator = minMaxDecimator(16)
+    values = np.zeros(10000)
+    values[1234] = 5.0
+    values[8765] = -7.0
+    #Samples come in bursts of different length, like from acquisition
+    for start in range(0, len(values), 333):
+        decimator.extend(np.arange(start, min(start + 333, len(values)), dtype = float), values[start:start + 333])
+    assert decimator.total() == len(values)
+    assert decimator.span() > 1
+    times, minimum, maximum, last = decimator.render(4)
+    assert len(times) <= 4
+    assert maximum.max() == 5.0
+    assert minimum.min() == -7.0
+    assert times[0] == 0.0
+    assert last == len(values) - 1
+
+def testBurstsGiveSameResultAsOneExtend():
+    values = np.random.default_rng(0).normal(size = 5000)
+    timestamps = np.arange(len(values), dtype = float)
+    whole = minMaxDecimator(32)
+    whole.extend(timestamps, values)
+    parts = minMaxDecimator(32)
+    for start in range(0, len(values), 77):
+        parts.extend(timestamps[start:start + 77], values[start:start + 77])
+    for expected, result in zip(whole.render(20), parts.render(20)):
+        assert np.array_equal(expected, result)
+
+def testClear():
+    decimator = minMaxDecimator(8)
+    decimator.extend(np.arange(100.0), np.arange(100.0))
+    decimator.clear()
+    times, minimum, maximum, last = decimator.render(10)
+    assert len(times) == 0 and last is None and decimator.total() == 0
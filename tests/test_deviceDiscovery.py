@@ -0,0 +1,73 @@
+import time
+from concurrent.futures import Future
+
+from deviceDiscovery import deviceDiscovery, discoveredDevice
+
+class fakePool:
+    """Pool which answers probes immediately and counts them"""
+
+    def __init__(self, addresses):
+        self.addresses = list(addresses)
+        self.probes = []
+        self.cancelled = set()
+
+    def listResources(self):
+        return tuple(self.addresses)
+
+    def probeIdentity(self, address, timeout):
+        self.probes.append(address)
+        future = Future()
+        if address in self.cancelled:
+            future.cancel()
+        else:
+            future.set_running_or_notify_cancel()
+            future.set_result('IDN of ' + address)
+        return future
+
+def testRefreshProbesEveryAddress():
+    pool = fakePool(['ASRL1::INSTR', 'GPIB0::22::INSTR'])
+    discovery = deviceDiscovery(pool, ttl = 60)
+    found = []
+    devices = discovery.refresh(found.append).result(5)
+    assert devices == [discoveredDevice('ASRL1::INSTR', 'IDN of ASRL1::INSTR'),
+                       discoveredDevice('GPIB0::22::INSTR', 'IDN of GPIB0::22::INSTR')]
+    assert sorted(found) == devices
+    discovery.close()
+
+def testFreshCacheIsReturnedWithoutProbes():
+    pool = fakePool(['ASRL1::INSTR'])
+    discovery = deviceDiscovery(pool, ttl = 60)
+    discovery.refresh().result(5)
+    refreshed = discovery.refresh()
+    assert refreshed.done()
+    assert refreshed.result() == discovery.cached()
+    assert pool.probes == ['ASRL1::INSTR']
+    discovery.close()
+
+def testOnlyNewAndExpiredAddressesAreProbed():
+    pool = fakePool(['ASRL1::INSTR'])
+    discovery = deviceDiscovery(pool, ttl = 0.2)
+    discovery.refresh().result(5)
+    time.sleep(0.3)
+    pool.addresses = ['ASRL1::INSTR', 'ASRL2::INSTR']
+    discovery.refresh().result(5)
+    assert pool.probes == ['ASRL1::INSTR', 'ASRL1::INSTR', 'ASRL2::INSTR']
+    #Listing is fresh again, only force probes once more
+    discovery.refresh(force = True).result(5)
+    assert len(pool.probes) == 5
+    discovery.close()
+
+def testRemovedAddressIsForgotten():
+    pool = fakePool(['ASRL1::INSTR', 'ASRL2::INSTR'])
+    discovery = deviceDiscovery(pool, ttl = 60)
+    discovery.refresh().result(5)
+    pool.addresses = ['ASRL2::INSTR']
+    assert discovery.refresh(force = True).result(5) == [discoveredDevice('ASRL2::INSTR', 'IDN of ASRL2::INSTR')]
+    discovery.close()
+
+def testCancelledProbeHasNoIdentity():
+    pool = fakePool(['ASRL1::INSTR'])
+    pool.cancelled.add('ASRL1::INSTR')
+    discovery = deviceDiscovery(pool, ttl = 60)
+    assert discovery.refresh().result(5) == [discoveredDevice('ASRL1::INSTR', None)]
+    discovery.close()
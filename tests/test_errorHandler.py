@@ -0,0 +1,36 @@
+import pytest
+from pyvisa.constants import StatusCode
+
+from errorHandler import (ERRORS, getError, errorParser, VISA_ERROR, VISA_STATUS, INPUT_ERROR,
+                          DEVICE_ERROR, CONNECTION_ERROR, LIMIT_ERROR, NOT_IMPLEMENTED, UNKNOWN)
+
+def testCategories():
+    assert getError(StatusCode.error_timeout).category == VISA_ERROR
+    assert getError(1073676293).category == VISA_STATUS
+    assert getError(1000000001).category == INPUT_ERROR
+    assert getError(1000000008).category == DEVICE_ERROR
+    assert getError(1000000100).category == CONNECTION_ERROR
+    assert getError(1100000001).category == LIMIT_ERROR
+    assert getError(9999999999).category == NOT_IMPLEMENTED
+
+def testRetryable():
+    assert getError(StatusCode.error_timeout).retryable
+    assert getError(StatusCode.error_connection_lost).retryable
+    assert not getError(StatusCode.error_invalid_object).retryable
+    assert not getError(1000000100).retryable
+
+def testUnknownCode():
+    error = getError(1234567890)
+    assert error.category == UNKNOWN and not error.retryable
+    assert '1234567890' in error.message
+
+def testRegistryIsReadOnly():
+    with pytest.raises(TypeError):
+        ERRORS[1234567890] = ERRORS[1000000100]
+    with pytest.raises(AttributeError):
+        ERRORS[1000000100].code = 0
+
+def testParserUsesRegistry():
+    parser = errorParser()
+    assert parser.printError(1000000100) == 'Device is disconnected'
+    assert parser.printError(1000000100) == ERRORS[1000000100].message
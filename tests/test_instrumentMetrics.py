@@ -0,0 +1,96 @@
+import json
+
+import pytest
+import pyvisa
+from pyvisa.constants import StatusCode
+
+import constants
+from instrumentMetrics import instrumentMetrics, latencyHistogram, commandHeader, BATCH, TIMEOUTS, ERRORS, RETRYABLE_ERRORS
+from meteredResource import meteredResource
+
+class fakeResource:
+    """Resource which answers every query with the same text or raises given VISA error"""
+
+    def __init__(self, answer = '+1.0', error = None):
+        self.answer = answer
+        self.error = error
+        self.written = []
+        self.timeout = 2000
+        self.write_termination = '\n'
+        self.read_termination = '\n'
+
+    def write(self, message, termination = None, encoding = None):
+        if self.error is not None:
+            raise pyvisa.errors.VisaIOError(self.error)
+        self.written.append(message)
+        return len(message)
+
+    def query(self, message, delay = None):
+        if self.error is not None:
+            raise pyvisa.errors.VisaIOError(self.error)
+        return self.answer
+
+def testCommandHeader():
+    assert commandHeader('MEAS:VOLT:DC? DEF,DEF') == 'MEAS:VOLT:DC?'
+    assert commandHeader('freq 1000\n') == 'FREQ'
+    assert commandHeader('FREQ 1000;:VOLT 1') == BATCH
+
+def testHistogramQuantiles():
+    histogram = latencyHistogram()
+    for seconds in [40e-6] * 90 + [3e-3] * 10:
+        histogram.observe(seconds)
+    assert histogram.count == 100
+    assert histogram.quantile(0.5) == constants.METRICS_BUCKETS[0]
+    #Upper bound of bucket (5 ms) is limited by longest observed duration
+    assert histogram.quantile(0.95) == 3e-3
+    assert histogram.maximum == 3e-3
+    assert histogram.mean() == pytest.approx((90 * 40e-6 + 10 * 3e-3) / 100)
+
+def testMeteredResourceCountsCommandsAndBytes():
+    metrics = instrumentMetrics()
+    resource = meteredResource(fakeResource(), metrics.device('GPIB0::22::INSTR'), metrics)
+    resource.write('FREQ 1000')
+    assert resource.query('MEAS:VOLT:DC?') == '+1.0'
+    #Attributes are forwarded to resource
+    resource.timeout = 500
+    assert resource.timeout == 500
+    device, = metrics.snapshot()
+    assert device['commands']['FREQ']['count'] == 1 and device['commands']['MEAS:VOLT:DC?']['count'] == 1
+    assert device['bytesOut'] == len('FREQ 1000\n') + len('MEAS:VOLT:DC?\n')
+    assert device['bytesIn'] == len('+1.0\n')
+
+def testDisabledMetricsObserveNothing():
+    metrics = instrumentMetrics(enabled = False)
+    resource = meteredResource(fakeResource(), metrics.device('ASRL1::INSTR'), metrics)
+    resource.write('FREQ 1000')
+    device, = metrics.snapshot()
+    assert device['commands'] == {} and device['bytesOut'] == 0
+    metrics.setEnabled(True)
+    resource.write('FREQ 2000')
+    assert metrics.snapshot()[0]['commands']['FREQ']['count'] == 1
+
+def testErrorsAreCountedAndRaised():
+    metrics = instrumentMetrics()
+    device = metrics.device('ASRL1::INSTR')
+    timeouts = meteredResource(fakeResource(error = StatusCode.error_timeout), device, metrics)
+    with pytest.raises(pyvisa.errors.VisaIOError):
+        timeouts.query('*IDN?')
+    invalid = meteredResource(fakeResource(error = StatusCode.error_invalid_object), device, metrics)
+    with pytest.raises(pyvisa.errors.VisaIOError):
+        invalid.write('*RST')
+    counters = metrics.snapshot()[0]
+    #Timeout can be repeated, invalid session can not
+    assert counters[TIMEOUTS] == 1 and counters[ERRORS] == 1 and counters[RETRYABLE_ERRORS] == 1
+
+def testExports():
+    metrics = instrumentMetrics()
+    metrics.setQueueDepthSource(lambda : {'ASRL1::INSTR' : 3})
+    resource = meteredResource(fakeResource(), metrics.device('ASRL1::INSTR'), metrics)
+    resource.write('FREQ 1000')
+    text = metrics.toPrometheus()
+    assert 'visa_command_duration_seconds_count{address="ASRL1::INSTR",command="FREQ"} 1' in text
+    assert 'visa_queue_depth{address="ASRL1::INSTR"} 3' in text
+    record = json.loads(metrics.toJsonLines())
+    assert record['address'] == 'ASRL1::INSTR' and record['queueDepth'] == 3
+    metrics.reset()
+    assert metrics.snapshot()[0]['commands'] == {}
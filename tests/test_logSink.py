@@ -0,0 +1,72 @@
+import os
+import threading
+
+import pytest
+
+import constants
+
+@pytest.fixture(scope = 'module')
+def application():
+    pytest.importorskip('PyQt5')
+    os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen')
+    from PyQt5 import QtWidgets
+    return QtWidgets.QApplication.instance() or QtWidgets.QApplication([])
+
+def rows(model):
+    return [model.data(model.index(row)) for row in range(model.rowCount())]
+
+def testModelDropsOldestRecords(application):
+    from logSink import logModel
+    model = logModel(3)
+    model.appendRecords(['a', 'b'])
+    model.appendRecords(['c', 'd', 'e'])
+    assert rows(model) == ['c', 'd', 'e']
+
+def testRecordsOfManyThreads(application):
+    from logSink import logSink
+    sink = logSink()
+    def log(name):
+        for index in range(1000):
+            sink.addItem('%s %d' % (name, index))
+    threads = [threading.Thread(target = log, args = ('thread%d' % index,)) for index in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    #Nothing reaches model before flush of GUI timer
+    assert sink.getModel().rowCount() == 0
+    sink.flush()
+    records = rows(sink.getModel())
+    assert len(records) == 4000
+    assert [record for record in records if record.startswith('thread0 ')] == ['thread0 %d' % index for index in range(1000)]
+    sink.close()
+
+def testDroppedRecordsAreCounted(application, monkeypatch, tmp_path):
+    from logSink import logSink
+    monkeypatch.setattr(constants, 'LOG_CAPACITY', 4)
+    fileName = str(tmp_path / 'instruments.log')
+    sink = logSink(fileName = fileName)
+    for index in range(6):
+        sink.addItem('record %d' % index)
+    sink.close()
+    assert rows(sink.getModel()) == ['record 2', 'record 3', 'record 4', 'record 5']
+    with open(fileName, encoding = 'utf-8') as file:
+        assert file.read().splitlines() == ['2 log records dropped', 'record 2', 'record 3', 'record 4', 'record 5']
+
+def testFileIsRotated(application, monkeypatch, tmp_path):
+    from logSink import logSink
+    monkeypatch.setattr(constants, 'LOG_FILE_SIZE', 100)
+    monkeypatch.setattr(constants, 'LOG_FILE_COUNT', 2)
+    fileName = str(tmp_path / 'instruments.log')
+    sink = logSink(fileName = fileName)
+    for index in range(4):
+        sink.addItem('%d' % index * 60)
+        sink.flush()
+    sink.close()
+    assert sorted(os.listdir(str(tmp_path))) == ['instruments.log', 'instruments.log.1', 'instruments.log.2']
+    #Every file is rotated after its second record, the newest full file is .1
+    with open(fileName + '.1', encoding = 'utf-8') as file:
+        assert file.read().splitlines() == ['2' * 60, '3' * 60]
+    with open(fileName + '.2', encoding = 'utf-8') as file:
+        assert file.read().splitlines() == ['0' * 60, '1' * 60]
+    assert os.path.getsize(fileName) == 0
@@ -0,0 +1,61 @@
+import os
+import json
+
+import numpy as np
+
+import constants
+from measurementStore import measurementStore, storeReader, INDEX_FILE_NAME
+
+def testRoundTrip(tmp_path):
+    store = measurementStore(str(tmp_path), segmentSize = 64, firstSegmentSize = 8)
+    timestamps = np.arange(200, dtype = np.float64)
+    for start in range(0, 200, 30):
+        store.append('ASRL2::INSTR', constants.VOLTAGE_DC, constants.unitVoltage, timestamps[start:start + 30], timestamps[start:start + 30] * 2)
+    store.append('ASRL2::INSTR', constants.RESISTANCE, constants.unitResistance, [500.0], [100.0])
+    store.close()
+
+    reader = storeReader(str(tmp_path))
+    voltage, = reader.find(mode = constants.VOLTAGE_DC)
+    data = reader.read(voltage)
+    assert np.array_equal(data['timestamp'], timestamps)
+    assert np.array_equal(data['value'], timestamps * 2)
+    part = reader.read(voltage, 50.5, 60.0)
+    assert list(part['timestamp']) == list(np.arange(51.0, 61.0))
+    streams = {stream['mode'] : stream for stream in reader.streams()}
+    assert streams[constants.VOLTAGE_DC]['count'] == 200
+    assert streams[constants.RESISTANCE]['first'] == streams[constants.RESISTANCE]['last'] == 500.0
+    assert len(reader.read(voltage, 1000.0)['value']) == 0
+
+def testSegmentsGrow(tmp_path):
+    store = measurementStore(str(tmp_path), segmentSize = 64, firstSegmentSize = 8)
+    store.append('a', constants.VOLTAGE_DC, constants.unitVoltage, [1.0], [1.0])
+    store.flush()
+    #Short recording does not preallocate whole segmentSize
+    sizes = [os.path.getsize(os.path.join(str(tmp_path), name)) for name in os.listdir(str(tmp_path)) if name.endswith('.npy')]
+    assert sizes and max(sizes) < 64 * 8
+    store.append('a', constants.VOLTAGE_DC, constants.unitVoltage, np.arange(2.0, 300.0), np.arange(2.0, 300.0))
+    store.close()
+    with open(os.path.join(str(tmp_path), INDEX_FILE_NAME)) as file:
+        segments = json.load(file)['streams'][0]['segments']
+    assert [segment['size'] for segment in segments] == [8, 16, 32, 64, 64, 64, 64]
+    assert sum(segment['count'] for segment in segments) == 299
+
+def testReopenContinuesStream(tmp_path):
+    store = measurementStore(str(tmp_path))
+    store.append('a', constants.VOLTAGE_DC, constants.unitVoltage, [1.0, 2.0], [1.0, 2.0])
+    store.close()
+    store = measurementStore(str(tmp_path))
+    store.append('a', constants.VOLTAGE_DC, constants.unitVoltage, [3.0], [3.0])
+    store.close()
+    assert list(store.getReader().read(0)['value']) == [1.0, 2.0, 3.0]
+
+def testRecords(tmp_path):
+    records = np.zeros(3, dtype = [('timestamp', np.float64), ('frequency', np.float64), ('value', np.float64)])
+    records['timestamp'] = [1.0, 2.0, 3.0]
+    records['frequency'] = [10.0, 100.0, 1000.0]
+    store = measurementStore(str(tmp_path))
+    store.appendRecords('a', constants.VOLTAGE_AC, constants.unitVoltage, records)
+    store.close()
+    data = store.getReader().read(0)
+    assert list(data) == ['timestamp', 'frequency', 'value']
+    assert list(data['frequency']) == [10.0, 100.0, 1000.0]
@@ -0,0 +1,67 @@
+import math
+
+import numpy as np
+import pytest
+
+import constants
+from metricPrefix import parseValue, formatValue, formatArray, prefixFactor, prefixOf, inputPattern
+
+@pytest.mark.parametrize('text, unit, expected', [
+    ('4.7k', None, 4700.0),
+    ('120 mV', constants.unitVoltage, 0.12),
+    ('2.5 MHz', constants.unitFrequency, 2.5e6),
+    ('10 uA', constants.unitCurrent, 10e-6),
+    ('3.3n', None, 3.3e-9),
+    ('1e-6', None, 1e-6),
+    ('-0.1', None, -0.1),
+    ('500 mVpp', constants.unitAmplitude, 0.5),
+    ])
+def testParseValue(text, unit, expected):
+    #Prefix is added to exponent, so values are exact, not product of two rounded floats
+    assert parseValue(text, unit) == expected
+
+@pytest.mark.parametrize('text, unit', [('', None), ('abc', None), ('1 V', constants.unitFrequency), ('1 x', None)])
+def testParseValueRejects(text, unit):
+    with pytest.raises(ValueError):
+        parseValue(text, unit)
+
+def testPrefixes():
+    assert prefixFactor('k') == constants.kilo
+    assert prefixFactor('u') == prefixFactor('µ') == constants.micro
+    assert prefixOf(0.047) == (constants.signMili, constants.mili)
+    assert prefixOf(470) == ('', constants.none)
+    with pytest.raises(ValueError):
+        prefixFactor('x')
+
+def testInputPattern():
+    from re import fullmatch
+    pattern = inputPattern(constants.unitFrequency)
+    assert fullmatch(pattern, '4.7kHz')
+    assert fullmatch(pattern, '100')
+    assert not fullmatch(pattern, '-1k')
+    assert fullmatch(inputPattern(signed = True), '-1k')
+
+@pytest.mark.parametrize('value, expected', [
+    (0.12, '120 mV'),
+    (4700.0, '4.7 kV'),
+    (0.0, '0 V'),
+    (-1.5e-6, '-1.5 ' + constants.signMicro + constants.unitVoltage),
+    #Rounding reaches next prefix
+    (999.9999999, '1 kV'),
+    (math.inf, 'inf V'),
+    (-math.inf, '-inf V'),
+    (math.nan, 'nan V'),
+    (constants.OVERLOAD, constants.OVERLOAD_TEXT),
+    (-constants.OVERLOAD, '-' + constants.OVERLOAD_TEXT),
+    ])
+def testFormatValue(value, expected):
+    assert formatValue(value, constants.unitVoltage) == expected
+
+def testFormatArrayMatchesFormatValue():
+    values = np.array([0.12, 4700.0, 0.0, -1.5e-6, 999.9999999, 1e-15, 5e12, math.inf, -math.inf, math.nan,
+                       constants.OVERLOAD, -constants.OVERLOAD])
+    assert list(formatArray(values, constants.unitVoltage)) == [formatValue(value, constants.unitVoltage) for value in values]
+
+def testFormatRoundTrip():
+    for value in np.random.default_rng(1).uniform(-1e6, 1e6, 100):
+        assert parseValue(formatValue(value, digits = 12)) == pytest.approx(value, rel = 1e-11)
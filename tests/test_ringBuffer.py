@@ -0,0 +1,45 @@
+import numpy as np
+
+from ringBuffer import ringBuffer
+
+def testAppendKeepsOrderAfterWrap():
+    buffer = ringBuffer(3)
+    for sample in range(5):
+        buffer.append(float(sample), sample * 10.0)
+    timestamps, values = buffer.toArrays()
+    assert list(timestamps) == [2.0, 3.0, 4.0] and list(values) == [20.0, 30.0, 40.0]
+    assert buffer.total() == 5 and len(buffer) == 3
+
+def testClearDropsSamples():
+    buffer = ringBuffer(3)
+    buffer.extend([1.0, 2.0], [10.0, 20.0])
+    buffer.clear()
+    assert len(buffer) == 0 and len(buffer.toArrays()[0]) == 0
+def testExtendLongerThanCapacity():
+    buffer = ringBuffer(4)
+    buffer.extend(np.arange(10.0), np.arange(10.0) * 2)
+    timestamps, values = buffer.toArrays()
+    assert list(timestamps) == [6.0, 7.0, 8.0, 9.0]
+    assert buffer.total() == 10 and len(buffer) == 4
+    assert buffer.latest() == (9.0, 18.0)
+
+def testSinceReturnsOnlyNewSamples():
+    buffer = ringBuffer(10)
+    buffer.extend([1.0, 2.0, 3.0], [10.0, 20.0, 30.0])
+    timestamps, values, total = buffer.since(0)
+    assert list(timestamps) == [1.0, 2.0, 3.0] and list(values) == [10.0, 20.0, 30.0] and total == 3
+    buffer.append(4.0, 40.0)
+    timestamps, values, total = buffer.since(total)
+    assert list(timestamps) == [4.0] and total == 4
+    timestamps, values, total = buffer.since(total)
+    assert len(timestamps) == 0 and total == 4
+
+def testSinceSkipsOverwrittenSamples():
+    buffer = ringBuffer(5)
+    buffer.extend(np.arange(3.0), np.arange(3.0))
+    total = buffer.total()
+    buffer.extend(np.arange(3.0, 12.0), np.arange(3.0, 12.0))
+    timestamps, values, total = buffer.since(total)
+    #Only capacity of newest samples survived, in order of arrival
+    assert list(values) == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert total == 12
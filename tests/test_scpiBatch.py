@@ -0,0 +1,59 @@
+from scpiBatch import scpiBatch, isNoError, readErrors
+
+class recordingInstrument:
+    """Stand-in of pyvisa resource, answers SYST:ERR? from given error queue"""
+
+    def __init__(self, errors = ()):
+        self.written = []
+        self.errors = list(errors)
+
+    def write(self, message):
+        self.written.append(message)
+
+    def query(self, message):
+        self.written.append(message)
+        if message == 'SYST:ERR?':
+            return self.errors.pop(0) if self.errors else '+0,"No error"'
+        return '1'
+
+def testCommandsAreJoinedFromRoot():
+    batch = scpiBatch()
+    for command in ('FUNC:SHAP SIN', 'FREQ 1000', 'VOLT 1'):
+        batch.add(command)
+    assert batch.programMessages() == ['FUNC:SHAP SIN;:FREQ 1000;:VOLT 1']
+
+def testLongBatchIsSplit():
+    batch = scpiBatch(maxLength = 20)
+    for command in ('FREQ 1000', 'VOLT 1', 'VOLT:OFFS 0.5', 'AM:STAT ON'):
+        batch.add(command)
+    messages = batch.programMessages()
+    assert messages == ['FREQ 1000;:VOLT 1', 'VOLT:OFFS 0.5', 'AM:STAT ON']
+    assert all(len(message) <= 20 for message in messages)
+    #Single command longer than limit is still sent
+    batch = scpiBatch(maxLength = 5)
+    batch.add('FREQ 1000')
+    assert batch.programMessages() == ['FREQ 1000']
+
+def testFlushAccepted():
+    batch = scpiBatch()
+    batch.add('FREQ 1000')
+    batch.add('VOLT 1')
+    instrument = recordingInstrument()
+    assert batch.flush(instrument) == []
+    assert instrument.written == ['FREQ 1000;:VOLT 1', '*OPC?', 'SYST:ERR?']
+    assert batch.isEmpty()
+
+def testFlushFindsRejectedCommand():
+    batch = scpiBatch()
+    batch.add('FREQ 1000')
+    batch.add('VOLT 99')
+    #Error of batch, no error after FREQ, error after VOLT
+    instrument = recordingInstrument(['-222,"Data out of range"', '+0,"No error"', '+0,"No error"', '-222,"Data out of range"'])
+    assert batch.flush(instrument) == [('VOLT 99', '-222,"Data out of range"')]
+
+def testErrorQueue():
+    assert isNoError('+0,"No error"')
+    assert not isNoError('-100,"Command error"')
+    assert not isNoError('garbage')
+    assert readErrors(recordingInstrument(['-100,"Command error"', '-222,"Data out of range"'])) == \
+        ['-100,"Command error"', '-222,"Data out of range"']
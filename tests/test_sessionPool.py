@@ -0,0 +1,47 @@
+import pytest
+
+from sessionPool import sessionPool
+
+#Devices of default pyvisa-sim configuration
+FIRST = 'ASRL1::INSTR'
+SECOND = 'ASRL2::INSTR'
+
+@pytest.fixture
+def pool():
+    pytest.importorskip('pyvisa_sim')
+    pool = sessionPool('@sim')
+    yield pool
+    pool.closeAll()
+
+def testSameAddressSharesSession(pool):
+    first = pool.acquire(FIRST)
+    second = pool.acquire(FIRST)
+    assert first is second
+    assert first.users == 2
+    other = pool.acquire(SECOND)
+    assert other is not first and other.address == SECOND
+
+def testIdleSessionIsClosed(pool):
+    session = pool.acquire(FIRST)
+    session.baudRate = '9600'
+    pool.release(session)
+    #Session released just now is kept
+    pool.collectIdle()
+    assert pool.acquire(FIRST) is session
+    pool.release(session)
+    session.lastUsed -= 1000
+    pool.collectIdle()
+    reopened = pool.acquire(FIRST)
+    assert reopened is not session
+    assert not reopened.isConfigured()
+
+def testUsedSessionIsNotCollected(pool):
+    session = pool.acquire(FIRST)
+    session.lastUsed -= 1000
+    pool.collectIdle()
+    assert pool.acquire(FIRST) is session
+
+def testCloseAll(pool):
+    session = pool.acquire(FIRST)
+    pool.closeAll()
+    assert pool.acquire(FIRST) is not session
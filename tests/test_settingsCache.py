@@ -0,0 +1,76 @@
+import pytest
+import pyvisa
+from pyvisa.constants import StatusCode
+
+import constants
+from pV import pyVisaInterface
+from sessionPool import instrumentSession
+from settingsCache import settingsCache
+
+class fakeResource:
+    """Resource which records writes, SYST:ERR? answers with queued errors"""
+
+    def __init__(self):
+        self.written = []
+        self.errors = []
+        self.failWrites = False
+
+    def write(self, message, termination = None, encoding = None):
+        if self.failWrites:
+            raise pyvisa.errors.VisaIOError(StatusCode.error_timeout)
+        self.written.append(message)
+        return len(message)
+
+    def query(self, message, delay = None):
+        if message == 'SYST:ERR?':
+            return self.errors.pop(0) if self.errors else '+0,"No error"'
+        return ''
+
+    def query_ascii_values(self, message, *args, **kwargs):
+        raise AssertionError('cached value was not used for ' + message)
+
+class fakePool:
+    def __init__(self):
+        self.resource = fakeResource()
+
+    def acquire(self, address):
+        return instrumentSession(address, self.resource)
+
+    def release(self, session):
+        pass
+
+def openGenerator():
+    pool = fakePool()
+    generator = pyVisaInterface(pool, None, constants.SIGNALGENERATOR)
+    generator.openResource('ASRL1::INSTR')
+    return generator, pool.resource
+
+def testSplitCommand():
+    assert settingsCache.splitCommand('FREQ 1000') == ('FREQ', '1000')
+    assert settingsCache.splitCommand('VOLT:OFFS 0.5') == ('VOLT:OFFS', '0.5')
+
+def testUnchangedSettingIsNotWritten():
+    generator, resource = openGenerator()
+    generator.insertFrequency('1000')
+    generator.insertFrequency('1000')
+    generator.insertFrequency('2000')
+    assert resource.written == ['FREQ 1000', 'FREQ 2000']
+    #Check is answered from cache, query_ascii_values would fail
+    assert generator.checkFrequency('2000')
+
+def testDeviceErrorInvalidatesCache():
+    generator, resource = openGenerator()
+    generator.insertFrequency('1000')
+    resource.errors.append('-222,"Data out of range"')
+    generator.checkErrorBus()
+    generator.insertFrequency('1000')
+    assert resource.written == ['FREQ 1000', 'FREQ 1000']
+
+def testFailedWriteIsNotCached():
+    generator, resource = openGenerator()
+    resource.failWrites = True
+    with pytest.raises(pyvisa.errors.VisaIOError):
+        generator.insertFrequency('1000')
+    resource.failWrites = False
+    generator.insertFrequency('1000')
+    assert resource.written == ['FREQ 1000']
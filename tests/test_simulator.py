@@ -0,0 +1,104 @@
+"""Integration tests of command line interface against simulated instruments"""
+
+import numpy as np
+import pytest
+
+import cli
+
+def run(capsys, *argv):
+    code = cli.main(['--quiet'] + list(argv))
+    out, err = capsys.readouterr()
+    return code, out, err
+
+@pytest.fixture
+def servers():
+    """Python stand-in instruments on free TCP ports, opened with pyvisa-py"""
+
+    pytest.importorskip('pyvisa_py')
+    import instrumentSimulator
+    generator, multimeter = instrumentSimulator.startSimulators(integrationTime = 0.001, settleTime = 0.001)
+    yield generator, multimeter
+    generator.shutdown()
+    multimeter.shutdown()
+
+def testListProbesIdentities(capsys, simBackend):
+    code, out, err = run(capsys, '--backend', simBackend, 'list', '--probe')
+    assert code == 0
+    devices = dict(line.split('\t') for line in out.splitlines())
+    assert devices['ASRL1::INSTR'].startswith('HEWLETT-PACKARD,33120A')
+    assert devices['GPIB0::22::INSTR'].startswith('HEWLETT-PACKARD,34401A')
+
+def testGenerateIsAcceptedAsOneBatch(capsys, simBackend):
+    code, out, err = run(capsys, '--backend', simBackend, 'generate', 'ASRL1::INSTR', '--waveform', 'SQU',
+                         '--frequency', '4.7k', '--amplitude', '500m')
+    assert code == 0, err
+
+def testGenerateOutOfLimits(capsys, simBackend):
+    code, out, err = run(capsys, '--backend', simBackend, 'generate', 'ASRL1::INSTR', '--frequency', '1k', '--amplitude', '50')
+    assert code == 1
+    assert '1000000008' in err
+
+def testMeasureSingleReading(capsys, simBackend):
+    code, out, err = run(capsys, '--backend', simBackend, 'measure', 'ASRL2::INSTR')
+    assert code == 0, err
+    assert float(out) == pytest.approx(1.0, abs = 0.01)
+
+def testBurstOfSimulatorIsReadReadingByReading(capsys, simBackend):
+    #pyvisa-sim answers FETC? with one reading whatever SAMP:COUN is
+    code, out, err = run(capsys, '--backend', simBackend, 'measure', 'ASRL2::INSTR', '--count', '5')
+    assert code == 0, err
+    assert [float(value) for value in out.split()] == pytest.approx([1.0] * 5, abs = 0.01)
+
+def testShortBurstIsRememberedBySession(simBackend):
+    import constants
+    from pV import pyVisaInterface
+    from sessionPool import sessionPool
+
+    pool = sessionPool(simBackend)
+    multimeter = pyVisaInterface(pool, None, constants.MULTIMETER)
+    multimeter.submit(multimeter.openResource, 'ASRL2::INSTR').result()
+    multimeter.submit(multimeter.configureCommunication, '9600').result()
+    multimeter.submit(multimeter.configureMeasure, constants.VOLTAGE_DC).result()
+    assert len(multimeter.submit(multimeter.readBurst, 3).result()) == 3
+    session = pool.acquire('ASRL2::INSTR')
+    assert session.burstLimit == 1
+    assert session.settings.get('SAMP:COUN') == '1'
+    assert len(multimeter.submit(multimeter.readBurst, 4).result()) == 4
+    pool.release(session)
+    multimeter.closeResource()
+    pool.closeAll()
+
+@pytest.mark.parametrize('format', ['ASC', 'REAL'])
+def testBurst(capsys, servers, format):
+    code, out, err = run(capsys, '--backend', '@py', 'measure', servers[1].getAddress(), '--count', '20', '--format', format)
+    assert code == 0, err
+    assert len(out.split()) == 20
+
+def testSweepIntoStore(capsys, servers, tmp_path):
+    generator, multimeter = servers
+    output = str(tmp_path / 'sweep.npy')
+    code, out, err = run(capsys, '--backend', '@py', 'sweep', generator.getAddress(), multimeter.getAddress(),
+                         '--start', '100', '--stop', '1k', '--points', '4', '--amplitude', '2', '--output', output,
+                         '--store', str(tmp_path / 'store'))
+    assert code == 0, err
+    results = np.load(output)
+    assert len(results) == 4
+    assert list(results['frequency']) == pytest.approx([100.0, 400.0, 700.0, 1000.0])
+
+    from measurementStore import storeReader
+    reader = storeReader(str(tmp_path / 'store'))
+    assert reader.streams()[0]['count'] == 4
+
+def testSweepCsvKeepsTimestamps(capsys, servers, tmp_path):
+    generator, multimeter = servers
+    output = str(tmp_path / 'sweep.csv')
+    code, out, err = run(capsys, '--backend', '@py', 'sweep', generator.getAddress(), multimeter.getAddress(),
+                         '--start', '100', '--stop', '1k', '--points', '2', '--amplitude', '2', '--output', output)
+    assert code == 0, err
+    with open(output) as file:
+        header, first, second = file.read().splitlines()
+    assert header == 'frequency,amplitude,value,timestamp'
+    #Epoch seconds keep microseconds instead of being rounded to 10 significant digits
+    timestamps = [row.split(',')[-1] for row in (first, second)]
+    assert all(len(timestamp.split('.')[1]) == 6 for timestamp in timestamps)
+    assert float(timestamps[1]) > float(timestamps[0])
@@ -0,0 +1,114 @@
+import threading
+from concurrent.futures import Future
+
+import numpy as np
+import pytest
+
+import constants
+from sweepEngine import sweepEngine, sweepGrid
+
+class fakeInterface:
+    """pyVisaInterface which executes submitted functions immediately"""
+
+    def submit(self, function, *args, **kwargs):
+        future = Future()
+        future.set_running_or_notify_cancel()
+        future.set_result(function(*args))
+        return future
+
+    def getDeviceStatus(self):
+        return constants.CONFIGURED
+
+class fakeGenerator(fakeInterface):
+    def __init__(self, rejected = None):
+        self.frequency = None
+        self.amplitude = None
+        self.batches = 0
+        self.rejected = rejected
+
+    def getDeviceName(self, callback):
+        callback('HEWLETT-PACKARD,33120A,0,7.0-5.0-1.0')
+
+    def beginBatch(self):
+        self.pending = {}
+
+    def insertWaveform(self, waveform):
+        self.pending['waveform'] = waveform
+
+    def insertFrequency(self, frequency):
+        self.pending['frequency'] = float(frequency)
+
+    def insertAmplitude(self, amplitude, offSet = ''):
+        self.pending['amplitude'] = float(amplitude)
+
+    def commitBatch(self):
+        if self.pending.get('frequency') == self.rejected:
+            return False
+        self.frequency = self.pending.get('frequency', self.frequency)
+        self.amplitude = self.pending.get('amplitude', self.amplitude)
+        self.batches += 1
+        return True
+
+    def discardBatch(self):
+        self.pending = {}
+
+class fakeMultimeter(fakeInterface):
+    """Reading is taken from generator at trigger, fetch only transfers it"""
+
+    def __init__(self, generator):
+        self.generator = generator
+        self.mode = None
+        self.reading = None
+
+    def configureMeasure(self, mode):
+        self.mode = mode
+        return True
+
+    def initiateMeasure(self):
+        self.reading = self.generator.amplitude * 1000 + self.generator.frequency
+        return True
+
+    def fetchMeasure(self):
+        reading, self.reading = self.reading, None
+        return reading
+
+def testSweepGrid():
+    assert list(sweepGrid(100, 400, 4)) == [100, 200, 300, 400]
+    assert sweepGrid(10, 1e4, 4, constants.SWEEP_LOG) == pytest.approx([10, 100, 1000, 1e4])
+
+def testReadingsBelongToTheirPoints():
+    generator = fakeGenerator()
+    multimeter = fakeMultimeter(generator)
+    points = []
+    results = sweepEngine(generator, multimeter).run([100, 200, 300], [1, 2], constants.VOLTAGE_AC, settle = 0,
+                                                     onPoint = lambda index, record : points.append(index))
+    assert multimeter.mode == constants.VOLTAGE_AC
+    #Amplitude is outer axis, frequency inner one
+    assert list(results['amplitude']) == [1, 1, 1, 2, 2, 2]
+    assert list(results['frequency']) == [100, 200, 300, 100, 200, 300]
+    assert list(results['value']) == list(results['amplitude'] * 1000 + results['frequency'])
+    assert np.all(np.diff(results['timestamp']) >= 0)
+    assert points == list(range(6))
+    assert generator.batches == 6
+
+def testRejectedPointEndsSweep():
+    generator = fakeGenerator(rejected = 300)
+    engine = sweepEngine(generator, fakeMultimeter(generator))
+    results = engine.run([100, 200, 300, 400], [1], constants.VOLTAGE_AC, settle = 0)
+    assert list(results['frequency']) == [100, 200]
+    assert engine.getRate() > 0
+
+def testStopInBackground():
+    generator = fakeGenerator()
+    engine = sweepEngine(generator, fakeMultimeter(generator))
+    reached = threading.Event()
+    def onPoint(index, record):
+        if index == 2:
+            #Stop from sweep thread itself does not join it
+            engine.stop()
+            reached.set()
+    engine.start(sweepGrid(100, 1000, 10), [1], constants.VOLTAGE_AC, settle = 0, onPoint = onPoint)
+    assert reached.wait(5)
+    engine.stop()
+    assert not engine.isRunning()
+    assert list(engine.getResults()['frequency']) == [100, 200, 300]
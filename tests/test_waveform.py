@@ -0,0 +1,28 @@
+import numpy as np
+from pyvisa.util import from_ieee_block
+
+import constants
+from waveform import DATATYPES, parsePreamble, scaleWaveform
+
+#BYTE format, 4 points, 1 us per point from -2 us, 10 mV per count around 128
+PREAMBLE = '+0,+0,+4,+1,+1.00000E-06,-2.00000E-06,+0,+1.00000E-02,+5.00000E-01,+128'
+
+def testParsePreamble():
+    preamble = parsePreamble(PREAMBLE + '\n')
+    assert preamble.format == 0 and preamble.points == 4 and preamble.count == 1
+    assert preamble.xIncrement == 1e-6 and preamble.xOrigin == -2e-6 and preamble.xReference == 0
+    assert preamble.yIncrement == 0.01 and preamble.yOrigin == 0.5 and preamble.yReference == 128
+
+def testScaleWaveform():
+    times, volts = scaleWaveform(np.array([0, 128, 255, 200], dtype = np.uint8), parsePreamble(PREAMBLE))
+    assert np.allclose(times, [-2e-6, -1e-6, 0.0, 1e-6])
+    assert np.allclose(volts, [-0.78, 0.5, 1.77, 1.22])
+
+def testBlockSamplesAreUnsigned():
+    #Samples above 127 are upper half of screen, not negative values
+    block = b'#14' + bytes([0, 128, 255, 200])
+    raw = from_ieee_block(block, datatype = DATATYPES[constants.WAVEFORM_BYTE], container = np.array)
+    assert list(raw) == [0, 128, 255, 200]
+    block = b'#14' + bytes([0xFF, 0xFF, 0x80, 0x00])
+    raw = from_ieee_block(block, datatype = DATATYPES[constants.WAVEFORM_WORD], is_big_endian = True, container = np.array)
+    assert list(raw) == [65535, 32768]